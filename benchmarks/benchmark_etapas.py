@@ -0,0 +1,214 @@
+# ============================================================================
+# BENCHMARK: ETAPAS DO PIPELINE EM VÁRIAS ESCALAS
+# ============================================================================
+#
+# Para cada escala (número de linhas):
+#   1. gera uma base bruta a partir de data/raw/churn-bigml-80.csv
+#      (reamostragem das linhas com ruído nos minutos e cobranças
+#      recalculadas pela tarifa, para não criar duplicatas nem
+#      inconsistências);
+#   2. executa as etapas em processos novos, numa pasta temporária;
+#   3. lê os tempos de cada etapa e passo (outputs/metricas_execucao.jsonl)
+#      e o pico de memória (outputs/memoria_etapas.json).
+#
+# Com --baseline, compara com a referência gravada e termina com erro se
+# algum tempo ou pico de memória passar de referência·(1 + limiar).
+# Passos com menos de MINIMO_SEGUNDOS na referência não entram na
+# comparação de tempo (ruído de medição).
+#
+# Uso (a partir da raiz do projeto):
+#   python benchmarks/benchmark_etapas.py --linhas 100000 1000000
+#   python benchmarks/benchmark_etapas.py --linhas 100000 --salvar-baseline
+#   python benchmarks/benchmark_etapas.py --linhas 100000 --baseline --limiar 0.25
+# ============================================================================
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+PASTA_RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PASTA_NOTEBOOK = os.path.join(PASTA_RAIZ, 'notebook')
+sys.path.append(PASTA_NOTEBOOK)
+
+from esquema import PERIODOS_TARIFA
+from regras_validacao import TARIFAS_NOMINAIS
+
+ARQUIVO_AMOSTRA = os.path.join(PASTA_RAIZ, 'data', 'raw', 'churn-bigml-80.csv')
+ARQUIVO_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_etapas.json')
+
+ETAPAS = ['carregamento_inspecao', 'limpeza_dados', 'eda_exploratoria', 'metricas_powerbi',
+          'exportacao_powerbi']
+
+# Passos acompanhados além do total de cada etapa
+PASSOS_CHAVE = ['carga', 'deduplicacao', 'validacao', 'outliers', 'auditoria_tarifas',
+                'estatisticas_numericas', 'cubo_churn', 'correlacao', 'comparacao_churners',
+                'tabelas_powerbi', 'exportacao', 'exportacao_dashboard', 'estado_kpis',
+                'modelo_estrela']
+
+LIMIAR_PADRAO = 0.25
+MINIMO_SEGUNDOS = 0.05
+
+# Linhas geradas por vez (limita a memória do gerador)
+BLOCO_GERACAO = 1_000_000
+
+
+def gerar_base(caminho, linhas, semente=0):
+    """
+    Grava uma base bruta com o número de linhas pedido, reamostrando a
+    amostra original em blocos
+    """
+    amostra = pd.read_csv(ARQUIVO_AMOSTRA)
+    rng = np.random.default_rng(semente)
+    primeiro = True
+    for inicio in range(0, linhas, BLOCO_GERACAO):
+        n = min(BLOCO_GERACAO, linhas - inicio)
+        bloco = amostra.iloc[rng.integers(0, len(amostra), n)].reset_index(drop=True)
+        for periodo, (minutos, cobranca) in PERIODOS_TARIFA.items():
+            novos = np.clip(bloco[minutos].to_numpy() + rng.normal(0, 5, n), 0, None).round(1)
+            bloco[minutos] = novos
+            bloco[cobranca] = (novos * TARIFAS_NOMINAIS[periodo]).round(2)
+        bloco.to_csv(caminho, mode='w' if primeiro else 'a', header=primeiro, index=False)
+        primeiro = False
+
+
+def _ler_metricas(pasta):
+    """
+    Tempos por etapa/passo e pico de RSS por etapa de uma execução
+    """
+    resultado = {}
+    with open(os.path.join(pasta, 'outputs', 'metricas_execucao.jsonl'), encoding='utf-8') as f:
+        for linha in f:
+            registro = json.loads(linha)
+            passo = registro.get('passo')
+            if passo == 'etapa' or passo in PASSOS_CHAVE:
+                etapa = os.path.splitext(registro['etapa'])[0]
+                chave = etapa if passo == 'etapa' else f"{etapa}/{passo}"
+                resultado[chave] = {'parede_s': registro['parede_s']}
+
+    with open(os.path.join(pasta, 'outputs', 'memoria_etapas.json'), encoding='utf-8') as f:
+        for script, memoria in json.load(f).items():
+            etapa = os.path.splitext(script)[0]
+            if etapa in resultado:
+                resultado[etapa]['rss_pico_mb'] = memoria['pico_rss_mb']
+    return resultado
+
+
+def executar_escala(linhas, repeticoes=1):
+    """
+    Gera a base e executa as etapas; com várias repetições, fica com o
+    menor tempo de cada medida
+
+    Returns:
+        dict 'etapa' ou 'etapa/passo' -> {'parede_s', 'rss_pico_mb'}
+    """
+    pasta = tempfile.mkdtemp(prefix='benchmark_churn_')
+    try:
+        os.makedirs(os.path.join(pasta, 'data', 'raw'))
+        inicio = time.perf_counter()
+        gerar_base(os.path.join(pasta, 'data', 'raw', 'telecom_churn_raw.csv'), linhas)
+        print(f"   base de {linhas:,} linhas gerada em {time.perf_counter() - inicio:.1f}s")
+
+        melhor = {}
+        for _ in range(repeticoes):
+            shutil.rmtree(os.path.join(pasta, 'outputs'), ignore_errors=True)
+            for etapa in ETAPAS:
+                subprocess.run([sys.executable, os.path.join(PASTA_NOTEBOOK, f'{etapa}.py')],
+                               cwd=pasta, stdout=subprocess.DEVNULL, check=True)
+            for chave, medida in _ler_metricas(pasta).items():
+                anterior = melhor.get(chave)
+                if anterior is None or medida['parede_s'] < anterior['parede_s']:
+                    melhor[chave] = medida
+        return melhor
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+def comparar(resultados, baseline, limiar):
+    """
+    Lista de regressões (texto) em relação à referência, incluindo medidas
+    sem referência e referências que a execução não produziu (etapa ou passo
+    novo, renomeado ou desligado: regrave com --salvar-baseline)
+    """
+    regressoes = []
+    for linhas, medidas in resultados.items():
+        referencia = baseline.get(linhas)
+        if referencia is None:
+            regressoes.append(f"{linhas} linhas: escala sem referência")
+            continue
+        for chave in referencia:
+            if chave not in medidas:
+                regressoes.append(f"{linhas} linhas, {chave}: ausente na execução")
+        for chave, medida in medidas.items():
+            ref = referencia.get(chave)
+            if ref is None:
+                regressoes.append(f"{linhas} linhas, {chave}: sem referência")
+                continue
+            if ref['parede_s'] >= MINIMO_SEGUNDOS and medida['parede_s'] > ref['parede_s'] * (1 + limiar):
+                regressoes.append(f"{linhas} linhas, {chave}: {medida['parede_s']:.3f}s "
+                                  f"(referência {ref['parede_s']:.3f}s)")
+            if ref.get('rss_pico_mb') and medida.get('rss_pico_mb', 0) > ref['rss_pico_mb'] * (1 + limiar):
+                regressoes.append(f"{linhas} linhas, {chave}: {medida['rss_pico_mb']:.1f} MB "
+                                  f"(referência {ref['rss_pico_mb']:.1f} MB)")
+    return regressoes
+
+
+def imprimir_resultados(resultados, baseline):
+    print(f"\n{'Linhas':>12s}  {'Etapa / passo':45s} {'tempo (s)':>10s} {'ref (s)':>10s} {'RSS (MB)':>10s}")
+    for linhas, medidas in resultados.items():
+        referencia = baseline.get(linhas, {})
+        for chave, medida in medidas.items():
+            ref = referencia.get(chave, {}).get('parede_s')
+            texto_ref = f"{ref:10.3f}" if ref is not None else f"{'-':>10s}"
+            rss = medida.get('rss_pico_mb')
+            texto_rss = f"{rss:10.1f}" if rss is not None else f"{'':>10s}"
+            print(f"{int(linhas):12,d}  {chave:45s} {medida['parede_s']:10.3f} {texto_ref} {texto_rss}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark das etapas do pipeline em várias escalas')
+    parser.add_argument('--linhas', type=int, nargs='+', default=[100_000, 1_000_000],
+                        help='Escalas (linhas da base gerada)')
+    parser.add_argument('--repeticoes', type=int, default=1)
+    parser.add_argument('--baseline', action='store_true',
+                        help='Compara com a referência e falha se houver regressão')
+    parser.add_argument('--salvar-baseline', action='store_true',
+                        help='Grava os resultados como nova referência')
+    parser.add_argument('--limiar', type=float, default=LIMIAR_PADRAO,
+                        help='Aumento relativo tolerado (0.25 = 25%%)')
+    parser.add_argument('--arquivo-baseline', default=ARQUIVO_BASELINE)
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.arquivo_baseline):
+        with open(args.arquivo_baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    resultados = {}
+    for linhas in args.linhas:
+        print(f"▶️  Escala: {linhas:,} linhas")
+        resultados[str(linhas)] = executar_escala(linhas, args.repeticoes)
+
+    imprimir_resultados(resultados, baseline)
+    regressoes = comparar(resultados, baseline, args.limiar) if args.baseline else []
+
+    if args.salvar_baseline:
+        baseline.update(resultados)
+        with open(args.arquivo_baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=4)
+        print(f"\n✅ Referência salva: {args.arquivo_baseline}")
+
+    if args.baseline:
+        if regressoes:
+            print(f"\n❌ Regressões acima de {args.limiar:.0%} ou medidas sem referência:")
+            for texto in regressoes:
+                print(f"   • {texto}")
+            sys.exit(1)
+        print(f"\n✅ Sem regressões acima de {args.limiar:.0%}")
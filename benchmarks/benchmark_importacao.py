@@ -0,0 +1,60 @@
+# ============================================================================
+# BENCHMARK: TEMPO DE INICIALIZAÇÃO DO AMBIENTE
+# ============================================================================
+#
+# Mede, em processos Python novos, quanto custa importar preparacao_ambiente
+# (helpers apenas) e quanto custa quando a etapa também carrega pandas ou as
+# bibliotecas gráficas. Cada cenário roda N vezes; reporta mediana e mínimo.
+#
+# Uso (a partir da raiz do projeto):
+#   python benchmarks/benchmark_importacao.py --repeticoes 10
+# ============================================================================
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PASTA_NOTEBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'notebook')
+
+CENARIOS = {
+    'helpers (print_section, salvar_info_execucao, COLORS)':
+        "from preparacao_ambiente import print_section, salvar_info_execucao, COLORS",
+    'import * + preparar_etapa() (pandas)':
+        "from preparacao_ambiente import *; preparar_etapa()",
+    'import * + preparar_etapa() + carregar_graficos()':
+        "from preparacao_ambiente import *; preparar_etapa(); carregar_graficos()",
+}
+
+MODELO = """
+import os, sys, tempfile, time
+sys.path.insert(0, {pasta!r})
+os.chdir(tempfile.mkdtemp())
+inicio = time.perf_counter()
+{codigo}
+print(time.perf_counter() - inicio)
+"""
+
+
+def medir(codigo, repeticoes):
+    """
+    Executa o código em processos novos e retorna os tempos (segundos)
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', MODELO.format(pasta=PASTA_NOTEBOOK, codigo=codigo)],
+                               capture_output=True, text=True, check=True)
+        tempos.append(float(saida.stdout.strip().splitlines()[-1]))
+    return tempos
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de importação do ambiente')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Cenário':60s} {'mediana (ms)':>14s} {'mínimo (ms)':>14s}")
+    for nome, codigo in CENARIOS.items():
+        tempos = medir(codigo, args.repeticoes)
+        print(f"{nome:60s} {statistics.median(tempos) * 1000:14.1f} {min(tempos) * 1000:14.1f}")
@@ -0,0 +1,181 @@
+# ============================================================================
+# ARMAZÉM COLUNAR MAPEADO EM MEMÓRIA (BASE LIMPA)
+# ============================================================================
+#
+# Cada coluna de largura fixa da base limpa (numéricas, Churn e os códigos
+# das categóricas) fica num arquivo .npy próprio, em
+# data/processed/03_dados_limpos.colunas/: o cabeçalho curto do numpy
+# (dtype e número de linhas) seguido dos valores. O metadados.json guarda a
+# ordem das colunas, as categorias e a assinatura (tamanho e mtime) do
+# arquivo da etapa de onde o armazém saiu.
+#
+# As etapas abrem as colunas com np.load(mmap_mode='r'): só as colunas
+# usadas são lidas do disco, sob demanda, e processos diferentes
+# compartilham as mesmas páginas do cache do sistema operacional. Os
+# DataFrames montados a partir do armazém usam os arrays mapeados sem cópia
+# (somente leitura; o pandas copia a coluna se ela for alterada).
+#
+# A limpeza grava o armazém junto com o Parquet. Se o Parquet mudar por
+# outro caminho (ex: execucao_particionada.py), o armazém fica inválido e é
+# recriado na próxima carga completa. Colunas sem largura fixa (texto,
+# tipos anuláveis) não entram no armazém e são lidas do Parquet.
+#
+# Uso:
+#   df = carregar_colunas('data/processed/03_dados_limpos')
+#   minutos = abrir_coluna('data/processed/03_dados_limpos', 'Total day minutes')
+# ============================================================================
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from armazenamento import caminho_etapa, carregar_etapa
+
+ARQUIVO_METADADOS = 'metadados.json'
+
+VERSAO_ARMAZEM = 1
+
+
+def pasta_armazem(caminho_base):
+    """
+    Pasta do armazém de uma etapa (ex: data/processed/03_dados_limpos.colunas)
+    """
+    return f"{caminho_base}.colunas"
+
+
+def _assinatura(caminho):
+    info = os.stat(caminho)
+    return {'arquivo': os.path.basename(caminho), 'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+
+def _largura_fixa(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return True
+    return isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'biuf'
+
+
+def gravar_armazem(df, caminho_base):
+    """
+    Grava as colunas de largura fixa do DataFrame de uma etapa já salva
+    (chamar depois de salvar_etapa, que define a assinatura de origem)
+
+    A pasta nova é montada ao lado e trocada no fim: quem já tem colunas
+    abertas continua lendo os arquivos antigos.
+
+    Returns:
+        Pasta do armazém
+    """
+    pasta = pasta_armazem(caminho_base)
+    temporaria = f"{pasta}.tmp-{os.getpid()}"
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+
+    colunas = []
+    for i, col in enumerate(df.columns):
+        serie = df[col]
+        if not _largura_fixa(serie):
+            continue
+        arquivo = f'coluna_{i:03d}.npy'
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(temporaria, arquivo), serie.cat.codes.to_numpy())
+            colunas.append({'nome': col, 'arquivo': arquivo, 'tipo': 'categoria',
+                            'categorias': serie.cat.categories.tolist(),
+                            'ordenada': bool(serie.cat.ordered)})
+        else:
+            np.save(os.path.join(temporaria, arquivo), serie.to_numpy())
+            colunas.append({'nome': col, 'arquivo': arquivo, 'tipo': 'valores'})
+
+    metadados = {
+        'versao': VERSAO_ARMAZEM,
+        'linhas': len(df),
+        'ordem': list(df.columns),
+        'colunas': colunas,
+        'origem': _assinatura(caminho_etapa(caminho_base))
+    }
+    with open(os.path.join(temporaria, ARQUIVO_METADADOS), 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, indent=4, default=int)
+
+    antiga = f"{pasta}.antiga-{os.getpid()}"
+    if os.path.exists(pasta):
+        os.replace(pasta, antiga)
+    os.replace(temporaria, pasta)
+    shutil.rmtree(antiga, ignore_errors=True)
+    return pasta
+
+
+def ler_metadados(caminho_base):
+    """
+    Metadados do armazém, ou None se ele não existir ou não corresponder mais
+    ao arquivo da etapa
+    """
+    caminho = os.path.join(pasta_armazem(caminho_base), ARQUIVO_METADADOS)
+    origem = caminho_etapa(caminho_base)
+    if not os.path.exists(caminho) or not os.path.exists(origem):
+        return None
+    with open(caminho, encoding='utf-8') as f:
+        metadados = json.load(f)
+    if metadados.get('versao') != VERSAO_ARMAZEM or metadados['origem'] != _assinatura(origem):
+        return None
+    return metadados
+
+
+def _abrir(pasta, info):
+    valores = np.asarray(np.load(os.path.join(pasta, info['arquivo']), mmap_mode='r'))
+    if info['tipo'] == 'categoria':
+        tipo = pd.CategoricalDtype(info['categorias'], ordered=info['ordenada'])
+        return pd.Categorical.from_codes(valores, dtype=tipo)
+    return valores
+
+
+def abrir_coluna(caminho_base, coluna, metadados=None):
+    """
+    Array somente leitura mapeado do disco (ou Categorical, para colunas
+    categóricas) de uma coluna do armazém
+
+    Raises:
+        KeyError: se o armazém não existir, estiver desatualizado ou não
+            tiver a coluna
+    """
+    metadados = metadados or ler_metadados(caminho_base)
+    if metadados is None:
+        raise KeyError(f"Armazém ausente ou desatualizado: {pasta_armazem(caminho_base)}")
+    for info in metadados['colunas']:
+        if info['nome'] == coluna:
+            return _abrir(pasta_armazem(caminho_base), info)
+    raise KeyError(f"Coluna fora do armazém: {coluna}")
+
+
+def carregar_colunas(caminho_base, colunas=None):
+    """
+    DataFrame de uma etapa montado a partir do armazém (sem cópia das colunas
+    de largura fixa), com as demais colunas lidas do Parquet
+
+    Sem armazém válido, lê a etapa com carregar_etapa e, numa carga completa
+    (colunas=None), grava o armazém para as próximas leituras.
+
+    Args:
+        caminho_base: caminho da etapa sem extensão
+        colunas: colunas a carregar (None = todas, na ordem da etapa)
+    """
+    metadados = ler_metadados(caminho_base)
+    if metadados is None:
+        df = carregar_etapa(caminho_base, colunas)
+        if colunas is None:
+            gravar_armazem(df, caminho_base)
+        return df
+
+    colunas = list(metadados['ordem'] if colunas is None else colunas)
+    pasta = pasta_armazem(caminho_base)
+    armazenadas = {info['nome']: info for info in metadados['colunas']}
+    dados = {col: _abrir(pasta, armazenadas[col]) for col in colunas if col in armazenadas}
+
+    faltantes = [col for col in colunas if col not in armazenadas]
+    if faltantes:
+        restantes = carregar_etapa(caminho_base, faltantes)
+        for col in faltantes:
+            dados[col] = restantes[col]
+
+    return pd.DataFrame({col: dados[col] for col in colunas}, copy=False)
@@ -0,0 +1,260 @@
+# ============================================================================
+# ARMAZENAMENTO ENTRE ETAPAS (FORMATO COLUNAR)
+# ============================================================================
+#
+# As etapas do pipeline trocam dados em Parquet (tipado, comprimido e legível
+# coluna a coluna). CSV fica disponível apenas como exportação opcional:
+# CHURN_EXPORTAR_CSV=1 grava também uma cópia .csv ao lado de cada etapa.
+# ============================================================================
+
+import os
+import shutil
+
+import pandas as pd
+
+from esquema import aplicar_esquema, tipo_coluna, TIPOS_COLUNAS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_DISPONIVEL = True
+except ImportError:  # pragma: no cover - depende do ambiente
+    PYARROW_DISPONIVEL = False
+
+# Compressão padrão dos arquivos Parquet
+COMPRESSAO_PARQUET = 'zstd'
+
+# Exportar também em CSV (apenas para consumo externo)
+EXPORTAR_CSV = os.environ.get('CHURN_EXPORTAR_CSV') == '1'
+
+# Linhas lidas para estimar a memória de uma linha (bytes_por_linha)
+LINHAS_AMOSTRA = 10_000
+
+
+def caminho_etapa(caminho_base):
+    """
+    Retorna o caminho do arquivo de uma etapa no formato intermediário
+
+    Args:
+        caminho_base: caminho sem extensão (ex: 'data/processed/03_dados_limpos')
+    """
+    if PYARROW_DISPONIVEL:
+        return f"{caminho_base}.parquet"
+    return f"{caminho_base}.csv"
+
+
+def salvar_etapa(df, caminho_base, exportar_csv=None):
+    """
+    Salva o DataFrame de uma etapa em Parquet (ou CSV, se pyarrow não estiver
+    instalado), já com os tipos compactos do esquema
+
+    A conversão é feita no próprio df, sem cópia: depois da chamada, o
+    DataFrame de quem chamou fica com os tipos do esquema (as etapas contam
+    com isso, ex: gravar_armazem logo depois da limpeza). Passe df.copy() se
+    precisar dos tipos originais.
+
+    Args:
+        df: DataFrame a salvar (alterado no lugar)
+        caminho_base: caminho sem extensão
+        exportar_csv: se True, grava também uma cópia .csv
+            (padrão: variável de ambiente CHURN_EXPORTAR_CSV)
+
+    Returns:
+        Caminho do arquivo salvo no formato intermediário
+    """
+    if exportar_csv is None:
+        exportar_csv = EXPORTAR_CSV
+
+    aplicar_esquema(df)
+
+    caminho = caminho_etapa(caminho_base)
+    if PYARROW_DISPONIVEL:
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(tabela, caminho, compression=COMPRESSAO_PARQUET)
+    else:
+        df.to_csv(caminho, index=False)
+
+    if exportar_csv and caminho != f"{caminho_base}.csv":
+        df.to_csv(f"{caminho_base}.csv", index=False)
+
+    return caminho
+
+
+def carregar_etapa(caminho_base, colunas=None):
+    """
+    Carrega o DataFrame de uma etapa, com os tipos do esquema
+
+    Lê o Parquet com memory map e converte para pandas sem cópia sempre que
+    possível (colunas numéricas sem nulos). Se só existir o CSV de uma
+    execução anterior, lê o CSV.
+
+    Args:
+        caminho_base: caminho sem extensão
+        colunas: lista de colunas a carregar (None = todas)
+    """
+    caminho_parquet = f"{caminho_base}.parquet"
+    if PYARROW_DISPONIVEL and os.path.exists(caminho_parquet):
+        tabela = pq.read_table(caminho_parquet, columns=colunas, memory_map=True)
+        df = tabela.to_pandas(split_blocks=True, self_destruct=True)
+    else:
+        df = pd.read_csv(f"{caminho_base}.csv", usecols=colunas)
+
+    return aplicar_esquema(df)
+
+
+def ler_em_blocos(caminho, tamanho_bloco, colunas=None):
+    """
+    Itera sobre um arquivo .parquet ou .csv em blocos de DataFrame, sem
+    carregar o arquivo inteiro
+
+    Args:
+        caminho: arquivo com extensão
+        tamanho_bloco: linhas por bloco
+        colunas: lista de colunas a ler (None = todas)
+
+    Raises:
+        ImportError: arquivo .parquet sem pyarrow instalado
+    """
+    if caminho.endswith('.parquet'):
+        if not PYARROW_DISPONIVEL:
+            raise ImportError(f"pyarrow é necessário para ler {caminho} (ou converta para .csv)")
+        arquivo = pq.ParquetFile(caminho, memory_map=True)
+        for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=colunas):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco, usecols=colunas)
+
+
+def bytes_por_linha(caminho, linhas=LINHAS_AMOSTRA):
+    """
+    Memória (bytes) de uma linha do arquivo já carregada no pandas, medida
+    nas primeiras linhas (texto conta o tamanho das strings)
+
+    Args:
+        caminho: arquivo .parquet ou .csv com extensão
+        linhas: tamanho da amostra
+    """
+    amostra = next(ler_em_blocos(caminho, linhas), None)
+    if amostra is None or amostra.empty:
+        return 0
+    return int(amostra.memory_usage(index=False, deep=True).sum() / len(amostra)) + 1
+
+
+class EscritorBlocos:
+    """
+    Grava blocos de DataFrame em sequência num único arquivo da etapa
+    (Parquet, ou CSV sem pyarrow). Use como gerenciador de contexto.
+
+    Colunas categóricas são gravadas com os valores (cada bloco pode ter
+    categorias diferentes); voltam a ser category ao carregar.
+
+    Args:
+        caminho_base: destino sem extensão
+    """
+
+    def __init__(self, caminho_base):
+        self.caminho = caminho_etapa(caminho_base)
+        self._escritor = None
+        self._esquema = None
+        self.linhas = 0
+
+    def escrever(self, bloco):
+        """
+        Acrescenta um bloco ao arquivo
+        """
+        bloco = bloco.copy(deep=False)
+        for col in bloco.columns:
+            if isinstance(bloco[col].dtype, pd.CategoricalDtype):
+                bloco[col] = bloco[col].astype(bloco[col].cat.categories.dtype)
+
+        if not PYARROW_DISPONIVEL:
+            bloco.to_csv(self.caminho, mode='w' if self.linhas == 0 else 'a',
+                         header=(self.linhas == 0), index=False)
+        else:
+            tabela = pa.Table.from_pandas(bloco, schema=self._esquema, preserve_index=False)
+            if self._escritor is None:
+                self._esquema = tabela.schema
+                self._escritor = pq.ParquetWriter(self.caminho, self._esquema,
+                                                  compression=COMPRESSAO_PARQUET)
+            self._escritor.write_table(tabela)
+
+        self.linhas += len(bloco)
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+
+def converter_csv_em_blocos(caminho_csv, caminho_base, tipos, tamanho_bloco, faltantes=None,
+                            intervalos=None):
+    """
+    Converte um CSV grande para o formato intermediário bloco a bloco, com os
+    tipos já conhecidos (ex: inferidos pela inspeção em blocos), sem carregar
+    o arquivo inteiro na memória
+
+    Colunas do esquema ficam nos tipos compactos; as categóricas ficam como
+    texto (o Parquet já as codifica em dicionário) e voltam a ser category ao
+    carregar. Colunas inteiras são lidas no tipo inferido e estreitadas em
+    cada bloco para um único tipo escolhido pelo intervalo do arquivo
+    inteiro (o read_csv direto em int8 estoura em silêncio: 200 vira -56),
+    o mesmo que aplicar_esquema escolhe no modo em memória.
+
+    Args:
+        caminho_csv: CSV de origem
+        caminho_base: destino sem extensão
+        tipos: dict coluna -> 'bool' | 'int64' | 'float64' | 'object'
+        tamanho_bloco: linhas por bloco
+        faltantes: dict coluna -> nº de nulos (para escolher tipos anuláveis
+            de forma igual em todos os blocos)
+        intervalos: dict coluna -> [mínimo, máximo] (para alargar os inteiros
+            de forma igual em todos os blocos)
+
+    Returns:
+        Caminho do arquivo salvo
+    """
+    caminho = caminho_etapa(caminho_base)
+    faltantes = faltantes or {}
+    intervalos = intervalos or {}
+    dtypes = {}
+    inteiros = {}
+    for col, tipo in tipos.items():
+        tipo_esquema = tipo_coluna(col, tem_nulos=faltantes.get(col, 0) > 0,
+                                   intervalo=intervalos.get(col))
+        lido = str if tipo == 'object' else tipo
+        if col in TIPOS_COLUNAS and isinstance(tipo_esquema, str) and tipo_esquema != 'category':
+            if pd.api.types.is_integer_dtype(tipo_esquema):
+                dtypes[col] = lido
+                inteiros[col] = tipo_esquema
+            else:
+                dtypes[col] = tipo_esquema
+        else:
+            dtypes[col] = lido
+
+    if not PYARROW_DISPONIVEL:
+        shutil.copyfile(caminho_csv, caminho)
+        return caminho
+
+    escritor = None
+    try:
+        for bloco in pd.read_csv(caminho_csv, chunksize=tamanho_bloco, dtype=dtypes):
+            bloco = bloco.astype(inteiros, copy=False)
+            tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(caminho, tabela.schema, compression=COMPRESSAO_PARQUET)
+            escritor.write_table(tabela)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    if EXPORTAR_CSV:
+        shutil.copyfile(caminho_csv, f"{caminho_base}.csv")
+
+    return caminho
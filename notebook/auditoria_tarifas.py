@@ -0,0 +1,126 @@
+# ============================================================================
+# AUDITORIA DE TARIFAS (DIA / NOITE / MADRUGADA / INTERNACIONAL)
+# ============================================================================
+#
+# Para cada período:
+#   1. taxa por minuto = mediana de cobrança / minutos nas linhas com pelo
+#      menos MINUTOS_MINIMOS minutos (poucos minutos amplificam o
+#      arredondamento da cobrança ao centavo);
+#   2. sinaliza |cobrança - minutos·taxa| > tolerancia·minutos·taxa + meio
+#      centavo, testado como dois lados da faixa:
+#          cobrança - minutos·taxa·(1 + tolerancia) > folga
+#          minutos·taxa·(1 - tolerancia) - cobrança > folga
+#
+# O DataFrame não é alterado: cada período usa um único array float64
+# temporário (razões e depois os dois lados da faixa, no mesmo buffer; a
+# mediana sai de np.partition no próprio buffer) e uma máscara booleana.
+#
+# Em partes (processos diferentes): a execução particionada estima a taxa
+# exata com auditar_periodo() na base já juntada e a passa a
+# auditar_tarifas(..., taxas=...) em cada parte.
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+
+from esquema import PERIODOS_TARIFA
+from regras_validacao import FOLGA_ARREDONDAMENTO
+
+# Tolerância relativa padrão (5%)
+TOLERANCIA_PADRAO = 0.05
+
+# Minutos mínimos para uma linha entrar na estimativa da taxa
+MINUTOS_MINIMOS = 1.0
+
+NOMES_PERIODOS = {
+    'day': 'dia',
+    'eve': 'noite',
+    'night': 'madrugada',
+    'intl': 'internacional'
+}
+
+
+def _mediana_no_lugar(buffer, n_validos):
+    """
+    Mediana dos n_validos menores valores do buffer (os demais são +inf),
+    reordenando o próprio buffer
+    """
+    if n_validos == 0:
+        return np.nan
+    meio = (n_validos - 1) // 2, n_validos // 2
+    buffer.partition(meio)
+    return float((buffer[meio[0]] + buffer[meio[1]]) / 2)
+
+
+def _razoes(minutos, cobranca):
+    """
+    Buffer com cobrança/minutos nas linhas da estimativa (+inf nas demais)
+    """
+    buffer = np.full(len(minutos), np.inf)
+    usar = minutos >= MINUTOS_MINIMOS
+    np.divide(cobranca, minutos, out=buffer, where=usar)
+    buffer[np.isnan(buffer)] = np.inf
+    return buffer
+
+
+def auditar_periodo(minutos, cobranca, tolerancia=TOLERANCIA_PADRAO, taxa=None):
+    """
+    Estima a taxa por minuto de um período e sinaliza as cobranças
+    discrepantes
+
+    Args:
+        minutos, cobranca: arrays (ou Series) do período
+        tolerancia: erro relativo aceito sobre a cobrança esperada
+        taxa: taxa já estimada (ex: de todas as partes); None = mediana
+            das razões deste período
+
+    Returns:
+        taxa estimada e array booleano das linhas sinalizadas
+    """
+    minutos = np.asarray(minutos, dtype=np.float64)
+    cobranca = np.asarray(cobranca, dtype=np.float64)
+
+    # 1. Razões cobrança/minutos e mediana
+    if taxa is None:
+        buffer = _razoes(minutos, cobranca)
+        taxa = _mediana_no_lugar(buffer, int(np.count_nonzero(buffer < np.inf)))
+    else:
+        buffer = np.empty(len(minutos))
+
+    # 2. Lados da faixa no mesmo buffer
+    np.multiply(minutos, -taxa * (1 + tolerancia), out=buffer)
+    np.add(buffer, cobranca, out=buffer)
+    sinalizadas = buffer > FOLGA_ARREDONDAMENTO
+    np.multiply(minutos, taxa * (1 - tolerancia), out=buffer)
+    np.subtract(buffer, cobranca, out=buffer)
+    sinalizadas |= buffer > FOLGA_ARREDONDAMENTO
+    return taxa, sinalizadas
+
+
+def auditar_tarifas(df, periodos=PERIODOS_TARIFA, tolerancia=TOLERANCIA_PADRAO, taxas=None):
+    """
+    Audita todos os períodos presentes no DataFrame (sem alterá-lo)
+
+    Args:
+        df: DataFrame com as colunas de minutos e cobrança
+        periodos: dict periodo -> (coluna de minutos, coluna de cobrança)
+        tolerancia: erro relativo aceito sobre a cobrança esperada
+        taxas: dict periodo -> taxa já estimada (None = mediana do df)
+
+    Returns:
+        DataFrame indexado pelo período com Taxa_Minuto e Inconsistencias, e
+        dict periodo -> índice (do df) das linhas sinalizadas
+    """
+    estimadas, contagens, indices = {}, {}, {}
+    for periodo, (col_minutos, col_cobranca) in periodos.items():
+        if col_minutos not in df.columns or col_cobranca not in df.columns:
+            continue
+        taxa, sinalizadas = auditar_periodo(df[col_minutos], df[col_cobranca], tolerancia,
+                                            None if taxas is None else taxas[periodo])
+        estimadas[periodo] = taxa
+        indices[periodo] = df.index[sinalizadas]
+        contagens[periodo] = len(indices[periodo])
+
+    resumo = pd.DataFrame({'Taxa_Minuto': pd.Series(estimadas, dtype='float64'),
+                           'Inconsistencias': pd.Series(contagens, dtype='int64')})
+    return resumo, indices
@@ -11,129 +11,289 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Importar do arquivo 01 (SEM .py na extensão!)
 from preparacao_ambiente import *
+preparar_etapa()
+
+# Manipulação de dados
+import pandas as pd
+import numpy as np
 
 # Biblioteca adicional para JSON
 import json
 
-# ============================================================================
-# CARREGAMENTO DOS DADOS
-# ============================================================================
+# Inspeção em blocos para arquivos que não cabem na memória
+from inspecao_blocos import inspecionar_em_blocos, TAMANHO_BLOCO_PADRAO
+
+# Formato colunar para a troca de dados entre etapas
+from armazenamento import salvar_etapa, converter_csv_em_blocos, bytes_por_linha
 
-print_section("CARREGAMENTO DOS DADOS")
+# Cardinalidade aproximada em memória fixa
+from esbocos import EsbocoCardinalidade
 
-# Carregar o arquivo
-try:
-    # Tentar caminho relativo primeiro
-    df = pd.read_csv('data/raw/telecom_churn_raw.csv')
-    print("✅ Arquivo carregado de: data/raw/telecom_churn_raw.csv")
-except FileNotFoundError:
-    print("❌ ERRO: Arquivo não encontrado em data/raw/")
-    print("   Coloque 'telecom_churn_raw.csv' na pasta data/raw/ e execute novamente.")
-    sys.exit(1)
+# Duplicatas por impressão digital de linha
+from deduplicacao import mascara_duplicadas
 
-print(f"   📊 Dimensões: {df.shape[0]:,} linhas × {df.shape[1]} colunas")
+# Gráficos renderizados fora do processo principal
+from graficos import tarefa_grafico, renderizar_graficos
+
+# Pico de memória da etapa (outputs/memoria_etapas.json) e tempos dos passos
+from memoria import registrar_memoria_etapa, linhas_por_bloco, LIMITE_MEMORIA_MB
+from instrumentacao import Passo
 
 # ============================================================================
-# INSPEÇÃO INICIAL
+# MODO DE EXECUÇÃO
 # ============================================================================
 
-print_section("INSPEÇÃO INICIAL DOS DADOS")
+CAMINHO_BRUTO = 'data/raw/telecom_churn_raw.csv'
+
+# Modo streaming: python carregamento_inspecao.py --streaming
+# (ou variável de ambiente CHURN_STREAMING=1). Com orçamento de memória
+# (CHURN_LIMITE_MEMORIA_MB), a etapa roda sempre em streaming, com o bloco
+# dimensionado pelo orçamento (CHURN_TAMANHO_BLOCO explícito vale mais)
+MODO_STREAMING = ('--streaming' in sys.argv or os.environ.get('CHURN_STREAMING') == '1'
+                  or LIMITE_MEMORIA_MB is not None)
+if 'CHURN_TAMANHO_BLOCO' in os.environ:
+    TAMANHO_BLOCO = int(os.environ['CHURN_TAMANHO_BLOCO'])
+elif LIMITE_MEMORIA_MB is not None and os.path.exists(CAMINHO_BRUTO):
+    TAMANHO_BLOCO = linhas_por_bloco(bytes_por_linha(CAMINHO_BRUTO), TAMANHO_BLOCO_PADRAO)
+else:
+    TAMANHO_BLOCO = TAMANHO_BLOCO_PADRAO
+
+# Valores únicos por esboço (HyperLogLog): --esbocos ou CHURN_ESBOCOS=1
+MODO_ESBOCOS = '--esbocos' in sys.argv or os.environ.get('CHURN_ESBOCOS') == '1'
 
-# Primeiras linhas
-print_subsection("📋 PRIMEIRAS 5 LINHAS")
-print(df.head())
 
-# Últimas linhas
-print_subsection("📋 ÚLTIMAS 5 LINHAS")
-print(df.tail())
+def imprimir_cardinalidade_esbocos(esbocos):
+    """
+    Imprime a seção de valores únicos a partir dos esboços de cardinalidade
 
-# Informações gerais
-print_subsection("ℹ️ INFORMAÇÕES GERAIS")
-print(df.info())
+    Colunas de baixa cardinalidade têm contagem exata; as demais mostram a
+    estimativa do HyperLogLog (marcada com ≈)
+    """
+    print_section("VALORES ÚNICOS POR COLUNA (ESBOÇOS)")
+
+    for col, esboco in esbocos.items():
+        n_unicos = esboco.estimativa()
+        marcador = ' ' if esboco.eh_exato else '≈'
+        print(f"📌 {col:30s} → {marcador}{n_unicos:5d} valores únicos")
+
+        # Se for categórica com poucos valores, mostrar quais são
+        if esboco.eh_exato and n_unicos <= 10 and col != 'State':
+            print(f"   Valores: {list(esboco.exatos)}")
+
+        # Se for a coluna 'State', mostrar os 5 mais frequentes
+        if col == 'State' and esboco.eh_exato:
+            top5 = dict(sorted(esboco.exatos.items(), key=lambda item: -item[1])[:5])
+            print(f"   Top 5 estados: {top5}")
+
+    return {col: esboco.estimativa() for col, esboco in esbocos.items()}
 
-# Estatísticas descritivas
-print_subsection("📈 ESTATÍSTICAS DESCRITIVAS")
-print(df.describe())
 
 # ============================================================================
-# ANÁLISE DAS COLUNAS
+# MODO STREAMING - INSPEÇÃO EM BLOCOS (UMA ÚNICA PASSADA)
 # ============================================================================
 
-print_section("ANÁLISE DETALHADA DAS COLUNAS")
+if MODO_STREAMING:
+    print_section("CARREGAMENTO DOS DADOS (MODO STREAMING)")
 
-# Tipos de dados
-print_subsection("📊 TIPOS DE DADOS")
-tipos = df.dtypes.to_frame(name='Tipo')
-tipos['Tipo'] = tipos['Tipo'].astype(str)
-print(tipos)
+    if not os.path.exists(CAMINHO_BRUTO):
+        print("❌ ERRO: Arquivo não encontrado em data/raw/")
+        print("   Coloque 'telecom_churn_raw.csv' na pasta data/raw/ e execute novamente.")
+        sys.exit(1)
 
-# Colunas numéricas e categóricas
-colunas_numericas = df.select_dtypes(include=[np.number]).columns.tolist()
-colunas_categoricas = df.select_dtypes(include=['object', 'bool']).columns.tolist()
+    print(f"📦 Lendo {CAMINHO_BRUTO} em blocos de {TAMANHO_BLOCO:,} linhas")
+    passo = Passo('inspecao_em_blocos')
+    resumo_blocos, exibicao = inspecionar_em_blocos(CAMINHO_BRUTO, tamanho_bloco=TAMANHO_BLOCO,
+                                                    cardinalidade=MODO_ESBOCOS)
 
-print(f"\n✅ Colunas numéricas ({len(colunas_numericas)}):")
-for col in colunas_numericas:
-    print(f"   • {col}")
+    total_registros = resumo_blocos['total_registros']
+    passo.concluir(linhas_saida=total_registros, duplicatas=resumo_blocos['duplicatas'])
+    print(f"   📊 Dimensões: {total_registros:,} linhas × {resumo_blocos['total_colunas']} colunas")
 
-print(f"\n✅ Colunas categóricas ({len(colunas_categoricas)}):")
-for col in colunas_categoricas:
-    print(f"   • {col}")
+    print_section("INSPEÇÃO INICIAL DOS DADOS")
 
-# ============================================================================
-# VALORES ÚNICOS
-# ============================================================================
+    print_subsection("📋 PRIMEIRAS 5 LINHAS")
+    print(exibicao['primeiras_linhas'])
 
-print_section("VALORES ÚNICOS POR COLUNA")
+    print_subsection("📋 ÚLTIMAS 5 LINHAS")
+    print(exibicao['ultimas_linhas'])
 
-for col in df.columns:
-    n_unicos = df[col].nunique()
-    print(f"📌 {col:30s} → {n_unicos:5d} valores únicos")
+    print_subsection("📈 ESTATÍSTICAS DESCRITIVAS")
+    print("   (média, desvio, mínimo e máximo exatos; quartis aproximados por esboço)")
+    print(exibicao['estatisticas'].drop(columns='CV').T)
 
-    # Se for categórica com poucos valores, mostrar quais são
-    if n_unicos <= 10 and col != 'State':
-        valores = df[col].unique()
-        print(f"   Valores: {valores}")
+    print_section("ANÁLISE DETALHADA DAS COLUNAS")
 
-    # Se for a coluna 'State', mostrar os 5 mais frequentes
-    if col == 'State':
-        top5 = df[col].value_counts().head().to_dict()
-        print(f"   Top 5 estados: {top5}")
+    print_subsection("📊 TIPOS DE DADOS")
+    tipos = pd.Series(resumo_blocos['tipos_colunas']).to_frame(name='Tipo')
+    print(tipos)
 
-# ============================================================================
-# VALORES FALTANTES
-# ============================================================================
+    colunas_numericas = resumo_blocos['lista_colunas_numericas']
+    colunas_categoricas = resumo_blocos['lista_colunas_categoricas']
 
-print_section("ANÁLISE DE VALORES FALTANTES")
+    print(f"\n✅ Colunas numéricas ({len(colunas_numericas)}):")
+    for col in colunas_numericas:
+        print(f"   • {col}")
 
-valores_faltantes = df.isnull().sum()
-pct_faltantes = (df.isnull().sum() / len(df)) * 100
+    print(f"\n✅ Colunas categóricas ({len(colunas_categoricas)}):")
+    for col in colunas_categoricas:
+        print(f"   • {col}")
 
-resumo_faltantes = pd.DataFrame({
-    'Coluna': valores_faltantes.index,
-    'Valores Faltantes': valores_faltantes.values,
-    'Percentual (%)': pct_faltantes.values
-})
+    if MODO_ESBOCOS:
+        valores_unicos = imprimir_cardinalidade_esbocos(exibicao['cardinalidade'])
 
-print(resumo_faltantes[resumo_faltantes['Valores Faltantes'] > 0])
+    print_section("ANÁLISE DE VALORES FALTANTES")
 
-if valores_faltantes.sum() == 0:
-    print("✅ EXCELENTE! Não há valores faltantes no dataset.")
-else:
-    print(f"⚠️  Total de valores faltantes: {valores_faltantes.sum()}")
+    valores_faltantes = pd.Series(resumo_blocos['faltantes_por_coluna'])
+    print(valores_faltantes[valores_faltantes > 0])
 
-# ============================================================================
-# DUPLICATAS
-# ============================================================================
+    if valores_faltantes.sum() == 0:
+        print("✅ EXCELENTE! Não há valores faltantes no dataset.")
+    else:
+        print(f"⚠️  Total de valores faltantes: {valores_faltantes.sum()}")
 
-print_section("ANÁLISE DE DUPLICATAS")
+    print_section("ANÁLISE DE DUPLICATAS")
 
-duplicatas = df.duplicated().sum()
-print(f"🔍 Número de linhas duplicadas: {duplicatas}")
+    duplicatas = resumo_blocos['duplicatas']
+    print(f"🔍 Número de linhas duplicadas: {duplicatas}")
+
+    if duplicatas == 0:
+        print("✅ Não há linhas duplicadas no dataset.")
+    else:
+        print(f"⚠️  Encontradas {duplicatas} linhas duplicadas.")
+
+    churn_counts = pd.Series({False: resumo_blocos['clientes_permaneceram'],
+                              True: resumo_blocos['clientes_sairam']})
+    churn_pct = churn_counts / churn_counts.sum() * 100
 
-if duplicatas == 0:
-    print("✅ Não há linhas duplicadas no dataset.")
 else:
-    print(f"⚠️  Encontradas {duplicatas} linhas duplicadas.")
+    # ========================================================================
+    # CARREGAMENTO DOS DADOS
+    # ========================================================================
+
+    print_section("CARREGAMENTO DOS DADOS")
+
+    # Carregar o arquivo
+    passo = Passo('carga')
+    try:
+        # Tentar caminho relativo primeiro
+        df = pd.read_csv(CAMINHO_BRUTO)
+        print("✅ Arquivo carregado de: data/raw/telecom_churn_raw.csv")
+    except FileNotFoundError:
+        print("❌ ERRO: Arquivo não encontrado em data/raw/")
+        print("   Coloque 'telecom_churn_raw.csv' na pasta data/raw/ e execute novamente.")
+        sys.exit(1)
+
+    total_registros = len(df)
+    passo.concluir(linhas_saida=total_registros)
+    print(f"   📊 Dimensões: {df.shape[0]:,} linhas × {df.shape[1]} colunas")
+
+    # ========================================================================
+    # INSPEÇÃO INICIAL
+    # ========================================================================
+
+    print_section("INSPEÇÃO INICIAL DOS DADOS")
+
+    # Primeiras linhas
+    print_subsection("📋 PRIMEIRAS 5 LINHAS")
+    print(df.head())
+
+    # Últimas linhas
+    print_subsection("📋 ÚLTIMAS 5 LINHAS")
+    print(df.tail())
+
+    # Informações gerais
+    print_subsection("ℹ️ INFORMAÇÕES GERAIS")
+    print(df.info())
+
+    # Estatísticas descritivas
+    print_subsection("📈 ESTATÍSTICAS DESCRITIVAS")
+    print(df.describe())
+
+    # ========================================================================
+    # ANÁLISE DAS COLUNAS
+    # ========================================================================
+
+    print_section("ANÁLISE DETALHADA DAS COLUNAS")
+
+    # Tipos de dados
+    print_subsection("📊 TIPOS DE DADOS")
+    tipos = df.dtypes.to_frame(name='Tipo')
+    tipos['Tipo'] = tipos['Tipo'].astype(str)
+    print(tipos)
+
+    # Colunas numéricas e categóricas
+    colunas_numericas = df.select_dtypes(include=[np.number]).columns.tolist()
+    colunas_categoricas = df.select_dtypes(include=['object', 'bool']).columns.tolist()
+
+    print(f"\n✅ Colunas numéricas ({len(colunas_numericas)}):")
+    for col in colunas_numericas:
+        print(f"   • {col}")
+
+    print(f"\n✅ Colunas categóricas ({len(colunas_categoricas)}):")
+    for col in colunas_categoricas:
+        print(f"   • {col}")
+
+    # ========================================================================
+    # VALORES ÚNICOS
+    # ========================================================================
+
+    if MODO_ESBOCOS:
+        valores_unicos = imprimir_cardinalidade_esbocos(
+            {col: EsbocoCardinalidade().adicionar(df[col]) for col in df.columns})
+    else:
+        print_section("VALORES ÚNICOS POR COLUNA")
+
+        for col in df.columns:
+            n_unicos = df[col].nunique()
+            print(f"📌 {col:30s} → {n_unicos:5d} valores únicos")
+
+            # Se for categórica com poucos valores, mostrar quais são
+            if n_unicos <= 10 and col != 'State':
+                valores = df[col].unique()
+                print(f"   Valores: {valores}")
+
+            # Se for a coluna 'State', mostrar os 5 mais frequentes
+            if col == 'State':
+                top5 = df[col].value_counts().head().to_dict()
+                print(f"   Top 5 estados: {top5}")
+
+    # ========================================================================
+    # VALORES FALTANTES
+    # ========================================================================
+
+    print_section("ANÁLISE DE VALORES FALTANTES")
+
+    valores_faltantes = df.isnull().sum()
+    pct_faltantes = (df.isnull().sum() / len(df)) * 100
+
+    resumo_faltantes = pd.DataFrame({
+        'Coluna': valores_faltantes.index,
+        'Valores Faltantes': valores_faltantes.values,
+        'Percentual (%)': pct_faltantes.values
+    })
+
+    print(resumo_faltantes[resumo_faltantes['Valores Faltantes'] > 0])
+
+    if valores_faltantes.sum() == 0:
+        print("✅ EXCELENTE! Não há valores faltantes no dataset.")
+    else:
+        print(f"⚠️  Total de valores faltantes: {valores_faltantes.sum()}")
+
+    # ========================================================================
+    # DUPLICATAS
+    # ========================================================================
+
+    print_section("ANÁLISE DE DUPLICATAS")
+
+    passo = Passo('deduplicacao', linhas_entrada=len(df))
+    duplicatas = int(mascara_duplicadas(df).sum())
+    passo.concluir(duplicatas=duplicatas)
+    print(f"🔍 Número de linhas duplicadas: {duplicatas}")
+
+    if duplicatas == 0:
+        print("✅ Não há linhas duplicadas no dataset.")
+    else:
+        print(f"⚠️  Encontradas {duplicatas} linhas duplicadas.")
 
 # ============================================================================
 # ANÁLISE DA VARIÁVEL ALVO (CHURN)
@@ -141,8 +301,9 @@ else:
 
 print_section("ANÁLISE DA VARIÁVEL ALVO - CHURN")
 
-churn_counts = df['Churn'].value_counts()
-churn_pct = df['Churn'].value_counts(normalize=True) * 100
+if not MODO_STREAMING:
+    churn_counts = df['Churn'].value_counts()
+    churn_pct = df['Churn'].value_counts(normalize=True) * 100
 
 print("📊 Distribuição de Churn:")
 print(f"\n   Clientes que PERMANECERAM (False): {churn_counts.get(False, 0):,} ({churn_pct.get(False, 0):.2f}%)")
@@ -164,33 +325,11 @@ else:
 
 print_subsection("📊 GERANDO VISUALIZAÇÃO DE CHURN")
 
-fig, axes = plt.subplots(1, 2, figsize=(14, 5))
-
-# Gráfico de barras
-axes[0].bar(['Permaneceu', 'Saiu'],
-            [churn_counts.get(False, 0), churn_counts.get(True, 0)],
-            color=[COLORS['churn_no'], COLORS['churn_yes']])
-axes[0].set_title('Distribuição de Churn (Contagem)', fontsize=14, fontweight='bold')
-axes[0].set_ylabel('Número de Clientes')
-axes[0].grid(axis='y', alpha=0.3)
-
-# Adicionar valores nas barras
-for i, v in enumerate([churn_counts.get(False, 0), churn_counts.get(True, 0)]):
-    axes[0].text(i, v + 30, f'{v:,}', ha='center', fontweight='bold')
-
-# Gráfico de pizza
-axes[1].pie([churn_counts.get(False, 0), churn_counts.get(True, 0)],
-            labels=['Permaneceu', 'Saiu'],
-            autopct='%1.1f%%',
-            colors=[COLORS['churn_no'], COLORS['churn_yes']],
-            startangle=90,
-            explode=(0, 0.1))
-axes[1].set_title('Proporção de Churn', fontsize=14, fontweight='bold')
-
-plt.tight_layout()
-plt.savefig('outputs/plots/01_distribuicao_churn.png', dpi=300, bbox_inches='tight')
-print("   ✅ Gráfico salvo: outputs/plots/01_distribuicao_churn.png")
-plt.close()
+tarefa = tarefa_grafico('distribuicao_churn', 'outputs/plots/01_distribuicao_churn.png',
+                        permaneceu=int(churn_counts.get(False, 0)),
+                        saiu=int(churn_counts.get(True, 0)))
+for caminho, _ in renderizar_graficos([tarefa]):
+    print(f"   ✅ Gráfico salvo: {caminho}")
 
 # ============================================================================
 # SALVAR INFORMAÇÕES DA INSPEÇÃO
@@ -200,8 +339,8 @@ print_section("SALVANDO RESUMO DA INSPEÇÃO")
 
 # Criar resumo
 resumo = {
-    'total_registros': len(df),
-    'total_colunas': len(df.columns),
+    'total_registros': int(total_registros),
+    'total_colunas': len(colunas_numericas) + len(colunas_categoricas),
     'lista_colunas_numericas': colunas_numericas,
     'lista_colunas_categoricas': colunas_categoricas,
     'colunas_numericas': len(colunas_numericas),
@@ -213,19 +352,39 @@ resumo = {
     'clientes_sairam': int(churn_counts.get(True, 0))
 }
 
+# No modo de esboços, incluir a cardinalidade (exata ou estimada) por coluna
+if MODO_ESBOCOS:
+    resumo['valores_unicos'] = {col: int(n) for col, n in valores_unicos.items()}
+
+# No modo streaming, incluir tipos inferidos e faltantes por coluna
+if MODO_STREAMING:
+    resumo['tipos_colunas'] = resumo_blocos['tipos_colunas']
+    resumo['faltantes_por_coluna'] = resumo_blocos['faltantes_por_coluna']
+
 # Salvar como JSON
 with open('outputs/metrics/01_resumo_inspecao.json', 'w') as f:
     json.dump(resumo, f, indent=4)
 
 print("✅ Resumo salvo: outputs/metrics/01_resumo_inspecao.json")
 
-# Salvar DataFrame processado
-df.to_csv('data/processed/02_dados_inspecionados.csv', index=False)
-print("✅ Dados salvos: data/processed/02_dados_inspecionados.csv")
+# Salvar DataFrame processado (no modo streaming, converter bloco a bloco
+# com os tipos inferidos, sem carregar o arquivo na memória)
+passo = Passo('exportacao', linhas_entrada=total_registros)
+if MODO_STREAMING:
+    caminho_salvo = converter_csv_em_blocos(CAMINHO_BRUTO, 'data/processed/02_dados_inspecionados',
+                                            resumo_blocos['tipos_colunas'], TAMANHO_BLOCO,
+                                            faltantes=resumo_blocos['faltantes_por_coluna'],
+                                            intervalos=resumo_blocos['intervalos_por_coluna'])
+else:
+    caminho_salvo = salvar_etapa(df, 'data/processed/02_dados_inspecionados')
+passo.concluir()
+print(f"✅ Dados salvos: {caminho_salvo}")
 
 # Registrar no log
 salvar_info_execucao("carregamento_inspecao.py",
-                     f"Dados carregados: {len(df)} linhas, Churn Rate: {churn_rate:.2f}%")
+                     f"Dados carregados: {total_registros} linhas, Churn Rate: {churn_rate:.2f}%")
+
+registrar_memoria_etapa("carregamento_inspecao.py")
 
 print("\n🎉 INSPEÇÃO INICIAL CONCLUÍDA COM SUCESSO!")
 
@@ -0,0 +1,102 @@
+# ============================================================================
+# CORRELAÇÃO EM BLOCOS (MÉDIAS E CO-MOMENTOS MESCLÁVEIS)
+# ============================================================================
+#
+# Para cada bloco calcula n, as médias e a matriz de co-momentos centrados
+# C = Σ (x - x̄)(y - ȳ), e junta com o acumulado pela fórmula de Chan
+# (versão em lote do algoritmo de Welford):
+#     δ = x̄_b - x̄_a
+#     x̄ = x̄_a + δ·n_b / n
+#     C = C_a + C_b + δδᵀ·n_a·n_b / n
+# A memória é k×k (k colunas), independente do número de linhas, e
+# acumuladores de processos diferentes podem ser mesclados.
+#
+# Linhas com nulo em alguma das colunas são ignoradas (o DataFrame.corr
+# descarta por par de colunas; sem nulos os resultados coincidem até a
+# precisão de ponto flutuante).
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+
+# Linhas convertidas para float64 de cada vez (limita a cópia temporária)
+TAMANHO_FATIA = 1_000_000
+
+
+class AcumuladorCorrelacao:
+    """
+    Acumulador mesclável de médias e co-momentos de um conjunto de colunas
+
+    Args:
+        colunas: colunas numéricas (ou booleanas) a correlacionar
+    """
+
+    def __init__(self, colunas):
+        self.colunas = list(colunas)
+        k = len(self.colunas)
+        self.n = 0
+        self.medias = np.zeros(k)
+        self.comomentos = np.zeros((k, k))
+
+    def _mesclar_momentos(self, n_b, medias_b, comomentos_b):
+        if n_b == 0:
+            return
+        if self.n == 0:
+            self.n, self.medias, self.comomentos = n_b, medias_b, comomentos_b
+            return
+        n = self.n + n_b
+        delta = medias_b - self.medias
+        self.medias = self.medias + delta * (n_b / n)
+        self.comomentos = self.comomentos + comomentos_b + np.outer(delta, delta) * (self.n * n_b / n)
+        self.n = n
+
+    def adicionar(self, bloco):
+        """
+        Acumula um bloco (DataFrame com as colunas do acumulador)
+        """
+        # Seleção das colunas uma única vez; as fatias são só visões dela
+        selecionadas = bloco[self.colunas]
+        for inicio in range(0, len(bloco), TAMANHO_FATIA):
+            valores = selecionadas.iloc[inicio:inicio + TAMANHO_FATIA].to_numpy(dtype=np.float64)
+            valores = valores[~np.isnan(valores).any(axis=1)]
+            if len(valores) == 0:
+                continue
+            medias = valores.mean(axis=0)
+            centrados = valores - medias
+            self._mesclar_momentos(len(valores), medias, centrados.T @ centrados)
+        return self
+
+    def mesclar(self, outro):
+        """
+        Mescla outro acumulador (mesmas colunas) neste, no lugar
+        """
+        if outro.colunas != self.colunas:
+            raise ValueError("Acumuladores com colunas diferentes não podem ser mesclados")
+        self._mesclar_momentos(outro.n, outro.medias, outro.comomentos)
+        return self
+
+    def covariancia(self):
+        """
+        Matriz de covariância amostral (n - 1)
+        """
+        return pd.DataFrame(self.comomentos / (self.n - 1), index=self.colunas, columns=self.colunas)
+
+    def correlacao(self):
+        """
+        Matriz de correlação de Pearson (colunas constantes dão NaN)
+        """
+        desvios = np.sqrt(np.diag(self.comomentos))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matriz = self.comomentos / np.outer(desvios, desvios)
+        np.fill_diagonal(matriz, np.where(desvios > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(matriz, -1, 1), index=self.colunas, columns=self.colunas)
+
+
+def correlacao_em_blocos(blocos, colunas):
+    """
+    Matriz de correlação de um iterável de blocos, em memória constante
+    """
+    acumulador = AcumuladorCorrelacao(colunas)
+    for bloco in blocos:
+        acumulador.adicionar(bloco)
+    return acumulador.correlacao()
@@ -0,0 +1,188 @@
+# ============================================================================
+# CUBO DE CHURN: AGREGADOS POR DIMENSÃO EM UMA PASSADA
+# ============================================================================
+#
+# Cada dimensão é codificada uma única vez em inteiros (códigos da categoria
+# ou factorize ordenado) e todos os agregados saem de np.bincount sobre os
+# códigos: número de clientes, churners e a soma de cada medida (receita,
+# minutos...). Pares de dimensões usam o código combinado
+# codigo_1 × n_2 + codigo_2.
+#
+# As tabelas de churn (Churners, Total, Taxa_Churn, Taxa_Churn_%) são
+# leituras do cubo, com a mesma ordem e os mesmos valores de
+# df.groupby(dim, observed=True).agg({'Churn': ['sum', 'count', 'mean']}).
+#
+# Os agregados de cubos de partes diferentes da base (ex: um por processo)
+# são somados célula a célula por mesclar_agregados.
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+
+
+def codificar(valores):
+    """
+    Códigos inteiros e rótulos de uma coluna (nulos recebem -1)
+
+    Categóricas usam a ordem das categorias (os rótulos mantêm o tipo
+    categórico, para que agregados mesclados preservem essa ordem); as
+    demais, os valores ordenados (mesma ordem do groupby).
+    """
+    serie = pd.Series(valores)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), pd.CategoricalIndex(serie.cat.categories, dtype=serie.dtype)
+    codigos, rotulos = pd.factorize(serie, sort=True)
+    return codigos, pd.Index(rotulos)
+
+
+class CuboChurn:
+    """
+    Contagens, churners e somas de medidas por dimensão e por par de
+    dimensões
+
+    Args:
+        churn: coluna booleana de churn
+        medidas: dict nome -> coluna numérica a somar por célula
+    """
+
+    def __init__(self, churn, medidas=None):
+        self._churn = np.asarray(churn, dtype=bool)
+        self._medidas = {nome: np.asarray(valores, dtype=np.float64)
+                         for nome, valores in (medidas or {}).items()}
+        self._codigos = {}
+        self._rotulos = {}
+        self.agregados = {}
+
+    def _agregar(self, codigos, indice):
+        validos = codigos >= 0
+        codigos_validos = codigos[validos]
+        k = len(indice)
+        tabela = pd.DataFrame({
+            'Total': np.bincount(codigos_validos, minlength=k),
+            'Churners': np.bincount(codigos[validos & self._churn], minlength=k)
+        }, index=indice)
+        for nome, valores in self._medidas.items():
+            tabela[nome] = np.bincount(codigos_validos, weights=valores[validos], minlength=k)
+        # Só as células observadas (como groupby(observed=True))
+        return tabela[tabela['Total'] > 0]
+
+    def adicionar_dimensao(self, nome, valores):
+        """
+        Codifica a coluna e calcula os agregados da dimensão
+        """
+        codigos, rotulos = codificar(valores)
+        self._codigos[nome] = codigos
+        self._rotulos[nome] = rotulos
+        self.agregados[nome] = self._agregar(codigos, rotulos.rename(nome))
+        return self
+
+    def adicionar_par(self, dim_1, dim_2):
+        """
+        Calcula os agregados do cruzamento de duas dimensões já adicionadas
+        """
+        n_2 = len(self._rotulos[dim_2])
+        codigos_1, codigos_2 = self._codigos[dim_1], self._codigos[dim_2]
+        codigos = np.where((codigos_1 >= 0) & (codigos_2 >= 0),
+                           codigos_1.astype(np.int64) * n_2 + codigos_2, -1)
+        indice = pd.MultiIndex.from_product([self._rotulos[dim_1], self._rotulos[dim_2]],
+                                            names=[dim_1, dim_2])
+        self.agregados[(dim_1, dim_2)] = self._agregar(codigos, indice)
+        return self
+
+    def agregado(self, chave):
+        """
+        DataFrame com Total, Churners e as medidas de uma dimensão (nome) ou
+        de um par (tupla)
+        """
+        return self.agregados[chave]
+
+    def tabela_churn(self, chave, nome_total='Total', casas=4):
+        """
+        Tabela de churn de uma dimensão ou par (ver tabela_churn)
+        """
+        return tabela_churn(self.agregados[chave], nome_total, casas)
+
+    def contagens_status(self, chave):
+        """
+        Clientes por status (Permaneceu / Saiu), no formato de
+        pd.crosstab(dim, df['Churn_Label'])
+        """
+        agregado = self.agregados[chave]
+        tabela = pd.DataFrame({
+            'Permaneceu': agregado['Total'] - agregado['Churners'],
+            'Saiu': agregado['Churners']
+        })
+        tabela.columns.name = 'Churn_Label'
+        return tabela
+
+    def percentuais_status(self, chave):
+        """
+        Percentual de cada status na célula, no formato de
+        pd.crosstab(dim, df['Churn'], normalize='index') * 100
+        """
+        agregado = self.agregados[chave]
+        taxa = agregado['Churners'] / agregado['Total'] * 100
+        tabela = pd.DataFrame({False: 100 - taxa, True: taxa})
+        tabela.columns.name = 'Churn'
+        return tabela
+
+
+def tabela_churn(agregado, nome_total='Total', casas=4):
+    """
+    Tabela Churners / Total / Taxa_Churn / Taxa_Churn_% a partir de um
+    agregado com colunas Total e Churners (taxa arredondada em `casas` antes
+    do percentual, como nas tabelas publicadas; None mantém a taxa sem
+    arredondar)
+    """
+    taxa = agregado['Churners'] / agregado['Total']
+    tabela = pd.DataFrame({
+        'Churners': agregado['Churners'],
+        nome_total: agregado['Total'],
+        'Taxa_Churn': taxa if casas is None else taxa.round(casas)
+    })
+    tabela['Taxa_Churn_%'] = tabela['Taxa_Churn'] * 100
+    return tabela
+
+
+def mesclar_agregados(*grupos):
+    """
+    Soma os agregados (dict chave -> DataFrame, como CuboChurn.agregados) de
+    partes diferentes da base
+
+    As células ficam na ordem do groupby sobre a base inteira: categorias na
+    ordem da categoria, demais valores ordenados.
+
+    Returns:
+        dict chave -> DataFrame com Total, Churners e as medidas somados
+    """
+    partes = {}
+    for grupo in grupos:
+        for chave, agregado in grupo.items():
+            partes.setdefault(chave, []).append(agregado)
+    resultado = {}
+    for chave, agregados in partes.items():
+        soma = pd.concat(agregados)
+        resultado[chave] = soma.groupby(level=list(range(soma.index.nlevels)), observed=True).sum()
+    return resultado
+
+
+def montar_cubo(df, dimensoes, pares=(), medidas=None, coluna_churn='Churn'):
+    """
+    Monta o cubo de churn de um DataFrame
+
+    Args:
+        df: DataFrame com a coluna de churn e as dimensões
+        dimensoes: colunas a usar como dimensões
+        pares: tuplas (dim_1, dim_2) a cruzar (ambas em `dimensoes`)
+        medidas: colunas numéricas a somar por célula
+        coluna_churn: coluna booleana de churn
+
+    Returns:
+        CuboChurn
+    """
+    cubo = CuboChurn(df[coluna_churn], {col: df[col] for col in (medidas or [])})
+    for dim in dimensoes:
+        cubo.adicionar_dimensao(dim, df[dim])
+    for dim_1, dim_2 in pares:
+        cubo.adicionar_par(dim_1, dim_2)
+    return cubo
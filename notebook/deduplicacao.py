@@ -0,0 +1,304 @@
+# ============================================================================
+# DEDUPLICAÇÃO FORA DA MEMÓRIA POR IMPRESSÃO DIGITAL DE LINHA
+# ============================================================================
+#
+# Cada linha vira uma impressão digital de 128 bits (dois hashes de 64 bits
+# com chaves diferentes). As impressões são distribuídas em partições no
+# disco pelos bits altos do primeiro hash; cada partição é ordenada sozinha
+# para achar as repetições. Só os índices das linhas duplicadas ficam na
+# memória no final, e a memória de pico é de uma partição (24 bytes por
+# linha / número de partições), nunca da base inteira.
+#
+# Mantém a primeira ocorrência, como DataFrame.drop_duplicates().
+#
+# Uso (combinar extratos mensais):
+#   python notebook/deduplicacao.py data/raw/jan.csv data/raw/fev.csv \
+#       --saida data/processed/02_dados_inspecionados
+# Autoverificação (duplicatas entre blocos com tipos diferentes):
+#   python notebook/deduplicacao.py --verificar
+# ============================================================================
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import EscritorBlocos, ler_em_blocos
+
+# Chave do segundo hash (a do primeiro é a padrão do pandas)
+CHAVE_HASH_SECUNDARIA = 'churn-telecom-02'
+
+# Registro gravado nas partições: hash 1, hash 2, índice global da linha
+TIPO_REGISTRO = np.dtype([('h1', '<u8'), ('h2', '<u8'), ('linha', '<i8')])
+
+# Número padrão de partições no disco (potência de 2)
+PARTICOES_PADRAO = 64
+
+# Tamanho padrão do bloco de leitura
+TAMANHO_BLOCO_PADRAO = 100_000
+
+
+def normalizar_para_hash(serie):
+    """
+    Uma única representação por coluna, estável entre blocos, para o hash:
+    números (exceto bool) viram float64 (1 e 1.0 têm o mesmo hash mesmo se
+    um bloco tiver nulos) e o resto vira texto (True de uma coluna bool e
+    True de uma coluna object, lida assim num bloco com nulos, têm o mesmo
+    hash); nulos continuam nulos
+
+    Colunas bool e category viram category com rótulos de texto (o hash de
+    uma category é o dos seus valores, sem converter linha a linha).
+    """
+    if pd.api.types.is_bool_dtype(serie):
+        codigos = serie.astype('Int8').fillna(-1).to_numpy('int8')
+        return pd.Series(pd.Categorical.from_codes(codigos, ['False', 'True']), index=serie.index)
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype('float64')
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.rename_categories(serie.cat.categories.astype(str))
+    if isinstance(serie.dtype, pd.StringDtype):
+        return serie
+    if pd.api.types.infer_dtype(serie, skipna=True) in ('string', 'empty'):
+        return serie
+    return serie.astype(str).where(serie.notna())
+
+
+def _normalizar_para_hash(bloco):
+    """
+    Aplica normalizar_para_hash a todas as colunas do bloco
+    """
+    return pd.DataFrame({col: normalizar_para_hash(bloco[col]) for col in bloco.columns})
+
+
+def impressoes_digitais(bloco):
+    """
+    Impressões digitais de 128 bits das linhas de um bloco
+
+    Returns:
+        Tupla (h1, h2) de arrays uint64
+    """
+    normalizado = _normalizar_para_hash(bloco)
+    h1 = pd.util.hash_pandas_object(normalizado, index=False).to_numpy()
+    h2 = pd.util.hash_pandas_object(normalizado, index=False, hash_key=CHAVE_HASH_SECUNDARIA).to_numpy()
+    return h1, h2
+
+
+def mascara_duplicadas(df):
+    """
+    Máscara das linhas repetidas (exceto a primeira ocorrência) usando as
+    impressões digitais, para DataFrames em memória
+    """
+    h1, h2 = impressoes_digitais(df)
+    return pd.DataFrame({'h1': h1, 'h2': h2}).duplicated().to_numpy()
+
+
+def remover_duplicatas(df):
+    """
+    Remove linhas duplicadas de um DataFrame em memória
+
+    Returns:
+        Tupla (DataFrame sem duplicatas, número de duplicatas removidas)
+    """
+    duplicadas = mascara_duplicadas(df)
+    n_duplicadas = int(duplicadas.sum())
+    if n_duplicadas == 0:
+        return df, 0
+    return df[~duplicadas], n_duplicadas
+
+
+class DeduplicadorParticionado:
+    """
+    Acha linhas duplicadas em bases maiores que a memória
+
+    Uso: registrar() cada bloco na ordem, finalizar() uma vez e depois
+    filtrar() os mesmos blocos na mesma ordem (ou usar só a contagem).
+
+    Args:
+        n_particoes: número de partições no disco (potência de 2)
+        pasta: pasta temporária das partições (padrão: tempfile)
+    """
+
+    def __init__(self, n_particoes=PARTICOES_PADRAO, pasta=None):
+        if n_particoes & (n_particoes - 1):
+            raise ValueError("n_particoes deve ser potência de 2")
+        self.n_particoes = n_particoes
+        self._bits = max(n_particoes.bit_length() - 1, 0)
+        self.pasta = tempfile.mkdtemp(prefix='dedup_', dir=pasta)
+        self._arquivos = [open(os.path.join(self.pasta, f'particao_{i:04d}.bin'), 'wb')
+                          for i in range(n_particoes)]
+        self.total_linhas = 0
+        self.linhas_duplicadas = None
+
+    def registrar(self, bloco):
+        """
+        Calcula as impressões do bloco e grava cada uma na sua partição
+        """
+        h1, h2 = impressoes_digitais(bloco)
+        registros = np.empty(len(bloco), dtype=TIPO_REGISTRO)
+        registros['h1'] = h1
+        registros['h2'] = h2
+        registros['linha'] = np.arange(self.total_linhas, self.total_linhas + len(bloco))
+        self.total_linhas += len(bloco)
+
+        if self._bits == 0:
+            self._arquivos[0].write(registros.tobytes())
+            return
+
+        particoes = (h1 >> np.uint64(64 - self._bits)).astype(np.int64)
+        ordem = np.argsort(particoes, kind='stable')
+        registros = registros[ordem]
+        limites = np.searchsorted(particoes[ordem], np.arange(self.n_particoes + 1))
+        for i in range(self.n_particoes):
+            if limites[i] < limites[i + 1]:
+                self._arquivos[i].write(registros[limites[i]:limites[i + 1]].tobytes())
+
+    def finalizar(self):
+        """
+        Ordena cada partição e coleta os índices globais das linhas repetidas
+
+        Returns:
+            Número de duplicatas
+        """
+        for arquivo in self._arquivos:
+            arquivo.close()
+
+        duplicadas = []
+        for i in range(self.n_particoes):
+            caminho = os.path.join(self.pasta, f'particao_{i:04d}.bin')
+            registros = np.fromfile(caminho, dtype=TIPO_REGISTRO)
+            os.remove(caminho)
+            if len(registros) < 2:
+                continue
+            registros = registros[np.lexsort((registros['linha'], registros['h2'], registros['h1']))]
+            repetida = ((registros['h1'][1:] == registros['h1'][:-1]) &
+                        (registros['h2'][1:] == registros['h2'][:-1]))
+            duplicadas.append(registros['linha'][1:][repetida])
+
+        shutil.rmtree(self.pasta, ignore_errors=True)
+        self.linhas_duplicadas = np.sort(np.concatenate(duplicadas)) if duplicadas else np.empty(0, np.int64)
+        return len(self.linhas_duplicadas)
+
+    def filtrar(self, bloco, deslocamento):
+        """
+        Remove do bloco as linhas duplicadas
+
+        Args:
+            bloco: bloco na mesma ordem usada em registrar()
+            deslocamento: índice global da primeira linha do bloco
+        """
+        inicio, fim = np.searchsorted(self.linhas_duplicadas, [deslocamento, deslocamento + len(bloco)])
+        if inicio == fim:
+            return bloco
+        manter = np.ones(len(bloco), dtype=bool)
+        manter[self.linhas_duplicadas[inicio:fim] - deslocamento] = False
+        return bloco[manter]
+
+
+def deduplicar_arquivos(caminhos, caminho_saida_base, tamanho_bloco=TAMANHO_BLOCO_PADRAO,
+                        n_particoes=PARTICOES_PADRAO):
+    """
+    Concatena e deduplica arquivos (.csv/.parquet) em duas passadas de
+    memória limitada, gravando o resultado no formato intermediário
+
+    Returns:
+        dict com 'registros_originais', 'duplicatas_removidas',
+        'registros_finais' e 'arquivo'
+    """
+    deduplicador = DeduplicadorParticionado(n_particoes)
+    for caminho in caminhos:
+        for bloco in ler_em_blocos(caminho, tamanho_bloco):
+            deduplicador.registrar(bloco)
+    duplicatas = deduplicador.finalizar()
+
+    deslocamento = 0
+    with EscritorBlocos(caminho_saida_base) as escritor:
+        for caminho in caminhos:
+            for bloco in ler_em_blocos(caminho, tamanho_bloco):
+                escritor.escrever(deduplicador.filtrar(bloco, deslocamento))
+                deslocamento += len(bloco)
+
+    return {
+        'registros_originais': int(deduplicador.total_linhas),
+        'duplicatas_removidas': int(duplicatas),
+        'registros_finais': int(escritor.linhas),
+        'arquivo': escritor.caminho
+    }
+
+
+def verificar():
+    """
+    Deduplica em blocos de 3 linhas um CSV com duplicatas que atravessam
+    blocos, onde um bloco tem nulos no Churn (lido como object) e outro nas
+    ligações (lidas como float64), e compara com DataFrame.duplicated() do
+    arquivo inteiro
+
+    Returns:
+        Lista de problemas (vazia = ok)
+    """
+    texto = ("State,Customer service calls,Churn\n"
+             "CA,1,True\n"
+             "TX,2,False\n"
+             "AZ,,True\n"
+             "CA,1,True\n"
+             "NY,3,\n"
+             "TX,2,False\n")
+    pasta = tempfile.mkdtemp(prefix='dedup_verificacao_')
+    problemas = []
+    try:
+        caminho = os.path.join(pasta, 'base.csv')
+        with open(caminho, 'w') as f:
+            f.write(texto)
+        esperado = int(pd.read_csv(caminho).duplicated().sum())
+
+        relatorio = deduplicar_arquivos([caminho], os.path.join(pasta, 'saida'), tamanho_bloco=3,
+                                        n_particoes=4)
+        if relatorio['duplicatas_removidas'] != esperado:
+            problemas.append(f"em blocos: {relatorio['duplicatas_removidas']} duplicatas, "
+                             f"esperado {esperado}")
+        em_memoria = int(mascara_duplicadas(pd.read_csv(caminho)).sum())
+        if em_memoria != esperado:
+            problemas.append(f"em memória: {em_memoria} duplicatas, esperado {esperado}")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return problemas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Deduplica extratos grandes em blocos')
+    parser.add_argument('entradas', nargs='*', help='Arquivos .csv ou .parquet, na ordem')
+    parser.add_argument('--saida', help='Destino sem extensão')
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_PADRAO)
+    parser.add_argument('--particoes', type=int, default=PARTICOES_PADRAO)
+    parser.add_argument('--relatorio', default='outputs/metrics/02_relatorio_deduplicacao.json')
+    parser.add_argument('--verificar', action='store_true',
+                        help='Confere a contagem com duplicatas entre blocos de tipos diferentes')
+    args = parser.parse_args()
+
+    if args.verificar:
+        problemas = verificar()
+        if problemas:
+            print("❌ Contagem de duplicatas divergente:")
+            for texto in problemas:
+                print(f"   • {texto}")
+            sys.exit(1)
+        print("✅ Duplicatas entre blocos contadas como no arquivo inteiro")
+        sys.exit(0)
+    if not args.entradas or not args.saida:
+        parser.error('informe os arquivos de entrada e --saida (ou use --verificar)')
+
+    relatorio = deduplicar_arquivos(args.entradas, args.saida, args.tamanho_bloco, args.particoes)
+    print(f"✅ {relatorio['registros_originais']:,} linhas lidas, "
+          f"{relatorio['duplicatas_removidas']:,} duplicatas removidas")
+    print(f"✅ Resultado: {relatorio['arquivo']}")
+
+    os.makedirs(os.path.dirname(args.relatorio), exist_ok=True)
+    with open(args.relatorio, 'w') as f:
+        json.dump(relatorio, f, indent=4)
+    print(f"✅ Relatório salvo: {args.relatorio}")
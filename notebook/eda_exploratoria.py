@@ -1,4 +1,23 @@
 from preparacao_ambiente import *
+import os
+import sys
+preparar_etapa()
+
+import pandas as pd
+import numpy as np
+from armazem_colunas import carregar_colunas
+from armazenamento import EXPORTAR_CSV
+from esquema import (COLUNAS_CATEGORICAS, COLUNAS_CORRELACAO, VARIAVEIS_PRINCIPAIS,
+                     VARIAVEIS_HEATMAP, VARIAVEIS_COMPARACAO, VARIAVEIS_BOXPLOT,
+                     ORDEM_RISCO, TIPO_CHURN_LABEL)
+from graficos import (tarefa_grafico, renderizar_graficos, resumo_histograma,
+                      estatisticas_boxplot)
+from cubo_churn import montar_cubo
+from pontuacao_risco import pontuar
+from correlacao_streaming import AcumuladorCorrelacao
+from estatisticas_streaming import ResumoNumerico
+from memoria import registrar_memoria_etapa
+from instrumentacao import Passo
 import json
 
 # ============================================================================
@@ -7,15 +26,18 @@ import json
 
 print_section("ANÁLISE EXPLORATÓRIA DE DADOS (EDA)")
 
-df = pd.read_csv('data/processed/03_dados_limpos.csv')
+passo = Passo('carga')
+# Colunas mapeadas do armazém colunar (sem cópia; ver armazem_colunas.py)
+df = carregar_colunas('data/processed/03_dados_limpos')
+passo.concluir(linhas_saida=len(df))
 print(f"✅ Dados limpos carregados: {len(df):,} linhas × {df.shape[1]} colunas")
 
 # Converter Churn para valores mais descritivos para visualização
-df['Churn_Label'] = df['Churn'].map({True: 'Saiu', False: 'Permaneceu'})
+df['Churn_Label'] = df['Churn'].map({True: 'Saiu', False: 'Permaneceu'}).astype(TIPO_CHURN_LABEL)
 
 # Separar colunas por tipo
 colunas_numericas = df.select_dtypes(include=[np.number]).columns.tolist()
-colunas_categoricas = ['State', 'International plan', 'Voice mail plan', 'Churn', 'Churn_Label']
+colunas_categoricas = COLUNAS_CATEGORICAS + ['Churn_Label']
 
 print(f"\n📊 Colunas numéricas: {len(colunas_numericas)}")
 print(f"📊 Colunas categóricas: {len(colunas_categoricas)}")
@@ -29,8 +51,15 @@ print_section("2. ANÁLISE UNIVARIADA - DISTRIBUIÇÕES")
 # 2.1 Variáveis Numéricas - Estatísticas
 print_subsection("2.1 Estatísticas Descritivas das Variáveis Numéricas")
 
-stats_numericas = df[colunas_numericas].describe().T
-stats_numericas['CV'] = (stats_numericas['std'] / stats_numericas['mean']) * 100  # Coeficiente de Variação
+# Modo de esboços (--esbocos ou CHURN_ESBOCOS=1): momentos exatos e quartis
+# aproximados, mesmo cálculo usado na inspeção em blocos
+passo = Passo('estatisticas_numericas', linhas_entrada=len(df))
+if '--esbocos' in sys.argv or os.environ.get('CHURN_ESBOCOS') == '1':
+    stats_numericas = ResumoNumerico(colunas_numericas).adicionar(df).tabela()
+else:
+    stats_numericas = df[colunas_numericas].describe().T
+    stats_numericas['CV'] = (stats_numericas['std'] / stats_numericas['mean']) * 100  # Coeficiente de Variação
+passo.concluir(colunas=len(stats_numericas))
 
 print(stats_numericas[['mean', 'std', 'min', 'max', 'CV']].round(2))
 
@@ -42,36 +71,17 @@ print("\n✅ Estatísticas salvas em: outputs/metrics/03_estatisticas_numericas.
 print_subsection("2.2 Distribuições das Variáveis Numéricas")
 
 # Selecionar principais variáveis para visualizar
-variaveis_principais = [
-    'Account length',
-    'Total day minutes',
-    'Total eve minutes',
-    'Total night minutes',
-    'Total intl minutes',
-    'Customer service calls'
-]
-
-# Criar subplots para histogramas
-fig, axes = plt.subplots(3, 2, figsize=(15, 12))
-axes = axes.ravel()
-
-for idx, col in enumerate(variaveis_principais):
-    if col in df.columns:
-        axes[idx].hist(df[col], bins=30, color=COLORS['primary'], alpha=0.7, edgecolor='black')
-        axes[idx].set_title(f'Distribuição: {col}', fontweight='bold')
-        axes[idx].set_xlabel(col)
-        axes[idx].set_ylabel('Frequência')
-        axes[idx].grid(axis='y', alpha=0.3)
-
-        # Adicionar linha da média
-        media = df[col].mean()
-        axes[idx].axvline(media, color='red', linestyle='--', linewidth=2, label=f'Média: {media:.1f}')
-        axes[idx].legend()
-
-plt.tight_layout()
-plt.savefig('outputs/plots/02_distribuicoes_univariadas.png', dpi=300, bbox_inches='tight')
-print("✅ Gráfico salvo: outputs/plots/02_distribuicoes_univariadas.png")
-plt.close()
+variaveis_principais = VARIAVEIS_PRINCIPAIS
+
+# Os gráficos viram tarefas com dados já resumidos; todos são renderizados
+# em paralelo no fim da seção 6
+tarefas_graficos = []
+
+# Histogramas (contagens calculadas aqui, desenho no processo de renderização)
+tarefas_graficos.append(tarefa_grafico(
+    'histogramas', 'outputs/plots/02_distribuicoes_univariadas.png',
+    variaveis=[(col, resumo_histograma(df[col])) for col in variaveis_principais if col in df.columns]
+))
 
 # 2.3 Análise de variáveis categóricas
 print_subsection("2.3 Distribuição das Variáveis Categóricas")
@@ -96,71 +106,54 @@ print(df['State'].value_counts().head(10))
 
 print_section("3. ANÁLISE BIVARIADA - RELAÇÃO COM CHURN")
 
+# Cubo de churn: contagens e churners de todas as dimensões numa passada;
+# as tabelas e gráficos abaixo (e as tabelas 06, 08-11) são leituras dele
+passo = Passo('cubo_churn', linhas_entrada=len(df))
+cubo = montar_cubo(df, ['International plan', 'Voice mail plan', 'Customer service calls', 'State'])
+passo.concluir()
+
 # 3.1 Taxa de Churn por Plano Internacional
 print_subsection("3.1 Churn por International Plan")
 
-churn_intl = pd.crosstab(df['International plan'], df['Churn'], normalize='index') * 100
+churn_intl = cubo.percentuais_status('International plan')
 print("\nTaxa de Churn (%):")
 print(churn_intl.round(2))
 
 # Visualização
-fig, ax = plt.subplots(figsize=(10, 6))
-churn_intl_count = pd.crosstab(df['International plan'], df['Churn_Label'])
-churn_intl_count.plot(kind='bar', ax=ax, color=[COLORS['churn_no'], COLORS['churn_yes']])
-ax.set_title('Churn por International Plan', fontsize=14, fontweight='bold')
-ax.set_xlabel('International Plan')
-ax.set_ylabel('Número de Clientes')
-ax.legend(title='Status')
-ax.grid(axis='y', alpha=0.3)
-plt.xticks(rotation=0)
-plt.tight_layout()
-plt.savefig('outputs/plots/03_churn_international_plan.png', dpi=300, bbox_inches='tight')
-print("✅ Gráfico salvo: outputs/plots/03_churn_international_plan.png")
-plt.close()
+churn_intl_count = cubo.contagens_status('International plan')
+tarefas_graficos.append(tarefa_grafico(
+    'barras_churn', 'outputs/plots/03_churn_international_plan.png',
+    tabela=churn_intl_count, titulo='Churn por International Plan', xlabel='International Plan'
+))
 
 # 3.2 Taxa de Churn por Voice Mail Plan
 print_subsection("3.2 Churn por Voice Mail Plan")
 
-churn_vmail = pd.crosstab(df['Voice mail plan'], df['Churn'], normalize='index') * 100
+churn_vmail = cubo.percentuais_status('Voice mail plan')
 print("\nTaxa de Churn (%):")
 print(churn_vmail.round(2))
 
 # Visualização
-fig, ax = plt.subplots(figsize=(10, 6))
-churn_vmail_count = pd.crosstab(df['Voice mail plan'], df['Churn_Label'])
-churn_vmail_count.plot(kind='bar', ax=ax, color=[COLORS['churn_no'], COLORS['churn_yes']])
-ax.set_title('Churn por Voice Mail Plan', fontsize=14, fontweight='bold')
-ax.set_xlabel('Voice Mail Plan')
-ax.set_ylabel('Número de Clientes')
-ax.legend(title='Status')
-ax.grid(axis='y', alpha=0.3)
-plt.xticks(rotation=0)
-plt.tight_layout()
-plt.savefig('outputs/plots/04_churn_voicemail_plan.png', dpi=300, bbox_inches='tight')
-print("✅ Gráfico salvo: outputs/plots/04_churn_voicemail_plan.png")
-plt.close()
+churn_vmail_count = cubo.contagens_status('Voice mail plan')
+tarefas_graficos.append(tarefa_grafico(
+    'barras_churn', 'outputs/plots/04_churn_voicemail_plan.png',
+    tabela=churn_vmail_count, titulo='Churn por Voice Mail Plan', xlabel='Voice Mail Plan'
+))
 
 # 3.3 Churn por Customer Service Calls
 print_subsection("3.3 Churn por Customer Service Calls")
 
-churn_cs = pd.crosstab(df['Customer service calls'], df['Churn'], normalize='index') * 100
+churn_cs = cubo.percentuais_status('Customer service calls')
 print("\nTaxa de Churn por número de chamadas (%):")
 print(churn_cs.round(2))
 
 # Visualização
-fig, ax = plt.subplots(figsize=(12, 6))
-churn_cs_count = pd.crosstab(df['Customer service calls'], df['Churn_Label'])
-churn_cs_count.plot(kind='bar', ax=ax, color=[COLORS['churn_no'], COLORS['churn_yes']], width=0.8)
-ax.set_title('Churn por Número de Chamadas ao Suporte', fontsize=14, fontweight='bold')
-ax.set_xlabel('Número de Chamadas')
-ax.set_ylabel('Número de Clientes')
-ax.legend(title='Status')
-ax.grid(axis='y', alpha=0.3)
-plt.xticks(rotation=0)
-plt.tight_layout()
-plt.savefig('outputs/plots/05_churn_customer_service.png', dpi=300, bbox_inches='tight')
-print("✅ Gráfico salvo: outputs/plots/05_churn_customer_service.png")
-plt.close()
+churn_cs_count = cubo.contagens_status('Customer service calls')
+tarefas_graficos.append(tarefa_grafico(
+    'barras_churn', 'outputs/plots/05_churn_customer_service.png',
+    tabela=churn_cs_count, titulo='Churn por Número de Chamadas ao Suporte',
+    xlabel='Número de Chamadas', figsize=(12, 6), largura=0.8
+))
 
 # Insight importante
 chamadas_altas = df[df['Customer service calls'] >= 4]['Churn'].mean() * 100
@@ -175,27 +168,10 @@ print(f"            Clientes com <4 chamadas têm {chamadas_baixas:.1f}% de chur
 print_section("4. ANÁLISE DE CORRELAÇÕES")
 
 # 4.1 Converter Churn para numérico (0 e 1) para correlação
-df['Churn_Num'] = df['Churn'].astype(int)
+df['Churn_Num'] = df['Churn'].astype('int8')
 
 # 4.2 Selecionar apenas colunas numéricas relevantes
-colunas_para_correlacao = [
-    'Account length',
-    'Number vmail messages',
-    'Total day minutes',
-    'Total day calls',
-    'Total day charge',
-    'Total eve minutes',
-    'Total eve calls',
-    'Total eve charge',
-    'Total night minutes',
-    'Total night calls',
-    'Total night charge',
-    'Total intl minutes',
-    'Total intl calls',
-    'Total intl charge',
-    'Customer service calls',
-    'Churn_Num'
-]
+colunas_para_correlacao = COLUNAS_CORRELACAO
 
 # Filtrar apenas colunas que existem
 colunas_existentes = [col for col in colunas_para_correlacao if col in df.columns]
@@ -203,7 +179,11 @@ colunas_existentes = [col for col in colunas_para_correlacao if col in df.column
 # 4.3 Calcular matriz de correlação
 print_subsection("4.1 Matriz de Correlação")
 
-correlacao = df[colunas_existentes].corr()
+# Uma única matriz (médias e co-momentos acumulados em blocos) serve o CSV
+# de correlações e o heatmap
+passo = Passo('correlacao', linhas_entrada=len(df))
+correlacao = AcumuladorCorrelacao(colunas_existentes).adicionar(df).correlacao()
+passo.concluir(colunas=len(colunas_existentes))
 
 # Mostrar correlações com Churn (ordenadas)
 corr_churn = correlacao['Churn_Num'].sort_values(ascending=False)
@@ -218,35 +198,16 @@ print("\n✅ Correlações salvas em: outputs/metrics/04_correlacoes_churn.csv")
 print_subsection("4.2 Heatmap de Correlação")
 
 # Criar heatmap focado (apenas variáveis mais relevantes)
-variaveis_heatmap = [
-    'Total day minutes',
-    'Total day charge',
-    'Total eve minutes',
-    'Total eve charge',
-    'Total intl minutes',
-    'Total intl charge',
-    'Customer service calls',
-    'Churn_Num'
-]
-
-# Filtrar apenas existentes
-variaveis_heatmap_existentes = [col for col in variaveis_heatmap if col in df.columns]
-
-fig, ax = plt.subplots(figsize=(12, 10))
-sns.heatmap(df[variaveis_heatmap_existentes].corr(),
-            annot=True,
-            fmt='.2f',
-            cmap='coolwarm',
-            center=0,
-            square=True,
-            linewidths=1,
-            cbar_kws={"shrink": 0.8},
-            ax=ax)
-ax.set_title('Matriz de Correlação - Principais Variáveis', fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.savefig('outputs/plots/06_heatmap_correlacao.png', dpi=300, bbox_inches='tight')
-print("✅ Gráfico salvo: outputs/plots/06_heatmap_correlacao.png")
-plt.close()
+variaveis_heatmap = VARIAVEIS_HEATMAP
+
+# Filtrar apenas existentes (submatriz da correlação já calculada)
+variaveis_heatmap_existentes = [col for col in variaveis_heatmap if col in correlacao.index]
+
+tarefas_graficos.append(tarefa_grafico(
+    'heatmap', 'outputs/plots/06_heatmap_correlacao.png',
+    matriz=correlacao.loc[variaveis_heatmap_existentes, variaveis_heatmap_existentes],
+    titulo='Matriz de Correlação - Principais Variáveis'
+))
 
 # 4.5 Identificar correlações importantes
 print_subsection("4.3 Insights de Correlação")
@@ -273,22 +234,15 @@ print_section("5. COMPARAÇÃO: CHURNERS vs NÃO-CHURNERS")
 print_subsection("5.1 Médias por Grupo")
 
 # Comparar médias das principais variáveis
-variaveis_comparacao = [
-    'Account length',
-    'Total day minutes',
-    'Total eve minutes',
-    'Total night minutes',
-    'Total intl minutes',
-    'Customer service calls',
-    'Total day charge',
-    'Number vmail messages'
-]
+variaveis_comparacao = VARIAVEIS_COMPARACAO
 
 # Filtrar existentes
 variaveis_comp_existentes = [col for col in variaveis_comparacao if col in df.columns]
 
 # Criar tabela comparativa
-comparacao = df.groupby('Churn_Label')[variaveis_comp_existentes].mean().T
+passo = Passo('comparacao_churners', linhas_entrada=len(df))
+comparacao = df.groupby('Churn_Label', observed=True)[variaveis_comp_existentes].mean().T
+passo.concluir()
 comparacao['Diferenca'] = comparacao['Saiu'] - comparacao['Permaneceu']
 comparacao['Diferenca_%'] = (comparacao['Diferenca'] / comparacao['Permaneceu']) * 100
 
@@ -323,40 +277,18 @@ for var, diff in maiores_diferencas.items():
 print_subsection("5.3 Boxplots Comparativos")
 
 # Selecionar 6 variáveis mais importantes para boxplot
-variaveis_boxplot = [
-    'Total day minutes',
-    'Total eve minutes',
-    'Total intl minutes',
-    'Customer service calls',
-    'Total day charge',
-    'Number vmail messages'
-]
+variaveis_boxplot = VARIAVEIS_BOXPLOT
 
 # Filtrar existentes
 variaveis_box_existentes = [col for col in variaveis_boxplot if col in df.columns]
 
-fig, axes = plt.subplots(2, 3, figsize=(16, 10))
-axes = axes.ravel()
-
-for idx, col in enumerate(variaveis_box_existentes):
-    # Boxplot
-    df.boxplot(column=col, by='Churn_Label', ax=axes[idx],
-               patch_artist=True,
-               boxprops=dict(facecolor=COLORS['primary'], alpha=0.6),
-               medianprops=dict(color='red', linewidth=2))
-
-    axes[idx].set_title(f'{col}', fontweight='bold', fontsize=11)
-    axes[idx].set_xlabel('')
-    axes[idx].set_ylabel(col, fontsize=9)
-    axes[idx].grid(axis='y', alpha=0.3)
-
-    # Remover título automático do pandas
-    plt.suptitle('')
-
-plt.tight_layout()
-plt.savefig('outputs/plots/07_boxplots_comparacao.png', dpi=300, bbox_inches='tight')
-print("✅ Gráfico salvo: outputs/plots/07_boxplots_comparacao.png")
-plt.close()
+# Estatísticas dos boxplots (quartis, bigodes, outliers) por grupo
+grupos_churn = df.groupby('Churn_Label', observed=True)
+tarefas_graficos.append(tarefa_grafico(
+    'boxplots', 'outputs/plots/07_boxplots_comparacao.png',
+    variaveis=[(col, {rotulo: estatisticas_boxplot(valores) for rotulo, valores in grupos_churn[col]})
+               for col in variaveis_box_existentes]
+))
 
 # ============================================================================
 # 6. ANÁLISE DE SEGMENTOS E PADRÕES
@@ -367,59 +299,42 @@ print_section("6. ANÁLISE DE SEGMENTOS E PADRÕES")
 # 6.1 Criar segmentos de risco
 print_subsection("6.1 Segmentação de Clientes por Risco de Churn")
 
-# Definir critérios de risco
-df['Risco_Churn'] = 'Baixo'
-
-# Risco Médio: International plan = Yes OU Customer service calls >= 3
-condicao_medio = (
-    (df['International plan'] == 'Yes') |
-    (df['Customer service calls'] >= 3)
-)
-df.loc[condicao_medio, 'Risco_Churn'] = 'Médio'
+# Critérios de risco (pontuacao_risco.py):
+#   Médio: International plan = Yes OU Customer service calls >= 3
+#   Alto:  International plan = Yes E Customer service calls >= 4
+passo = Passo('segmentacao_risco', linhas_entrada=len(df))
+df['Risco_Churn'] = pontuar(df)
 
-# Risco Alto: International plan = Yes E Customer service calls >= 4
-condicao_alto = (
-    (df['International plan'] == 'Yes') &
-    (df['Customer service calls'] >= 4)
-)
-df.loc[condicao_alto, 'Risco_Churn'] = 'Alto'
+cubo.adicionar_dimensao('Risco_Churn', df['Risco_Churn'])
+passo.concluir()
 
 # Distribuição por segmento
 print("\n📊 Distribuição de Clientes por Risco:")
-print(df['Risco_Churn'].value_counts().sort_index())
+print(cubo.agregado('Risco_Churn')['Total'].rename('count'))
 
 # Taxa de churn por segmento
 print("\n📊 Taxa de Churn por Segmento de Risco:")
-churn_por_risco = df.groupby('Risco_Churn')['Churn'].agg(['sum', 'count', 'mean'])
-churn_por_risco.columns = ['Churners', 'Total', 'Taxa_Churn']
-churn_por_risco['Taxa_Churn_%'] = churn_por_risco['Taxa_Churn'] * 100
+churn_por_risco = cubo.tabela_churn('Risco_Churn', casas=None)
 print(churn_por_risco[['Churners', 'Total', 'Taxa_Churn_%']].round(2))
 
 # Visualização
-fig, ax = plt.subplots(figsize=(10, 6))
-churn_risco = pd.crosstab(df['Risco_Churn'], df['Churn_Label'])
-churn_risco = churn_risco.reindex(['Baixo', 'Médio', 'Alto'])  # Ordenar
-churn_risco.plot(kind='bar', ax=ax, color=[COLORS['churn_no'], COLORS['churn_yes']], width=0.7)
-ax.set_title('Churn por Segmento de Risco', fontsize=14, fontweight='bold')
-ax.set_xlabel('Segmento de Risco')
-ax.set_ylabel('Número de Clientes')
-ax.legend(title='Status')
-ax.grid(axis='y', alpha=0.3)
-plt.xticks(rotation=0)
-plt.tight_layout()
-plt.savefig('outputs/plots/08_churn_segmento_risco.png', dpi=300, bbox_inches='tight')
-print("\n✅ Gráfico salvo: outputs/plots/08_churn_segmento_risco.png")
-plt.close()
+churn_risco = cubo.contagens_status('Risco_Churn')
+churn_risco = churn_risco.reindex(ORDEM_RISCO)  # Ordenar
+tarefas_graficos.append(tarefa_grafico(
+    'barras_churn', 'outputs/plots/08_churn_segmento_risco.png',
+    tabela=churn_risco, titulo='Churn por Segmento de Risco',
+    xlabel='Segmento de Risco', largura=0.7
+))
+
+# Renderização de todos os gráficos da etapa em paralelo
+print_subsection("Renderização dos Gráficos")
+for caminho, segundos in renderizar_graficos(tarefas_graficos):
+    print(f"✅ Gráfico salvo: {caminho} ({segundos:.1f}s)")
 
 # 6.2 Top Estados com maior churn
 print_subsection("6.2 Top 10 Estados com Maior Taxa de Churn")
 
-churn_por_estado = df.groupby('State').agg({
-    'Churn': ['sum', 'count', 'mean']
-}).round(4)
-
-churn_por_estado.columns = ['Churners', 'Total_Clientes', 'Taxa_Churn']
-churn_por_estado['Taxa_Churn_%'] = churn_por_estado['Taxa_Churn'] * 100
+churn_por_estado = cubo.tabela_churn('State', nome_total='Total_Clientes')
 
 # Filtrar estados com pelo menos 10 clientes
 churn_por_estado_filtrado = churn_por_estado[churn_por_estado['Total_Clientes'] >= 10]
@@ -442,6 +357,8 @@ print_subsection("7.1 Criando Tabelas Agregadas")
 
 import json
 
+passo = Passo('tabelas_powerbi', linhas_entrada=len(df))
+
 # Tabela 1: Métricas gerais
 metricas_gerais = {
     'total_clientes': int(len(df)),
@@ -461,40 +378,32 @@ with open('outputs/metrics/07_metricas_gerais.json', 'w') as f:
 print("✅ Métricas gerais salvas: outputs/metrics/07_metricas_gerais.json")
 
 # Tabela 2: Churn por International Plan
-churn_intl_plan = df.groupby('International plan').agg({
-    'Churn': ['sum', 'count', 'mean']
-}).round(4)
-churn_intl_plan.columns = ['Churners', 'Total', 'Taxa_Churn']
-churn_intl_plan['Taxa_Churn_%'] = churn_intl_plan['Taxa_Churn'] * 100
+churn_intl_plan = cubo.tabela_churn('International plan')
 churn_intl_plan.to_csv('outputs/metrics/08_churn_international_plan.csv')
 print("✅ Churn por International Plan: outputs/metrics/08_churn_international_plan.csv")
 
 # Tabela 3: Churn por Voice Mail Plan
-churn_vmail_plan = df.groupby('Voice mail plan').agg({
-    'Churn': ['sum', 'count', 'mean']
-}).round(4)
-churn_vmail_plan.columns = ['Churners', 'Total', 'Taxa_Churn']
-churn_vmail_plan['Taxa_Churn_%'] = churn_vmail_plan['Taxa_Churn'] * 100
+churn_vmail_plan = cubo.tabela_churn('Voice mail plan')
 churn_vmail_plan.to_csv('outputs/metrics/09_churn_voicemail_plan.csv')
 print("✅ Churn por Voice Mail Plan: outputs/metrics/09_churn_voicemail_plan.csv")
 
 # Tabela 4: Churn por Customer Service Calls
-churn_cs_calls = df.groupby('Customer service calls').agg({
-    'Churn': ['sum', 'count', 'mean']
-}).round(4)
-churn_cs_calls.columns = ['Churners', 'Total', 'Taxa_Churn']
-churn_cs_calls['Taxa_Churn_%'] = churn_cs_calls['Taxa_Churn'] * 100
+churn_cs_calls = cubo.tabela_churn('Customer service calls')
 churn_cs_calls.to_csv('outputs/metrics/10_churn_customer_service.csv')
 print("✅ Churn por Customer Service Calls: outputs/metrics/10_churn_customer_service.csv")
 
 # Tabela 5: Segmentação de risco
 churn_por_risco.to_csv('outputs/metrics/11_churn_segmento_risco.csv')
 print("✅ Churn por Segmento de Risco: outputs/metrics/11_churn_segmento_risco.csv")
+passo.concluir(tabelas=5)
 
-# 7.2 Dataset principal com segmentação para Power BI
-df_powerbi = df.copy()
-df_powerbi.to_csv('data/dashboard/telecom_churn_completo.csv', index=False)
-print("\n✅ Dataset completo para Power BI: data/dashboard/telecom_churn_completo.csv")
+# 7.2 Dataset largo em CSV (opcional): o dashboard lê o modelo estrela
+# gravado por exportacao_powerbi.py
+if EXPORTAR_CSV:
+    passo = Passo('exportacao_dashboard', linhas_entrada=len(df))
+    df.to_csv('data/dashboard/telecom_churn_completo.csv', index=False)
+    passo.concluir()
+    print("\n✅ Dataset completo em CSV: data/dashboard/telecom_churn_completo.csv")
 
 # ============================================================================
 # 8. RESUMO FINAL DA EDA
@@ -526,7 +435,7 @@ print(f"   • Clientes sem voice mail: {taxa_vm_no:.1f}% de churn")
 print(f"   • Diferença: {abs(taxa_vm_yes - taxa_vm_no):.1f} pontos percentuais")
 
 print("\n4️⃣  SEGMENTAÇÃO DE RISCO:")
-for risco in ['Baixo', 'Médio', 'Alto']:
+for risco in ORDEM_RISCO:
     if risco in churn_por_risco.index:
         taxa = churn_por_risco.loc[risco, 'Taxa_Churn_%']
         total = churn_por_risco.loc[risco, 'Total']
@@ -540,6 +449,8 @@ print("="*80)
 salvar_info_execucao("eda_exploratoria.py",
                      f"EDA concluída - {len(df)} registros analisados")
 
+registrar_memoria_etapa("eda_exploratoria.py")
+
 # ============================================================================
 # FIM DO ARQUIVO 04
 # ============================================================================
@@ -0,0 +1,236 @@
+# ============================================================================
+# ESBOÇOS (SKETCHES) MESCLÁVEIS
+# ============================================================================
+#
+# Estruturas de tamanho pequeno que resumem uma coluna bloco a bloco e podem
+# ser mescladas entre blocos, arquivos ou processos.
+#
+# EsbocoCardinalidade: valores distintos aproximados (HyperLogLog), descrito
+# na seção de cardinalidade abaixo.
+#
+# EsbocoQuantis: quantis aproximados com erro relativo garantido (no estilo
+# DDSketch). Cada valor x > 0 cai no balde i = ceil(log_γ(x)), com
+# γ = (1 + α) / (1 - α); o balde é representado por 2·γ^i / (γ + 1).
+# Garantia: para qualquer q, o valor retornado v̂ satisfaz
+#     |v̂ - v| ≤ α·|v|
+# onde v é o valor exato de posto ⌊q·(n - 1)⌋ (ordem 0). O tamanho depende
+# só da faixa de valores (≈ log(max/min) / log(γ) baldes), não de n.
+# ============================================================================
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from deduplicacao import normalizar_para_hash
+
+# Precisão relativa padrão dos quantis (1%)
+PRECISAO_QUANTIS_PADRAO = 0.01
+
+
+class EsbocoQuantis:
+    """
+    Esboço mesclável de quantis com erro relativo α
+
+    Args:
+        precisao_relativa: α, erro relativo máximo do valor retornado
+    """
+
+    def __init__(self, precisao_relativa=PRECISAO_QUANTIS_PADRAO):
+        if not 0 < precisao_relativa < 1:
+            raise ValueError("precisao_relativa deve estar entre 0 e 1")
+        self.precisao_relativa = precisao_relativa
+        self.gama = (1 + precisao_relativa) / (1 - precisao_relativa)
+        self._log_gama = math.log(self.gama)
+        self.positivos = {}
+        self.negativos = {}
+        self.zeros = 0
+        self.contagem = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def _indices(self, valores_absolutos):
+        return np.ceil(np.log(valores_absolutos) / self._log_gama).astype(np.int64)
+
+    @staticmethod
+    def _acumular(baldes, indices):
+        unicos, contagens = np.unique(indices, return_counts=True)
+        for i, c in zip(unicos.tolist(), contagens.tolist()):
+            baldes[i] = baldes.get(i, 0) + c
+
+    def adicionar(self, valores):
+        """
+        Adiciona um bloco de valores (array ou Series); nulos são ignorados
+        """
+        x = np.asarray(valores, dtype=np.float64)
+        x = x[~np.isnan(x)]
+        if x.size == 0:
+            return self
+
+        self.contagem += int(x.size)
+        self.minimo = min(self.minimo, float(x.min()))
+        self.maximo = max(self.maximo, float(x.max()))
+
+        self.zeros += int(np.count_nonzero(x == 0))
+        positivos = x[x > 0]
+        if positivos.size:
+            self._acumular(self.positivos, self._indices(positivos))
+        negativos = x[x < 0]
+        if negativos.size:
+            self._acumular(self.negativos, self._indices(-negativos))
+        return self
+
+    def mesclar(self, outro):
+        """
+        Mescla outro esboço (mesma precisão) neste, no lugar
+        """
+        if outro.precisao_relativa != self.precisao_relativa:
+            raise ValueError("Esboços com precisões diferentes não podem ser mesclados")
+        for destino, origem in ((self.positivos, outro.positivos), (self.negativos, outro.negativos)):
+            for i, c in origem.items():
+                destino[i] = destino.get(i, 0) + c
+        self.zeros += outro.zeros
+        self.contagem += outro.contagem
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        return self
+
+    def _valor_balde(self, indice):
+        return 2 * self.gama ** indice / (self.gama + 1)
+
+    def quantil(self, q):
+        """
+        Valor aproximado do quantil q (0 ≤ q ≤ 1); NaN se o esboço estiver vazio
+        """
+        if self.contagem == 0:
+            return math.nan
+        posto = math.floor(q * (self.contagem - 1))
+
+        acumulado = 0
+        for i in sorted(self.negativos, reverse=True):
+            acumulado += self.negativos[i]
+            if acumulado > posto:
+                return min(max(-self._valor_balde(i), self.minimo), self.maximo)
+
+        acumulado += self.zeros
+        if acumulado > posto:
+            return 0.0
+
+        for i in sorted(self.positivos):
+            acumulado += self.positivos[i]
+            if acumulado > posto:
+                return max(min(self._valor_balde(i), self.maximo), self.minimo)
+
+        return self.maximo
+
+    def quantis(self, qs):
+        """
+        Lista de quantis aproximados
+        """
+        return [self.quantil(q) for q in qs]
+
+
+# ============================================================================
+# CARDINALIDADE APROXIMADA (HYPERLOGLOG)
+# ============================================================================
+#
+# EsbocoCardinalidade: estimativa de valores distintos em memória fixa
+# (2^precisao registradores de 1 byte; 16 KB com precisao=14). Erro padrão
+# relativo ≈ 1,04 / sqrt(2^precisao) (≈ 0,8% com precisao=14). Enquanto a
+# coluna tiver até limite_exatos valores distintos, também guarda a contagem
+# exata de cada valor, para listar colunas de baixa cardinalidade.
+# ============================================================================
+# Precisão padrão do HyperLogLog (registradores = 2^precisao)
+PRECISAO_HLL_PADRAO = 14
+
+# Até quantos valores distintos a contagem exata é mantida
+LIMITE_EXATOS_PADRAO = 100
+
+
+class EsbocoCardinalidade:
+    """
+    Esboço mesclável de cardinalidade (HyperLogLog) com contagem exata para
+    colunas de baixa cardinalidade
+
+    Args:
+        precisao: bits de índice do HyperLogLog (4 a 18)
+        limite_exatos: máximo de valores distintos com contagem exata
+    """
+
+    def __init__(self, precisao=PRECISAO_HLL_PADRAO, limite_exatos=LIMITE_EXATOS_PADRAO):
+        if not 4 <= precisao <= 18:
+            raise ValueError("precisao deve estar entre 4 e 18")
+        self.precisao = precisao
+        self.limite_exatos = limite_exatos
+        self.registradores = np.zeros(1 << precisao, dtype=np.uint8)
+        self.exatos = {}
+
+    def adicionar(self, valores):
+        """
+        Adiciona um bloco de valores (array ou Series); nulos são ignorados
+        """
+        serie = pd.Series(valores).dropna()
+        if serie.empty:
+            return self
+
+        # Contagem exata enquanto a coluna tiver poucos valores distintos
+        if self.exatos is not None:
+            for valor, c in serie.value_counts(sort=False).items():
+                self.exatos[valor] = self.exatos.get(valor, 0) + int(c)
+            if len(self.exatos) > self.limite_exatos:
+                self.exatos = None
+
+        # Mesma representação da deduplicação: 5 e 5.0, ou True de uma coluna
+        # bool e de uma coluna object, têm o mesmo hash em qualquer bloco
+        hashes = pd.util.hash_pandas_object(normalizar_para_hash(serie), index=False).to_numpy()
+        bits_resto = 64 - self.precisao
+        indices = (hashes >> np.uint64(bits_resto)).astype(np.int64)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+
+        # Posição do primeiro bit 1 nos bits restantes (frexp é exato: < 2^53)
+        _, expoente = np.frexp(resto.astype(np.float64))
+        posicao = np.where(resto == 0, bits_resto + 1, bits_resto - expoente + 1).astype(np.uint8)
+
+        np.maximum.at(self.registradores, indices, posicao)
+        return self
+
+    def mesclar(self, outro):
+        """
+        Mescla outro esboço (mesma precisão) neste, no lugar
+        """
+        if outro.precisao != self.precisao:
+            raise ValueError("Esboços com precisões diferentes não podem ser mesclados")
+        np.maximum(self.registradores, outro.registradores, out=self.registradores)
+
+        if self.exatos is not None and outro.exatos is not None:
+            for valor, c in outro.exatos.items():
+                self.exatos[valor] = self.exatos.get(valor, 0) + c
+            if len(self.exatos) > self.limite_exatos:
+                self.exatos = None
+        else:
+            self.exatos = None
+        return self
+
+    @property
+    def eh_exato(self):
+        """
+        True se a coluna ainda está abaixo do limite de contagem exata
+        """
+        return self.exatos is not None
+
+    def estimativa(self):
+        """
+        Número de valores distintos (exato se eh_exato, senão HyperLogLog)
+        """
+        if self.exatos is not None:
+            return len(self.exatos)
+
+        m = len(self.registradores)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / np.sum(np.ldexp(1.0, -self.registradores.astype(np.int64)))
+
+        # Correção para cardinalidades pequenas (contagem linear)
+        vazios = int(np.count_nonzero(self.registradores == 0))
+        if estimativa <= 2.5 * m and vazios > 0:
+            estimativa = m * math.log(m / vazios)
+        return int(round(estimativa))
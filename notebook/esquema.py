@@ -0,0 +1,275 @@
+# ============================================================================
+# ESQUEMA CENTRAL DAS COLUNAS (TELECOM CHURN)
+# ============================================================================
+#
+# Nomes de colunas, grupos de colunas usados pelas etapas e tipos compactos
+# (category, inteiros estreitos, Churn como bool). Todas as etapas
+# aplicam este esquema ao carregar e ao salvar os dados.
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, is_bool_dtype, is_numeric_dtype
+
+# ============================================================================
+# GRUPOS DE COLUNAS
+# ============================================================================
+
+# Colunas de cobrança (receita por período)
+COLUNAS_COBRANCA = [
+    'Total day charge',
+    'Total eve charge',
+    'Total night charge',
+    'Total intl charge'
+]
+
+# Pares (minutos, cobrança) por período, usados nas validações de tarifa
+PERIODOS_TARIFA = {
+    'day': ('Total day minutes', 'Total day charge'),
+    'eve': ('Total eve minutes', 'Total eve charge'),
+    'night': ('Total night minutes', 'Total night charge'),
+    'intl': ('Total intl minutes', 'Total intl charge')
+}
+
+# Colunas que não podem ter valores negativos
+COLUNAS_POSITIVAS = [
+    'Account length', 'Total day minutes', 'Total day calls',
+    'Total day charge', 'Total eve minutes', 'Total eve calls',
+    'Total eve charge', 'Total night minutes', 'Total night calls',
+    'Total night charge', 'Total intl minutes', 'Total intl calls',
+    'Total intl charge', 'Customer service calls', 'Number vmail messages'
+]
+
+# Colunas categóricas originais do dataset
+COLUNAS_CATEGORICAS = ['State', 'International plan', 'Voice mail plan', 'Churn']
+
+# Colunas para a matriz de correlação com churn
+COLUNAS_CORRELACAO = [
+    'Account length',
+    'Number vmail messages',
+    'Total day minutes',
+    'Total day calls',
+    'Total day charge',
+    'Total eve minutes',
+    'Total eve calls',
+    'Total eve charge',
+    'Total night minutes',
+    'Total night calls',
+    'Total night charge',
+    'Total intl minutes',
+    'Total intl calls',
+    'Total intl charge',
+    'Customer service calls',
+    'Churn_Num'
+]
+
+# Variáveis principais (histogramas)
+VARIAVEIS_PRINCIPAIS = [
+    'Account length',
+    'Total day minutes',
+    'Total eve minutes',
+    'Total night minutes',
+    'Total intl minutes',
+    'Customer service calls'
+]
+
+# Variáveis do heatmap de correlação
+VARIAVEIS_HEATMAP = [
+    'Total day minutes',
+    'Total day charge',
+    'Total eve minutes',
+    'Total eve charge',
+    'Total intl minutes',
+    'Total intl charge',
+    'Customer service calls',
+    'Churn_Num'
+]
+
+# Variáveis da comparação de médias churners vs não-churners
+VARIAVEIS_COMPARACAO = [
+    'Account length',
+    'Total day minutes',
+    'Total eve minutes',
+    'Total night minutes',
+    'Total intl minutes',
+    'Customer service calls',
+    'Total day charge',
+    'Number vmail messages'
+]
+
+# Variáveis dos boxplots comparativos
+VARIAVEIS_BOXPLOT = [
+    'Total day minutes',
+    'Total eve minutes',
+    'Total intl minutes',
+    'Customer service calls',
+    'Total day charge',
+    'Number vmail messages'
+]
+
+# ============================================================================
+# FAIXAS (BINS) E SEGMENTOS
+# ============================================================================
+
+ORDEM_RISCO = ['Baixo', 'Médio', 'Alto']
+
+BINS_RECEITA = [0, 40, 60, 80, 100, float('inf')]
+LABELS_RECEITA = ['Muito Baixa (0-40)', 'Baixa (40-60)',
+                  'Média (60-80)', 'Alta (80-100)',
+                  'Muito Alta (100+)']
+
+BINS_TEMPO_CONTA = [0, 50, 100, 150, 200, float('inf')]
+LABELS_TEMPO_CONTA = ['0-50 dias', '51-100 dias',
+                      '101-150 dias', '151-200 dias',
+                      '200+ dias']
+
+TIPO_RISCO = CategoricalDtype(ORDEM_RISCO, ordered=True)
+TIPO_FAIXA_RECEITA = CategoricalDtype(LABELS_RECEITA, ordered=True)
+TIPO_FAIXA_TEMPO_CONTA = CategoricalDtype(LABELS_TEMPO_CONTA, ordered=True)
+TIPO_CHURN_LABEL = CategoricalDtype(['Permaneceu', 'Saiu'])
+
+# ============================================================================
+# TIPOS COMPACTOS
+# ============================================================================
+
+# Minutos e cobranças ficam em float64: em float32 os valores com 2 casas
+# decimais deixam de ser exatos e os totais publicados (receita, quartis)
+# mudam na segunda casa.
+TIPOS_COLUNAS = {
+    'State': 'category',
+    'Account length': 'int16',
+    'Area code': 'category',
+    'International plan': 'category',
+    'Voice mail plan': 'category',
+    'Number vmail messages': 'int16',
+    'Total day minutes': 'float64',
+    'Total day calls': 'int16',
+    'Total day charge': 'float64',
+    'Total eve minutes': 'float64',
+    'Total eve calls': 'int16',
+    'Total eve charge': 'float64',
+    'Total night minutes': 'float64',
+    'Total night calls': 'int16',
+    'Total night charge': 'float64',
+    'Total intl minutes': 'float64',
+    'Total intl calls': 'int8',
+    'Total intl charge': 'float64',
+    'Customer service calls': 'int8',
+    'Churn': 'bool',
+    # Colunas derivadas
+    'Churn_Num': 'int8',
+    'Churn_Label': TIPO_CHURN_LABEL,
+    'Receita_Total_Cliente': 'float64',
+    'Risco_Churn': TIPO_RISCO,
+    'Faixa_Receita': TIPO_FAIXA_RECEITA,
+    'Faixa_Tempo_Conta': TIPO_FAIXA_TEMPO_CONTA,
+    'Combo_Planos': 'category'
+}
+
+# Equivalentes que aceitam nulos (usados só quando a coluna tem faltantes)
+_TIPOS_ANULAVEIS = {
+    'int8': 'Int8',
+    'int16': 'Int16',
+    'int32': 'Int32',
+    'int64': 'Int64',
+    'bool': 'boolean'
+}
+
+# Inteiros em ordem de largura (para alargar quando os valores não cabem)
+_INTEIROS = ['int8', 'int16', 'int32', 'int64']
+
+
+def tipo_coluna(coluna, tem_nulos=False, intervalo=None):
+    """
+    Retorna o dtype do esquema para a coluna (None se não estiver no esquema)
+
+    Args:
+        coluna: nome da coluna
+        tem_nulos: se True, usa o equivalente que aceita nulos
+        intervalo: (mínimo, máximo) dos valores, se já conhecidos; colunas
+            inteiras cujos valores não cabem no tipo do esquema ficam num
+            inteiro mais largo
+    """
+    tipo = TIPOS_COLUNAS.get(coluna)
+    if tem_nulos and isinstance(tipo, str):
+        tipo = _TIPOS_ANULAVEIS.get(tipo, tipo)
+    if intervalo is not None and isinstance(tipo, str):
+        tipo = _inteiro_para_intervalo(*intervalo, tipo)
+    return tipo
+
+
+def _inteiro_que_cabe(serie, tipo):
+    """
+    Tipo inteiro do esquema, ou o menor mais largo que comporta os valores
+    da série (sem isso o astype estoura em silêncio: 200 vira -56 em int8)
+    """
+    if tipo.lower() not in _INTEIROS or is_bool_dtype(serie.dtype) or not is_numeric_dtype(serie.dtype):
+        return tipo
+    return _inteiro_para_intervalo(serie.min(), serie.max(), tipo)
+
+
+def _inteiro_para_intervalo(minimo, maximo, tipo):
+    """
+    Tipo inteiro do esquema, ou o menor mais largo que comporta [mínimo, máximo]
+    """
+    base = tipo.lower()
+    if base not in _INTEIROS or pd.isna(minimo) or pd.isna(maximo):
+        return tipo
+    for largura in _INTEIROS[_INTEIROS.index(base):]:
+        limites = np.iinfo(largura)
+        if limites.min <= minimo and maximo <= limites.max:
+            return largura if base == tipo else _TIPOS_ANULAVEIS[largura]
+    return tipo
+
+
+def padronizar_categoricas(df):
+    """
+    Padroniza as colunas de texto na limpeza (no lugar): State em
+    maiúsculas e os planos capitalizados, todos sem espaços nas pontas
+
+    Returns:
+        Lista das colunas padronizadas
+    """
+    padronizadas = []
+    if 'State' in df.columns:
+        df['State'] = df['State'].str.upper().str.strip()
+        padronizadas.append('State')
+    for col in ['International plan', 'Voice mail plan']:
+        if col in df.columns:
+            df[col] = df[col].str.strip().str.capitalize()
+            padronizadas.append(col)
+    return padronizadas
+
+
+def aplicar_esquema(df, categorias=True):
+    """
+    Converte as colunas presentes no DataFrame para os tipos do esquema
+
+    Colunas fora do esquema são mantidas como estão. Colunas já no tipo
+    correto não são copiadas. Colunas inteiras com valores fora do intervalo
+    do tipo do esquema ficam num inteiro mais largo (as regras de validação
+    apontam os valores fora da faixa).
+
+    Args:
+        df: DataFrame a converter (alterado no lugar)
+        categorias: se False, mantém colunas categóricas como texto
+            (útil ao gravar blocos com categorias diferentes em sequência)
+
+    Returns:
+        O próprio DataFrame
+    """
+    for coluna in df.columns:
+        if coluna not in TIPOS_COLUNAS:
+            continue
+
+        tipo = tipo_coluna(coluna, tem_nulos=bool(df[coluna].hasnans))
+        eh_categoria = tipo == 'category' or isinstance(tipo, CategoricalDtype)
+        if eh_categoria and not categorias:
+            continue
+
+        if isinstance(tipo, str):
+            tipo = _inteiro_que_cabe(df[coluna], tipo)
+        if df[coluna].dtype != tipo:
+            df[coluna] = df[coluna].astype(tipo)
+
+    return df
@@ -0,0 +1,133 @@
+# ============================================================================
+# ESTATÍSTICAS DESCRITIVAS EM BLOCOS (describe() MESCLÁVEL)
+# ============================================================================
+#
+# Mesmas colunas de 03_estatisticas_numericas.csv (count, mean, std, min,
+# 25%, 50%, 75%, max, CV) sem precisar da base inteira na memória:
+#   - count, mean, std, min e max são exatos: cada bloco contribui com n,
+#     média e M2 = Σ(x - x̄)², juntados pela fórmula de Chan;
+#   - 25%/50%/75% vêm de um EsbocoQuantis por coluna, com erro relativo
+#     ≤ precisao_relativa (ver esbocos.py).
+# Resumos de blocos, arquivos ou processos diferentes podem ser mesclados.
+# ============================================================================
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from esbocos import EsbocoQuantis, PRECISAO_QUANTIS_PADRAO
+
+PERCENTIS_DESCRIBE = [0.25, 0.50, 0.75]
+
+
+class _MomentosColuna:
+    """
+    n, média e M2 de uma coluna (mínimo e máximo exatos ficam no esboço)
+    """
+
+    def __init__(self, precisao_relativa):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.esboco = EsbocoQuantis(precisao_relativa)
+
+    def _mesclar(self, n_b, media_b, m2_b):
+        if n_b == 0:
+            return
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.media += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+
+    def adicionar(self, valores):
+        x = np.asarray(valores, dtype=np.float64)
+        x = x[~np.isnan(x)]
+        if x.size == 0:
+            return
+        media = x.mean()
+        self._mesclar(x.size, media, float(((x - media) ** 2).sum()))
+        self.esboco.adicionar(x)
+
+    def mesclar(self, outro):
+        self._mesclar(outro.n, outro.media, outro.m2)
+        self.esboco.mesclar(outro.esboco)
+
+
+class ResumoNumerico:
+    """
+    Estatísticas descritivas mescláveis por coluna
+
+    Args:
+        colunas: colunas a resumir (None = colunas numéricas de cada bloco,
+            exceto booleanas, como o describe())
+        precisao_relativa: erro relativo máximo dos percentis
+    """
+
+    def __init__(self, colunas=None, precisao_relativa=PRECISAO_QUANTIS_PADRAO):
+        self.colunas = None if colunas is None else list(colunas)
+        self.precisao_relativa = precisao_relativa
+        self.momentos = {}
+
+    def _coluna(self, col):
+        if col not in self.momentos:
+            self.momentos[col] = _MomentosColuna(self.precisao_relativa)
+        return self.momentos[col]
+
+    def adicionar(self, bloco):
+        """
+        Acumula um bloco (DataFrame)
+        """
+        colunas = self.colunas
+        if colunas is None:
+            colunas = [c for c in bloco.columns
+                       if pd.api.types.is_numeric_dtype(bloco[c]) and not pd.api.types.is_bool_dtype(bloco[c])]
+        for col in colunas:
+            self._coluna(col).adicionar(bloco[col])
+        return self
+
+    def mesclar(self, outro):
+        """
+        Mescla outro resumo (mesma precisão) neste, no lugar
+        """
+        for col, momentos in outro.momentos.items():
+            self._coluna(col).mesclar(momentos)
+        return self
+
+    def tabela(self, colunas=None):
+        """
+        DataFrame indexado pela coluna com count, mean, std, min, 25%, 50%,
+        75%, max e CV (mesmo formato de describe().T + CV)
+
+        Args:
+            colunas: ordem/seleção das linhas (padrão: ordem de chegada)
+        """
+        linhas = {}
+        for col in (colunas or list(self.momentos)):
+            m = self.momentos[col]
+            std = math.sqrt(m.m2 / (m.n - 1)) if m.n > 1 else math.nan
+            q25, q50, q75 = m.esboco.quantis(PERCENTIS_DESCRIBE)
+            linhas[col] = {
+                'count': float(m.n),
+                'mean': m.media if m.n else math.nan,
+                'std': std,
+                'min': m.esboco.minimo if m.n else math.nan,
+                '25%': q25,
+                '50%': q50,
+                '75%': q75,
+                'max': m.esboco.maximo if m.n else math.nan
+            }
+        tabela = pd.DataFrame.from_dict(linhas, orient='index')
+        tabela['CV'] = (tabela['std'] / tabela['mean']) * 100  # Coeficiente de Variação
+        return tabela
+
+
+def resumo_em_blocos(blocos, colunas=None, precisao_relativa=PRECISAO_QUANTIS_PADRAO):
+    """
+    Tabela de estatísticas descritivas de um iterável de blocos
+    """
+    resumo = ResumoNumerico(colunas, precisao_relativa)
+    for bloco in blocos:
+        resumo.adicionar(bloco)
+    return resumo.tabela(colunas)
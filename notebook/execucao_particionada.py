@@ -0,0 +1,473 @@
+# ============================================================================
+# EXECUÇÃO PARTICIONADA (LIMPEZA, VALIDAÇÃO E AGREGAÇÃO EM PARALELO)
+# ============================================================================
+#
+# Divide a base inspecionada em partes por uma coluna-chave (padrão: State)
+# e processa as partes num pool de processos; o processo principal só
+# mescla resultados parciais pequenos e grava as mesmas saídas das etapas.
+#
+#   1. Particionamento: uma passada em blocos grava uma parte por valor da
+#      chave (ou por grupo de hash da chave, com --particoes). Linhas
+#      idênticas têm a mesma chave, então todas as cópias de uma linha caem
+#      na mesma parte: a deduplicação por parte é exata e, como a ordem das
+#      linhas é mantida, fica com a primeira ocorrência.
+#   2. Limpeza por parte: duplicatas, padronização, regras de validação,
+#      gravação da parte limpa e parciais mescláveis:
+#        - contagens (linhas, duplicatas, faltantes) e ValidadorRegras;
+#        - AcumuladorCorrelacao, agregados do cubo de churn (tabelas da EDA)
+#          e EstadoKPIs (métricas 12-18).
+#   3. Junção: partes limpas -> data/processed/03_dados_limpos.
+#   4. Estatísticas exatas da base juntada, uma coluna por vez: describe()
+#      (tabela 03), quartis dos limites de outliers e taxas por minuto.
+#   5. Contagem por parte: outliers e cobranças discrepantes contra esses
+#      limites e taxas; relatório da limpeza e tabelas 03-18 em
+#      outputs/metrics.
+#
+# Diferenças em relação às etapas sequenciais:
+#   - as linhas de 03_dados_limpos ficam agrupadas por parte (mesmo
+#     conjunto de linhas);
+#   - as estatísticas de 03_estatisticas_numericas, os quartis dos limites
+#     de outliers e as taxas por minuto são exatos: calculados depois da
+#     junção, lendo uma coluna (ou um par de colunas de tarifa) por vez de
+#     03_dados_limpos; médias e desvios podem diferir na última casa
+#     decimal, porque as linhas ficam em outra ordem;
+#   - gráficos, 04_dados_com_features e o modelo do dashboard continuam
+#     com eda_exploratoria.py, metricas_powerbi.py e exportacao_powerbi.py.
+#
+# As partes entram no pool da maior para a menor (cada processo pega a
+# próxima ao terminar), o que equilibra a carga entre chaves de tamanhos
+# diferentes. O particionamento e a junção são passadas sequenciais de
+# leitura e escrita; com CHURN_LIMITE_MEMORIA_MB e sem --tamanho-bloco,
+# o bloco delas é dimensionado pelo orçamento (memoria.linhas_por_bloco).
+#
+# Uso (a partir da raiz do projeto, depois de carregamento_inspecao.py):
+#   python notebook/execucao_particionada.py --processos 32
+#   python notebook/execucao_particionada.py --chave "Area code" --particoes 8
+# ============================================================================
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import (EscritorBlocos, bytes_por_linha, caminho_etapa, carregar_etapa, ler_em_blocos,
+                           salvar_etapa)
+from auditoria_tarifas import auditar_periodo, auditar_tarifas, TOLERANCIA_PADRAO
+from correlacao_streaming import AcumuladorCorrelacao
+from cubo_churn import montar_cubo, mesclar_agregados, tabela_churn
+from deduplicacao import remover_duplicatas
+from esquema import (COLUNAS_CORRELACAO, VARIAVEIS_COMPARACAO, PERIODOS_TARIFA, TIPO_CHURN_LABEL,
+                     padronizar_categoricas)
+from instrumentacao import Passo, iniciar_etapa, registrar_passo
+from kpis_incrementais import EstadoKPIs, derivar_segmentos, gravar_saidas, ARQUIVO_ESTADO
+from memoria import iniciar_medicao_memoria, linhas_por_bloco, registrar_memoria_etapa, LIMITE_MEMORIA_MB
+from outliers import limites_por_quartis, contar_fora_dos_limites, FATOR_IQR_EXTREMO
+from pontuacao_risco import pontuar
+from regras_validacao import REGRAS_LIMPEZA, ValidadorRegras
+
+ENTRADA_PADRAO = 'data/processed/02_dados_inspecionados'
+SAIDA_LIMPOS = 'data/processed/03_dados_limpos'
+PASTA_METRICAS = 'outputs/metrics'
+
+CHAVE_PADRAO = 'State'
+
+# Linhas lidas por vez no particionamento e na junção
+TAMANHO_BLOCO_PADRAO = 500_000
+
+# Dimensões do cubo de churn da EDA (tabelas 05-11)
+DIMENSOES_EDA = ['Churn_Label', 'International plan', 'Voice mail plan',
+                 'Customer service calls', 'State', 'Risco_Churn']
+
+# ============================================================================
+# PARTICIONAMENTO
+# ============================================================================
+
+
+def _rotulos_particao(serie, n_particoes):
+    """
+    Rótulo da parte de cada linha: a chave normalizada como na limpeza
+    (texto em maiúsculas, sem espaços) ou o grupo de hash dela
+    """
+    chave = serie.astype(str).str.upper().str.strip()
+    if not n_particoes:
+        return chave.to_numpy(dtype=object)
+    return pd.util.hash_array(chave.to_numpy(dtype=object)) % np.uint64(n_particoes)
+
+
+def particionar(caminho, pasta, chave=CHAVE_PADRAO, n_particoes=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Grava as linhas de um arquivo em partes pela coluna-chave, mantendo a
+    ordem das linhas dentro de cada parte
+
+    Args:
+        caminho: arquivo .parquet ou .csv
+        pasta: pasta das partes (parte-00000, parte-00001, ...)
+        chave: coluna que define as partes
+        n_particoes: None = uma parte por valor da chave; N = N grupos de hash
+        tamanho_bloco: linhas lidas por vez
+
+    Returns:
+        dict caminho base da parte -> (valor da chave ou grupo, linhas)
+    """
+    os.makedirs(pasta, exist_ok=True)
+    escritores = {}
+    try:
+        for bloco in ler_em_blocos(caminho, tamanho_bloco):
+            rotulos = pd.Series(_rotulos_particao(bloco[chave], n_particoes))
+            for rotulo, posicoes in rotulos.groupby(rotulos, sort=False, dropna=False).indices.items():
+                if rotulo not in escritores:
+                    escritores[rotulo] = EscritorBlocos(os.path.join(pasta, f'parte-{len(escritores):05d}'))
+                escritores[rotulo].escrever(bloco.iloc[posicoes])
+    finally:
+        for escritor in escritores.values():
+            escritor.fechar()
+    return {os.path.splitext(e.caminho)[0]: (rotulo, e.linhas) for rotulo, e in escritores.items()}
+
+# ============================================================================
+# PROCESSAMENTO DAS PARTES (EXECUTADO NOS PROCESSOS DO POOL)
+# ============================================================================
+
+
+def limpar_parte(entrada, saida):
+    """
+    Limpa uma parte (mesmos passos de limpeza_dados.py), grava a parte limpa
+    e calcula os parciais das tabelas da EDA e das métricas
+
+    Returns:
+        dict com contagens, acumuladores mescláveis e tempos da parte
+    """
+    inicio_parede, inicio_cpu = time.perf_counter(), time.process_time()
+
+    df = carregar_etapa(entrada)
+    linhas_entrada = len(df)
+    df, duplicatas = remover_duplicatas(df)
+    faltantes = df.isnull().sum()
+    padronizar_categoricas(df)
+
+    validador = ValidadorRegras(REGRAS_LIMPEZA)
+    validas = validador.adicionar(df)
+    if not validas.all():
+        df = df[validas]
+    salvar_etapa(df, saida, exportar_csv=False)
+
+    colunas_numericas = df.select_dtypes(include=[np.number]).columns.tolist()
+
+    # Colunas derivadas da EDA (mesmas definições de eda_exploratoria.py)
+    df['Churn_Label'] = df['Churn'].map({True: 'Saiu', False: 'Permaneceu'}).astype(TIPO_CHURN_LABEL)
+    df['Churn_Num'] = df['Churn'].astype('int8')
+    df['Risco_Churn'] = pontuar(df)
+    correlacao = AcumuladorCorrelacao([c for c in COLUNAS_CORRELACAO if c in df.columns]).adicionar(df)
+    cubo = montar_cubo(df, DIMENSOES_EDA, medidas=[c for c in VARIAVEIS_COMPARACAO if c in df.columns])
+
+    # Estado das métricas 12-18 (mesmas colunas de metricas_powerbi.py)
+    estado = EstadoKPIs.de_dataframe(derivar_segmentos(df))
+
+    return {
+        'linhas_entrada': linhas_entrada,
+        'linhas_saida': len(df),
+        'duplicatas': duplicatas,
+        'faltantes': faltantes,
+        'validador': validador,
+        'colunas_numericas': colunas_numericas,
+        'correlacao': correlacao,
+        'agregados': cubo.agregados,
+        'estado': estado,
+        'parede_s': time.perf_counter() - inicio_parede,
+        'cpu_s': time.process_time() - inicio_cpu
+    }
+
+
+def contar_parte(caminho, limites, taxas, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Conta outliers e cobranças discrepantes de uma parte limpa contra os
+    limites e as taxas globais
+
+    Returns:
+        dict com as contagens por coluna e por período e os tempos da parte
+    """
+    inicio_parede, inicio_cpu = time.perf_counter(), time.process_time()
+
+    colunas = list(limites.index)
+    colunas += [c for par in PERIODOS_TARIFA.values() for c in par if c not in colunas]
+    df = carregar_etapa(caminho, colunas=colunas)
+    outliers = contar_fora_dos_limites(df, limites['Limite_Inferior'], limites['Limite_Superior'])
+    auditoria, _ = auditar_tarifas(df, tolerancia=tolerancia, taxas=taxas)
+
+    return {
+        'linhas': len(df),
+        'outliers': outliers,
+        'inconsistencias': auditoria['Inconsistencias'],
+        'parede_s': time.perf_counter() - inicio_parede,
+        'cpu_s': time.process_time() - inicio_cpu
+    }
+
+
+def _executar(funcao, tarefas, processos):
+    """
+    Executa funcao(*args) para cada tarefa (dict nome -> args, na ordem de
+    envio) no pool, ou no próprio processo com processos=1
+
+    Returns:
+        dict nome -> resultado
+    """
+    if processos == 1:
+        return {nome: funcao(*args) for nome, args in tarefas.items()}
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {nome: executor.submit(funcao, *args) for nome, args in tarefas.items()}
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+
+def _registrar_partes(passo, resultados, rotulos):
+    # Tempos medidos nos processos do pool, uma linha por parte
+    for nome, resultado in resultados.items():
+        registrar_passo(f"{passo}:{os.path.basename(nome)}", resultado['parede_s'], resultado['cpu_s'],
+                        resultado.get('linhas_entrada', resultado.get('linhas')),
+                        resultado.get('linhas_saida'), chave=str(rotulos[nome]))
+
+# ============================================================================
+# JUNÇÃO DOS RESULTADOS
+# ============================================================================
+
+
+def juntar_partes(caminhos, caminho_base, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Concatena as partes limpas num único arquivo da etapa, em blocos
+    """
+    with EscritorBlocos(caminho_base) as escritor:
+        for caminho in caminhos:
+            for bloco in ler_em_blocos(caminho_etapa(caminho), tamanho_bloco):
+                escritor.escrever(bloco)
+    return escritor.caminho
+
+
+def _mesclar(objetos):
+    primeiro, *demais = objetos
+    for outro in demais:
+        primeiro.mesclar(outro)
+    return primeiro
+
+
+def estatisticas_exatas(caminho_base, colunas_numericas, periodos=PERIODOS_TARIFA):
+    """
+    Estatísticas exatas da base juntada, lendo uma coluna (ou um par de
+    colunas de tarifa) por vez: describe() de cada coluna numérica, Q1/Q3
+    para os limites de outliers e a mediana cobrança/minuto de cada período
+
+    Returns:
+        tabela 03 (como em eda_exploratoria.py), relatório de limites e
+        dict periodo -> taxa
+    """
+    descricoes, q1, q3 = {}, {}, {}
+    for col in colunas_numericas:
+        serie = carregar_etapa(caminho_base, [col])[col]
+        descricoes[col] = serie.describe()
+        q1[col], q3[col] = serie.quantile([0.25, 0.75])
+    estatisticas = pd.DataFrame(descricoes).T
+    estatisticas['CV'] = (estatisticas['std'] / estatisticas['mean']) * 100  # Coeficiente de Variação
+    limites = limites_por_quartis(pd.Series(q1), pd.Series(q3), FATOR_IQR_EXTREMO)
+
+    taxas = {}
+    for periodo, (col_minutos, col_cobranca) in periodos.items():
+        df = carregar_etapa(caminho_base, [col_minutos, col_cobranca])
+        taxas[periodo], _ = auditar_periodo(df[col_minutos], df[col_cobranca])
+    return estatisticas, limites, taxas
+
+
+def tabelas_eda(estatisticas, correlacao, agregados):
+    """
+    Tabelas 03-11 da EDA a partir das estatísticas exatas e dos parciais
+    mesclados, nos formatos de eda_exploratoria.py
+
+    Returns:
+        dict nome do arquivo -> dict (JSON) ou DataFrame (CSV)
+    """
+    # Médias por grupo = somas das medidas por Churn_Label / clientes
+    status = agregados['Churn_Label']
+    variaveis = [c for c in VARIAVEIS_COMPARACAO if c in status.columns]
+    comparacao = status[variaveis].div(status['Total'], axis=0).T
+    comparacao['Diferenca'] = comparacao['Saiu'] - comparacao['Permaneceu']
+    comparacao['Diferenca_%'] = (comparacao['Diferenca'] / comparacao['Permaneceu']) * 100
+
+    total_clientes = int(status['Total'].sum())
+    total_churners = int(status['Churners'].sum())
+    planos_intl = agregados['International plan']['Total']
+    planos_vmail = agregados['Voice mail plan']['Total']
+    metricas_gerais = {
+        'total_clientes': total_clientes,
+        'total_churners': total_churners,
+        'taxa_churn_%': float(total_churners / total_clientes * 100),
+        'clientes_intl_plan': int(planos_intl.get('Yes', 0)),
+        'clientes_voicemail': int(planos_vmail.get('Yes', 0)),
+        'media_customer_service_calls': float(status['Customer service calls'].sum() / total_clientes),
+        'media_total_day_minutes': float(status['Total day minutes'].sum() / total_clientes),
+        'media_total_day_charge': float(status['Total day charge'].sum() / total_clientes)
+    }
+
+    corr_churn = correlacao.correlacao()['Churn_Num'].sort_values(ascending=False)
+    churn_por_estado = tabela_churn(agregados['State'], nome_total='Total_Clientes')
+
+    return {
+        '03_estatisticas_numericas.csv': estatisticas,
+        '04_correlacoes_churn.csv': corr_churn.to_frame('Correlacao'),
+        '05_comparacao_churners.csv': comparacao,
+        '06_churn_por_estado.csv': churn_por_estado.sort_values('Taxa_Churn_%', ascending=False),
+        '07_metricas_gerais.json': metricas_gerais,
+        '08_churn_international_plan.csv': tabela_churn(agregados['International plan']),
+        '09_churn_voicemail_plan.csv': tabela_churn(agregados['Voice mail plan']),
+        '10_churn_customer_service.csv': tabela_churn(agregados['Customer service calls']),
+        '11_churn_segmento_risco.csv': tabela_churn(agregados['Risco_Churn'], casas=None)
+    }
+
+
+def executar_particionado(entrada=ENTRADA_PADRAO, chave=CHAVE_PADRAO, n_particoes=None, processos=None,
+                          tamanho_bloco=TAMANHO_BLOCO_PADRAO, pasta_temporaria=None,
+                          pasta_metricas=PASTA_METRICAS, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Executa limpeza, validação e agregação por partes e grava as saídas
+
+    Args:
+        entrada: caminho base da etapa de entrada (sem extensão)
+        chave: coluna que define as partes
+        n_particoes: None = uma parte por valor da chave; N = N grupos de hash
+        processos: processos em paralelo (padrão: nº de núcleos)
+        tamanho_bloco: linhas por bloco no particionamento e na junção
+        pasta_temporaria: onde criar a pasta das partes (padrão: tempfile)
+        pasta_metricas: destino das tabelas e do relatório
+        tolerancia: erro relativo aceito nas cobranças
+
+    Returns:
+        dict com o relatório da limpeza, o número de partes e os arquivos
+        gravados
+    """
+    pasta = tempfile.mkdtemp(prefix='particoes_', dir=pasta_temporaria)
+    try:
+        passo = Passo('particionamento')
+        partes = particionar(caminho_etapa(entrada), os.path.join(pasta, 'entrada'), chave,
+                             n_particoes, tamanho_bloco)
+        linhas = sum(n for _, n in partes.values())
+        passo.concluir(linhas_saida=linhas, partes=len(partes))
+
+        rotulos = {nome: rotulo for nome, (rotulo, _) in partes.items()}
+        processos = max(1, min(processos or os.cpu_count() or 1, len(partes)))
+        limpas = {nome: os.path.join(pasta, 'limpas', os.path.basename(nome)) for nome in partes}
+        os.makedirs(os.path.join(pasta, 'limpas'))
+
+        # Maiores partes primeiro
+        ordem = sorted(partes, key=lambda nome: partes[nome][1], reverse=True)
+
+        passo = Passo('limpeza_partes', linhas_entrada=linhas)
+        resultados = _executar(limpar_parte, {nome: (nome, limpas[nome]) for nome in ordem}, processos)
+        passo.concluir(linhas_saida=sum(r['linhas_saida'] for r in resultados.values()),
+                       processos=processos)
+        _registrar_partes('limpeza', resultados, rotulos)
+
+        passo = Passo('mescla')
+        parciais = [resultados[nome] for nome in ordem]
+        validador = _mesclar([r['validador'] for r in parciais])
+        correlacao = _mesclar([r['correlacao'] for r in parciais])
+        estado = _mesclar([r['estado'] for r in parciais])
+        agregados = mesclar_agregados(*(r['agregados'] for r in parciais))
+        faltantes = sum(r['faltantes'] for r in parciais)
+        colunas_numericas = parciais[0]['colunas_numericas']
+        passo.concluir()
+
+        passo = Passo('juntar_partes')
+        caminho_limpos = juntar_partes([limpas[nome] for nome in partes], SAIDA_LIMPOS, tamanho_bloco)
+        passo.concluir(linhas_saida=int(validador.linhas - validador.linhas_invalidas))
+
+        # Quartis, limites e taxas exatos a partir da base juntada
+        passo = Passo('estatisticas_exatas', linhas_entrada=int(validador.linhas - validador.linhas_invalidas))
+        estatisticas, limites, taxas = estatisticas_exatas(SAIDA_LIMPOS, colunas_numericas)
+        passo.concluir(colunas=len(colunas_numericas))
+
+        passo = Passo('contagem_partes')
+        contagens = _executar(contar_parte, {nome: (limpas[nome], limites, taxas, tolerancia) for nome in ordem},
+                              processos)
+        outliers = sum(c['outliers'] for c in contagens.values())
+        inconsistencias = sum(c['inconsistencias'] for c in contagens.values())
+        passo.concluir(outliers=int(outliers.sum()), inconsistencias=int(inconsistencias.sum()))
+        _registrar_partes('contagem', contagens, rotulos)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    relatorio_limpeza = {
+        'registros_originais': int(linhas),
+        'registros_finais': int(validador.linhas - validador.linhas_invalidas),
+        'duplicatas_removidas': int(sum(r['duplicatas'] for r in parciais)),
+        'valores_faltantes_tratados': int(faltantes.sum()),
+        'outliers_detectados': {col: int(n) for col, n in outliers.items()}
+    }
+
+    passo = Passo('saidas')
+    os.makedirs(pasta_metricas, exist_ok=True)
+    with open(os.path.join(pasta_metricas, '02_relatorio_limpeza.json'), 'w') as f:
+        json.dump(relatorio_limpeza, f, indent=4)
+    arquivos = ['02_relatorio_limpeza.json']
+    arquivos += gravar_saidas(tabelas_eda(estatisticas, correlacao, agregados), pasta_metricas)
+    arquivos += gravar_saidas(estado.saidas(), pasta_metricas)
+    estado.salvar(ARQUIVO_ESTADO)
+    passo.concluir(arquivos=len(arquivos))
+
+    return {
+        'relatorio_limpeza': relatorio_limpeza,
+        'regras': validador.relatorio(),
+        'taxas': taxas,
+        'inconsistencias': inconsistencias,
+        'partes': len(partes),
+        'processos': processos,
+        'dados_limpos': caminho_limpos,
+        'arquivos': [os.path.join(pasta_metricas, a) for a in arquivos] + [ARQUIVO_ESTADO]
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Limpeza, validação e agregação em paralelo por partes')
+    parser.add_argument('--entrada', default=ENTRADA_PADRAO, help='Etapa de entrada, sem extensão')
+    parser.add_argument('--chave', default=CHAVE_PADRAO, help='Coluna que define as partes')
+    parser.add_argument('--particoes', type=int, default=None,
+                        help='Agrupa os valores da chave em N partes por hash (padrão: uma por valor)')
+    parser.add_argument('--processos', type=int, default=None, help='Padrão: nº de núcleos')
+    parser.add_argument('--tamanho-bloco', type=int, default=None,
+                        help=f'Padrão: {TAMANHO_BLOCO_PADRAO:,}, ou o que couber em CHURN_LIMITE_MEMORIA_MB')
+    parser.add_argument('--pasta-temporaria', default=None)
+    args = parser.parse_args()
+
+    iniciar_medicao_memoria()
+    iniciar_etapa()
+    tamanho_bloco = args.tamanho_bloco or TAMANHO_BLOCO_PADRAO
+    if args.tamanho_bloco is None and LIMITE_MEMORIA_MB is not None:
+        # Orçamento de memória: blocos do tamanho que cabe no limite
+        tamanho_bloco = linhas_por_bloco(bytes_por_linha(caminho_etapa(args.entrada)), TAMANHO_BLOCO_PADRAO)
+    inicio = time.perf_counter()
+    resultado = executar_particionado(args.entrada, args.chave, args.particoes, args.processos,
+                                      tamanho_bloco, args.pasta_temporaria)
+    segundos = time.perf_counter() - inicio
+
+    relatorio = resultado['relatorio_limpeza']
+    print(f"✅ {relatorio['registros_originais']:,} linhas em {resultado['partes']} partes por "
+          f"'{args.chave}', {resultado['processos']} processos ({segundos:.1f}s, "
+          f"{relatorio['registros_originais'] / segundos:,.0f} linhas/s)")
+    print(f"   Duplicatas removidas: {relatorio['duplicatas_removidas']:,}")
+    print(f"   Registros finais: {relatorio['registros_finais']:,}")
+
+    regras = resultado['regras']
+    for regra, n in regras.loc[regras['Violacoes'] > 0, 'Violacoes'].items():
+        print(f"   ⚠️  {regra}: {n} registros violam a regra")
+    for periodo, taxa in resultado['taxas'].items():
+        print(f"   ✓ Taxa {periodo} (mediana): ${taxa:.4f} por minuto, "
+              f"{resultado['inconsistencias'][periodo]} discrepâncias")
+
+    print(f"✅ Dados limpos: {resultado['dados_limpos']}")
+    for caminho in resultado['arquivos']:
+        print(f"✅ Salvo: {caminho}")
+
+    registrar_memoria_etapa("execucao_particionada.py")
@@ -0,0 +1,79 @@
+from preparacao_ambiente import *
+preparar_etapa()
+
+import os
+import sys
+from armazenamento import carregar_etapa
+from modelo_estrela import (montar_modelo_estrela, exportar_incremental, data_snapshot, PASTA_MODELO,
+                            TABELA_FATO, PARTICAO_PADRAO, COLUNA_SNAPSHOT, ARQUIVO_MANIFESTO)
+from memoria import registrar_memoria_etapa
+from instrumentacao import Passo, medir
+
+# Data do snapshot (padrão: hoje) e dimensão que divide cada snapshot
+DATA_SNAPSHOT = data_snapshot()
+PARTICAO = os.environ.get('CHURN_PARTICAO_DASHBOARD', PARTICAO_PADRAO)
+
+# ============================================================================
+# CARREGAMENTO DOS DADOS COM FEATURES
+# ============================================================================
+
+print_section("EXPORTAÇÃO PARA O POWER BI (MODELO ESTRELA)")
+
+passo = Passo('carga')
+df = carregar_etapa('data/processed/04_dados_com_features')
+passo.concluir(linhas_saida=len(df))
+print(f"✅ Dados carregados: {len(df):,} linhas × {df.shape[1]} colunas")
+
+# ============================================================================
+# 1. TABELA FATO E DIMENSÕES
+# ============================================================================
+
+print_section("1. MONTAGEM DO MODELO ESTRELA")
+
+# Rótulos de texto (State, planos, segmentos, faixas) viram chaves inteiras
+# na tabela fato; cada rótulo aparece uma única vez, na sua dimensão
+with medir('modelo_estrela', linhas_entrada=len(df)) as passo:
+    tabelas = montar_modelo_estrela(df)
+    passo.contadores['tabelas'] = len(tabelas)
+
+for nome, tabela in tabelas.items():
+    print(f"   📊 {nome}: {len(tabela):,} linhas × {tabela.shape[1]} colunas")
+
+# ============================================================================
+# 2. GRAVAÇÃO (FORMATO COLUNAR)
+# ============================================================================
+
+print_section("2. GRAVAÇÃO INCREMENTAL DAS TABELAS")
+
+print(f"📅 Snapshot: {DATA_SNAPSHOT} | Partição: {PARTICAO}")
+
+# Só os arquivos com conteúdo diferente do manifesto são reescritos
+try:
+    with medir('exportacao', linhas_entrada=len(df)) as passo:
+        resultado = exportar_incremental(tabelas, DATA_SNAPSHOT, PASTA_MODELO, PARTICAO)
+        passo.contadores.update({chave: len(lista) for chave, lista in resultado.items()})
+except ValueError as erro:
+    print(f"❌ {erro}")
+    sys.exit(1)
+
+for relativo in resultado['gravados']:
+    tamanho = os.path.getsize(os.path.join(PASTA_MODELO, relativo))
+    print(f"✅ {relativo} ({tamanho / 1024:,.1f} KB)")
+for relativo in resultado['removidos']:
+    print(f"🗑️  {relativo}")
+
+print(f"\n📊 Arquivos: {len(resultado['gravados'])} gravados, "
+      f"{len(resultado['inalterados'])} inalterados, {len(resultado['removidos'])} removidos")
+print(f"📄 Manifesto: {os.path.join(PASTA_MODELO, ARQUIVO_MANIFESTO)}")
+print(f"💡 No Power BI: relacione {TABELA_FATO} a cada dimensão pela coluna chave_* "
+      f"e filtre {COLUNA_SNAPSHOT} por RangeStart/RangeEnd na atualização incremental")
+
+# Registrar no log
+salvar_info_execucao("exportacao_powerbi.py",
+                     f"Modelo estrela exportado (snapshot {DATA_SNAPSHOT}): "
+                     f"{len(resultado['gravados'])} arquivos gravados, "
+                     f"{len(resultado['inalterados'])} inalterados")
+
+registrar_memoria_etapa("exportacao_powerbi.py")
+
+print("\n🎉 EXPORTAÇÃO PARA O POWER BI CONCLUÍDA!")
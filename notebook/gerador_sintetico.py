@@ -0,0 +1,282 @@
+# ============================================================================
+# GERADOR DE DADOS SINTÉTICOS (ESQUEMA BIGML CHURN EM QUALQUER ESCALA)
+# ============================================================================
+#
+# 1. aprender_modelo: lê a base bruta e guarda (em JSON) as distribuições
+#    que importam para o pipeline:
+#      - frequências de State e Area code; taxas de International plan e
+#        Voice mail plan;
+#      - Account length e Customer service calls pela distribuição empírica;
+#      - minutos e chamadas por período (normal truncada em 0) e a tarifa
+#        por minuto de cada período (cobrança = minutos·tarifa, ao centavo);
+#      - Number vmail messages: 0 sem Voice mail plan, distribuição
+#        empírica dos clientes com o plano;
+#      - taxa de churn por International plan × Customer service calls
+#        (até LIMITE_CHAMADAS_CHURN+), suavizada em direção à taxa geral.
+# 2. gerar_base: grava N linhas em partes (shards) de tamanho fixo, em
+#    paralelo. A parte i usa a semente (semente, i): o resultado é o mesmo
+#    com qualquer número de processos, e cada parte é gerada em blocos
+#    vetorizados (memória limitada pelo bloco).
+#
+# Uso:
+#   python notebook/gerador_sintetico.py --linhas 100000000 --saida data/sintetico
+#   python notebook/gerador_sintetico.py --linhas 1000000 --arquivo-unico data/raw/telecom_churn_raw.csv
+# ============================================================================
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import EscritorBlocos, PYARROW_DISPONIVEL
+from esquema import PERIODOS_TARIFA
+
+ARQUIVO_ORIGEM = 'data/raw/churn-bigml-80.csv'
+
+ORDEM_COLUNAS = [
+    'State', 'Account length', 'Area code', 'International plan', 'Voice mail plan',
+    'Number vmail messages', 'Total day minutes', 'Total day calls', 'Total day charge',
+    'Total eve minutes', 'Total eve calls', 'Total eve charge', 'Total night minutes',
+    'Total night calls', 'Total night charge', 'Total intl minutes', 'Total intl calls',
+    'Total intl charge', 'Customer service calls', 'Churn'
+]
+
+# Chamadas ao suporte a partir das quais o churn é tratado como uma faixa só
+LIMITE_CHAMADAS_CHURN = 5
+
+# Peso (em clientes) da taxa geral na suavização das taxas por célula
+PESO_SUAVIZACAO = 2
+
+LINHAS_POR_PARTE_PADRAO = 5_000_000
+TAMANHO_BLOCO_PADRAO = 500_000
+
+
+def _frequencias(serie):
+    contagem = serie.value_counts(normalize=True).sort_index()
+    return {'valores': contagem.index.tolist(), 'probabilidades': contagem.tolist()}
+
+
+def aprender_modelo(caminho=ARQUIVO_ORIGEM):
+    """
+    Aprende as distribuições da base bruta
+
+    Returns:
+        dict serializável em JSON (ver salvar_modelo)
+    """
+    df = pd.read_csv(caminho)
+
+    periodos = {}
+    for periodo, (col_minutos, col_cobranca) in PERIODOS_TARIFA.items():
+        col_chamadas = col_minutos.replace('minutes', 'calls')
+        com_minutos = df[col_minutos] > 0
+        periodos[periodo] = {
+            'minutos_media': float(df[col_minutos].mean()),
+            'minutos_desvio': float(df[col_minutos].std()),
+            'chamadas_media': float(df[col_chamadas].mean()),
+            'chamadas_desvio': float(df[col_chamadas].std()),
+            'tarifa': float((df.loc[com_minutos, col_cobranca] / df.loc[com_minutos, col_minutos]).median())
+        }
+
+    chamadas_faixa = df['Customer service calls'].clip(upper=LIMITE_CHAMADAS_CHURN)
+    taxa_geral = float(df['Churn'].mean())
+    celulas = df.groupby([df['International plan'] == 'Yes', chamadas_faixa])['Churn'].agg(['sum', 'count'])
+    taxas = np.full((2, LIMITE_CHAMADAS_CHURN + 1), taxa_geral)
+    for (intl, chamadas), linha in celulas.iterrows():
+        taxas[int(intl), int(chamadas)] = ((linha['sum'] + PESO_SUAVIZACAO * taxa_geral)
+                                           / (linha['count'] + PESO_SUAVIZACAO))
+
+    com_vmail = df['Voice mail plan'] == 'Yes'
+    return {
+        'origem': os.path.basename(caminho),
+        'linhas_origem': int(len(df)),
+        'state': _frequencias(df['State']),
+        'area_code': _frequencias(df['Area code']),
+        'taxa_international_plan': float((df['International plan'] == 'Yes').mean()),
+        'taxa_voice_mail_plan': float(com_vmail.mean()),
+        'account_length': _frequencias(df['Account length']),
+        'customer_service_calls': _frequencias(df['Customer service calls']),
+        'vmail_messages_com_plano': _frequencias(df.loc[com_vmail, 'Number vmail messages']),
+        'periodos': periodos,
+        'taxa_churn_geral': taxa_geral,
+        'taxa_churn_intl_chamadas': taxas.tolist()
+    }
+
+
+def salvar_modelo(modelo, caminho):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(modelo, f, indent=4)
+
+
+def carregar_modelo(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _amostrar(rng, distribuicao, n):
+    valores = np.asarray(distribuicao['valores'])
+    return valores[rng.choice(len(valores), size=n, p=distribuicao['probabilidades'])]
+
+
+def _normal_truncada(rng, media, desvio, n, casas):
+    return np.maximum(rng.normal(media, desvio, n), 0).round(casas)
+
+
+def gerar_bloco(modelo, n, rng):
+    """
+    Gera n clientes (DataFrame com as colunas da base bruta)
+    """
+    dados = {
+        'State': _amostrar(rng, modelo['state'], n),
+        'Account length': _amostrar(rng, modelo['account_length'], n),
+        'Area code': _amostrar(rng, modelo['area_code'], n)
+    }
+
+    intl = rng.random(n) < modelo['taxa_international_plan']
+    vmail = rng.random(n) < modelo['taxa_voice_mail_plan']
+    dados['International plan'] = np.where(intl, 'Yes', 'No')
+    dados['Voice mail plan'] = np.where(vmail, 'Yes', 'No')
+    dados['Number vmail messages'] = np.where(vmail, _amostrar(rng, modelo['vmail_messages_com_plano'], n), 0)
+
+    for periodo, (col_minutos, col_cobranca) in PERIODOS_TARIFA.items():
+        parametros = modelo['periodos'][periodo]
+        minutos = _normal_truncada(rng, parametros['minutos_media'], parametros['minutos_desvio'], n, 1)
+        dados[col_minutos] = minutos
+        dados[col_minutos.replace('minutes', 'calls')] = _normal_truncada(
+            rng, parametros['chamadas_media'], parametros['chamadas_desvio'], n, 0).astype(np.int64)
+        dados[col_cobranca] = (minutos * parametros['tarifa']).round(2)
+
+    chamadas = _amostrar(rng, modelo['customer_service_calls'], n)
+    dados['Customer service calls'] = chamadas
+    taxas = np.asarray(modelo['taxa_churn_intl_chamadas'])
+    dados['Churn'] = rng.random(n) < taxas[intl.astype(np.intp), np.minimum(chamadas, LIMITE_CHAMADAS_CHURN)]
+
+    return pd.DataFrame(dados, columns=ORDEM_COLUNAS)
+
+
+def _escrever_csv(bloco, caminho, novo):
+    """
+    Acrescenta um bloco ao CSV no formato da base bruta (sem aspas, pois os
+    textos gerados não têm vírgulas nem aspas, e Churn como True/False);
+    com pyarrow a formatação é feita em C++
+    """
+    if not PYARROW_DISPONIVEL:
+        bloco.to_csv(caminho, mode='w' if novo else 'a', header=novo, index=False)
+        return
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    bloco = bloco.assign(Churn=np.where(bloco['Churn'], 'True', 'False'))
+    with open(caminho, 'wb' if novo else 'ab') as f:
+        if novo:
+            f.write((','.join(bloco.columns) + '\n').encode('utf-8'))
+        pa_csv.write_csv(pa.Table.from_pandas(bloco, preserve_index=False), f,
+                         pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+
+
+def gerar_parte(modelo, indice, linhas, caminho_base, semente, formato='csv',
+                tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Gera e grava uma parte (shard) com sementes próprias
+
+    Returns:
+        caminho do arquivo gravado
+    """
+    rng = np.random.default_rng([semente, indice])
+    if formato == 'parquet':
+        with EscritorBlocos(caminho_base) as escritor:
+            for inicio in range(0, linhas, tamanho_bloco):
+                escritor.escrever(gerar_bloco(modelo, min(tamanho_bloco, linhas - inicio), rng))
+        return escritor.caminho
+
+    caminho = f"{caminho_base}.csv"
+    for inicio in range(0, linhas, tamanho_bloco):
+        _escrever_csv(gerar_bloco(modelo, min(tamanho_bloco, linhas - inicio), rng), caminho, inicio == 0)
+    return caminho
+
+
+def gerar_base(modelo, linhas, pasta_saida, semente=0, linhas_por_parte=LINHAS_POR_PARTE_PADRAO,
+               processos=None, formato='csv'):
+    """
+    Gera a base em partes parte-00000, parte-00001, ... na pasta de saída
+
+    Args:
+        modelo: resultado de aprender_modelo
+        linhas: total de linhas
+        semente: semente global (mesma semente e linhas_por_parte = mesmos
+            dados, com qualquer número de processos)
+        linhas_por_parte: linhas de cada parte
+        processos: processos em paralelo (padrão: nº de núcleos)
+        formato: 'csv' ou 'parquet'
+
+    Returns:
+        lista de caminhos das partes, em ordem
+    """
+    os.makedirs(pasta_saida, exist_ok=True)
+    tamanhos = [min(linhas_por_parte, linhas - inicio) for inicio in range(0, linhas, linhas_por_parte)]
+    bases = [os.path.join(pasta_saida, f'parte-{i:05d}') for i in range(len(tamanhos))]
+    processos = max(1, min(processos or os.cpu_count() or 1, len(tamanhos)))
+
+    if processos == 1:
+        return [gerar_parte(modelo, i, n, base, semente, formato)
+                for i, (n, base) in enumerate(zip(tamanhos, bases))]
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = [executor.submit(gerar_parte, modelo, i, n, base, semente, formato)
+                   for i, (n, base) in enumerate(zip(tamanhos, bases))]
+        return [f.result() for f in futuros]
+
+
+def juntar_csv(partes, destino):
+    """
+    Concatena partes CSV num único arquivo (um cabeçalho), copiando em blocos
+    """
+    with open(destino, 'wb') as saida:
+        for i, parte in enumerate(partes):
+            with open(parte, 'rb') as entrada:
+                cabecalho = entrada.readline()
+                if i == 0:
+                    saida.write(cabecalho)
+                shutil.copyfileobj(entrada, saida, 16 * 1024 * 1024)
+    return destino
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gerador de dados sintéticos de churn')
+    parser.add_argument('--linhas', type=int, required=True)
+    parser.add_argument('--saida', default='data/sintetico', help='Pasta das partes')
+    parser.add_argument('--arquivo-unico', default=None,
+                        help='Junta as partes CSV neste arquivo (ex: data/raw/telecom_churn_raw.csv)')
+    parser.add_argument('--origem', default=ARQUIVO_ORIGEM, help='Base bruta para aprender o modelo')
+    parser.add_argument('--modelo', default=None, help='Modelo JSON salvo (dispensa --origem)')
+    parser.add_argument('--salvar-modelo', default=None, help='Grava o modelo aprendido neste JSON')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--linhas-por-parte', type=int, default=LINHAS_POR_PARTE_PADRAO)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--formato', choices=['csv', 'parquet'], default='csv')
+    args = parser.parse_args()
+    if args.arquivo_unico and args.formato != 'csv':
+        parser.error('--arquivo-unico exige --formato csv')
+
+    modelo = carregar_modelo(args.modelo) if args.modelo else aprender_modelo(args.origem)
+    if args.salvar_modelo:
+        salvar_modelo(modelo, args.salvar_modelo)
+        print(f"✅ Modelo salvo: {args.salvar_modelo}")
+
+    inicio = time.perf_counter()
+    partes = gerar_base(modelo, args.linhas, args.saida, args.semente, args.linhas_por_parte,
+                        args.processos, args.formato)
+    segundos = time.perf_counter() - inicio
+    print(f"✅ {args.linhas:,} linhas em {len(partes)} partes ({segundos:.1f}s, "
+          f"{args.linhas / segundos:,.0f} linhas/s): {args.saida}")
+
+    if args.arquivo_unico:
+        os.makedirs(os.path.dirname(args.arquivo_unico) or '.', exist_ok=True)
+        print(f"✅ Arquivo único: {juntar_csv(partes, args.arquivo_unico)}")
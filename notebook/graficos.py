@@ -0,0 +1,254 @@
+# ============================================================================
+# RENDERIZAÇÃO PARALELA DOS GRÁFICOS
+# ============================================================================
+#
+# Cada gráfico vira uma tarefa: nome da função de desenho + dados já
+# resumidos (contagens, histogramas, estatísticas de boxplot, matriz de
+# correlação) + caminho de saída. As tarefas são renderizadas num pool de
+# processos com backend não interativo (Agg); o processo principal não
+# precisa importar matplotlib.
+#
+# Perfis:
+#   final  → dpi=300, bbox_inches='tight' (padrão, arquivos publicados)
+#   previa → dpi=72, sem passada de bbox justo (iteração rápida)
+# Escolha com CHURN_PERFIL_GRAFICOS=previa; CHURN_PROCESSOS_GRAFICOS=N
+# limita o número de processos (1 = renderiza no próprio processo).
+# ============================================================================
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from preparacao_ambiente import COLORS, carregar_graficos
+from instrumentacao import registrar_passo
+
+PERFIS = {
+    'final': {'dpi': 300, 'bbox_inches': 'tight'},
+    'previa': {'dpi': 72, 'bbox_inches': None}
+}
+
+PERFIL_PADRAO = os.environ.get('CHURN_PERFIL_GRAFICOS', 'final')
+
+# Rótulos de churn na ordem em que aparecem nos gráficos
+ROTULOS_CHURN = ['Permaneceu', 'Saiu']
+
+# ============================================================================
+# RESUMOS PARA AS TAREFAS (CALCULADOS NO PROCESSO PRINCIPAL)
+# ============================================================================
+
+
+def resumo_histograma(valores, bins=30):
+    """
+    Contagens e bordas do histograma, mais a média (payload pequeno)
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[~np.isnan(valores)]
+    contagens, bordas = np.histogram(valores, bins=bins)
+    return {'contagens': contagens, 'bordas': bordas, 'media': float(valores.mean())}
+
+
+def estatisticas_boxplot(valores, whis=1.5):
+    """
+    Estatísticas de um boxplot (mesmo critério do matplotlib: quartis com
+    interpolação linear e bigodes em whis×IQR), no formato de Axes.bxp
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[~np.isnan(valores)]
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    iqr = q3 - q1
+    dentro = valores[(valores >= q1 - whis * iqr) & (valores <= q3 + whis * iqr)]
+    return {
+        'med': mediana,
+        'q1': q1,
+        'q3': q3,
+        'whislo': dentro.min() if dentro.size else q1,
+        'whishi': dentro.max() if dentro.size else q3,
+        'fliers': valores[(valores < q1 - whis * iqr) | (valores > q3 + whis * iqr)],
+        'mean': valores.mean()
+    }
+
+# ============================================================================
+# FUNÇÕES DE DESENHO (EXECUTADAS NOS PROCESSOS DE RENDERIZAÇÃO)
+# ============================================================================
+
+
+def desenhar_distribuicao_churn(plt, sns, dados):
+    """
+    Barras + pizza da distribuição de churn
+    """
+    valores = [dados['permaneceu'], dados['saiu']]
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    # Gráfico de barras
+    axes[0].bar(['Permaneceu', 'Saiu'], valores,
+                color=[COLORS['churn_no'], COLORS['churn_yes']])
+    axes[0].set_title('Distribuição de Churn (Contagem)', fontsize=14, fontweight='bold')
+    axes[0].set_ylabel('Número de Clientes')
+    axes[0].grid(axis='y', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for i, v in enumerate(valores):
+        axes[0].text(i, v + 30, f'{v:,}', ha='center', fontweight='bold')
+
+    # Gráfico de pizza
+    axes[1].pie(valores,
+                labels=['Permaneceu', 'Saiu'],
+                autopct='%1.1f%%',
+                colors=[COLORS['churn_no'], COLORS['churn_yes']],
+                startangle=90,
+                explode=(0, 0.1))
+    axes[1].set_title('Proporção de Churn', fontsize=14, fontweight='bold')
+    return fig
+
+
+def desenhar_histogramas(plt, sns, dados):
+    """
+    Grade 3×2 de histogramas com a linha da média
+    """
+    fig, axes = plt.subplots(3, 2, figsize=(15, 12))
+    axes = axes.ravel()
+
+    for idx, (col, resumo) in enumerate(dados['variaveis']):
+        bordas = resumo['bordas']
+        axes[idx].hist(bordas[:-1], bins=bordas, weights=resumo['contagens'],
+                       color=COLORS['primary'], alpha=0.7, edgecolor='black')
+        axes[idx].set_title(f'Distribuição: {col}', fontweight='bold')
+        axes[idx].set_xlabel(col)
+        axes[idx].set_ylabel('Frequência')
+        axes[idx].grid(axis='y', alpha=0.3)
+
+        # Adicionar linha da média
+        media = resumo['media']
+        axes[idx].axvline(media, color='red', linestyle='--', linewidth=2, label=f'Média: {media:.1f}')
+        axes[idx].legend()
+    return fig
+
+
+def desenhar_barras_churn(plt, sns, dados):
+    """
+    Barras agrupadas Permaneceu/Saiu a partir de uma tabela de contagens
+    """
+    fig, ax = plt.subplots(figsize=dados.get('figsize', (10, 6)))
+    kwargs = {'width': dados['largura']} if 'largura' in dados else {}
+    dados['tabela'].plot(kind='bar', ax=ax, color=[COLORS['churn_no'], COLORS['churn_yes']], **kwargs)
+    ax.set_title(dados['titulo'], fontsize=14, fontweight='bold')
+    ax.set_xlabel(dados['xlabel'])
+    ax.set_ylabel('Número de Clientes')
+    ax.legend(title='Status')
+    ax.grid(axis='y', alpha=0.3)
+    plt.xticks(rotation=0)
+    return fig
+
+
+def desenhar_heatmap(plt, sns, dados):
+    """
+    Heatmap de uma matriz de correlação
+    """
+    fig, ax = plt.subplots(figsize=(12, 10))
+    sns.heatmap(dados['matriz'],
+                annot=True,
+                fmt='.2f',
+                cmap='coolwarm',
+                center=0,
+                square=True,
+                linewidths=1,
+                cbar_kws={"shrink": 0.8},
+                ax=ax)
+    ax.set_title(dados['titulo'], fontsize=14, fontweight='bold')
+    return fig
+
+
+def desenhar_boxplots(plt, sns, dados):
+    """
+    Grade 2×3 de boxplots por status de churn, a partir de estatísticas
+    """
+    fig, axes = plt.subplots(2, 3, figsize=(16, 10))
+    axes = axes.ravel()
+
+    for idx, (col, stats_por_grupo) in enumerate(dados['variaveis']):
+        stats = []
+        for rotulo in ROTULOS_CHURN:
+            if rotulo in stats_por_grupo:
+                stats.append(dict(stats_por_grupo[rotulo], label=rotulo))
+        axes[idx].bxp(stats, patch_artist=True,
+                      boxprops=dict(facecolor=COLORS['primary'], alpha=0.6),
+                      medianprops=dict(color='red', linewidth=2))
+
+        axes[idx].set_title(f'{col}', fontweight='bold', fontsize=11)
+        axes[idx].set_xlabel('')
+        axes[idx].set_ylabel(col, fontsize=9)
+        axes[idx].grid(axis='y', alpha=0.3)
+    return fig
+
+
+FUNCOES_DESENHO = {
+    'distribuicao_churn': desenhar_distribuicao_churn,
+    'histogramas': desenhar_histogramas,
+    'barras_churn': desenhar_barras_churn,
+    'heatmap': desenhar_heatmap,
+    'boxplots': desenhar_boxplots
+}
+
+# ============================================================================
+# EXECUÇÃO DAS TAREFAS
+# ============================================================================
+
+
+def tarefa_grafico(tipo, caminho, **dados):
+    """
+    Cria a descrição de uma tarefa de renderização
+
+    Args:
+        tipo: chave de FUNCOES_DESENHO
+        caminho: arquivo PNG de saída
+        **dados: dados já resumidos para a função de desenho
+    """
+    if tipo not in FUNCOES_DESENHO:
+        raise ValueError(f"Tipo de gráfico desconhecido: {tipo}")
+    return {'tipo': tipo, 'caminho': caminho, 'dados': dados}
+
+
+def _renderizar(tarefa, perfil):
+    inicio = time.perf_counter()
+    plt, sns = carregar_graficos()
+    fig = FUNCOES_DESENHO[tarefa['tipo']](plt, sns, tarefa['dados'])
+    fig.tight_layout()
+    fig.savefig(tarefa['caminho'], **PERFIS[perfil])
+    plt.close(fig)
+    return tarefa['caminho'], time.perf_counter() - inicio
+
+
+def renderizar_graficos(tarefas, perfil=None, processos=None):
+    """
+    Renderiza as tarefas em paralelo (um processo por gráfico, até o número
+    de núcleos)
+
+    Args:
+        tarefas: lista criada com tarefa_grafico
+        perfil: 'final' ou 'previa' (padrão: CHURN_PERFIL_GRAFICOS ou 'final')
+        processos: máximo de processos (padrão: CHURN_PROCESSOS_GRAFICOS ou
+            nº de núcleos); 1 renderiza no próprio processo
+
+    Returns:
+        Lista de (caminho, segundos) na ordem das tarefas
+    """
+    perfil = perfil or PERFIL_PADRAO
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil desconhecido: {perfil} (use {list(PERFIS)})")
+
+    if processos is None:
+        processos = int(os.environ.get('CHURN_PROCESSOS_GRAFICOS', os.cpu_count() or 1))
+    processos = max(1, min(processos, len(tarefas)))
+
+    if processos == 1:
+        resultados = [_renderizar(t, perfil) for t in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            resultados = list(executor.map(_renderizar, tarefas, [perfil] * len(tarefas)))
+
+    # Tempo de cada gráfico (medido no processo que o renderizou)
+    for caminho, segundos in resultados:
+        registrar_passo(f"grafico:{os.path.basename(caminho)}", segundos)
+    return resultados
@@ -0,0 +1,164 @@
+# ============================================================================
+# INSPEÇÃO EM BLOCOS (STREAMING)
+# ============================================================================
+#
+# Constrói o resumo de inspeção (01_resumo_inspecao.json) lendo o arquivo
+# bruto em blocos de tamanho fixo, numa única passada. A memória de pico
+# depende do tamanho do bloco e não do tamanho do arquivo.
+# ============================================================================
+
+import numpy as np
+import pandas as pd
+
+from esbocos import EsbocoCardinalidade
+from estatisticas_streaming import ResumoNumerico
+from deduplicacao import DeduplicadorParticionado
+
+
+# Tamanho padrão do bloco (linhas por leitura)
+TAMANHO_BLOCO_PADRAO = 100_000
+
+
+def _tipo_bloco(serie):
+    """
+    Classifica o dtype de uma coluna do bloco em: bool, int64, float64 ou object
+    """
+    if pd.api.types.is_bool_dtype(serie):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(serie):
+        return 'int64'
+    if pd.api.types.is_float_dtype(serie):
+        return 'float64'
+    return 'object'
+
+
+def _combinar_tipos(tipo_atual, tipo_bloco):
+    """
+    Combina o tipo acumulado com o tipo de um novo bloco, seguindo a mesma
+    promoção que o pandas faria ao ler o arquivo inteiro
+    """
+    if tipo_atual is None or tipo_atual == tipo_bloco:
+        return tipo_bloco
+    numericos = {'int64', 'float64'}
+    if tipo_atual in numericos and tipo_bloco in numericos:
+        return 'float64'
+    return 'object'
+
+
+def inspecionar_em_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO_PADRAO, coluna_alvo='Churn',
+                          contar_duplicatas=True, cardinalidade=False, estatisticas=True):
+    """
+    Lê o CSV em blocos e acumula, numa única passada, tudo o que o resumo
+    de inspeção precisa
+
+    Args:
+        caminho: caminho do CSV bruto
+        tamanho_bloco: número de linhas por bloco
+        coluna_alvo: coluna de churn (True/False)
+        contar_duplicatas: se True, grava impressões digitais das linhas em
+            partições no disco e conta as duplicatas ao final
+        cardinalidade: se True, mantém um EsbocoCardinalidade por coluna
+            (memória fixa) e devolve em exibicao['cardinalidade']
+        estatisticas: se True, acumula um ResumoNumerico (momentos exatos e
+            quartis por esboço) e devolve a tabela em exibicao['estatisticas']
+
+    Returns:
+        dict com o resumo (mesmas chaves do modo em memória, mais
+        'tipos_colunas', 'faltantes_por_coluna' e 'intervalos_por_coluna',
+        o [mínimo, máximo] das colunas numéricas) e dict auxiliar com
+        'primeiras_linhas' e 'ultimas_linhas' (e 'cardinalidade' e
+        'estatisticas') para exibição
+    """
+    total_registros = 0
+    colunas = None
+    tipos = {}
+    faltantes = None
+    intervalos = {}
+    churn_contagem = {False: 0, True: 0}
+    primeiras_linhas = None
+    ultimas_linhas = None
+
+    # Impressões digitais das linhas, particionadas no disco
+    deduplicador = DeduplicadorParticionado() if contar_duplicatas else None
+    esbocos = {}
+    resumo_numerico = ResumoNumerico() if estatisticas else None
+
+    for bloco in pd.read_csv(caminho, chunksize=tamanho_bloco):
+        if colunas is None:
+            colunas = bloco.columns.tolist()
+            faltantes = pd.Series(0, index=colunas, dtype='int64')
+            primeiras_linhas = bloco.head()
+            if cardinalidade:
+                esbocos = {col: EsbocoCardinalidade() for col in colunas}
+
+        total_registros += len(bloco)
+
+        for col in colunas:
+            tipos[col] = _combinar_tipos(tipos.get(col), _tipo_bloco(bloco[col]))
+
+        faltantes += bloco.isnull().sum()
+
+        # Mínimo e máximo de cada coluna numérica (para escolher um tipo
+        # inteiro que comporte todos os blocos ao converter)
+        numericas = bloco.select_dtypes('number')
+        for col, minimo, maximo in zip(numericas.columns, numericas.min(), numericas.max()):
+            if col in intervalos:
+                minimo = np.fmin(minimo, intervalos[col][0])
+                maximo = np.fmax(maximo, intervalos[col][1])
+            intervalos[col] = [minimo, maximo]
+
+        if coluna_alvo in bloco.columns:
+            contagem = bloco[coluna_alvo].value_counts()
+            churn_contagem[False] += int(contagem.get(False, 0))
+            churn_contagem[True] += int(contagem.get(True, 0))
+
+        if deduplicador is not None:
+            deduplicador.registrar(bloco)
+        for col, esboco in esbocos.items():
+            esboco.adicionar(bloco[col])
+        if resumo_numerico is not None:
+            resumo_numerico.adicionar(bloco)
+        ultimas_linhas = bloco.tail()
+
+    if colunas is None:
+        raise ValueError(f"Arquivo vazio: {caminho}")
+
+    duplicatas = None
+    if deduplicador is not None:
+        duplicatas = int(deduplicador.finalizar())
+
+    colunas_numericas = [c for c in colunas if tipos[c] in ('int64', 'float64')]
+    colunas_categoricas = [c for c in colunas if tipos[c] in ('object', 'bool')]
+
+    total_validos = churn_contagem[False] + churn_contagem[True]
+    churn_rate = (churn_contagem[True] / total_validos) * 100 if total_validos else 0.0
+
+    resumo = {
+        'total_registros': int(total_registros),
+        'total_colunas': len(colunas),
+        'lista_colunas_numericas': colunas_numericas,
+        'lista_colunas_categoricas': colunas_categoricas,
+        'colunas_numericas': len(colunas_numericas),
+        'colunas_categoricas': len(colunas_categoricas),
+        'valores_faltantes': int(faltantes.sum()),
+        'duplicatas': duplicatas,
+        'churn_rate': float(churn_rate),
+        'clientes_permaneceram': int(churn_contagem[False]),
+        'clientes_sairam': int(churn_contagem[True]),
+        'tipos_colunas': {c: tipos[c] for c in colunas},
+        'faltantes_por_coluna': {c: int(v) for c, v in faltantes.items()},
+        'intervalos_por_coluna': {c: [float(v) for v in intervalos[c]]
+                                  for c in colunas_numericas if c in intervalos}
+    }
+
+    exibicao = {
+        'primeiras_linhas': primeiras_linhas,
+        'ultimas_linhas': ultimas_linhas
+    }
+    if cardinalidade:
+        exibicao['cardinalidade'] = esbocos
+    if resumo_numerico is not None:
+        # Só as colunas que foram numéricas em todos os blocos (como no describe())
+        exibicao['estatisticas'] = resumo_numerico.tabela(colunas_numericas)
+
+    return resumo, exibicao
@@ -0,0 +1,187 @@
+# ============================================================================
+# INSTRUMENTAÇÃO DAS ETAPAS (MÉTRICAS EM JSON LINES)
+# ============================================================================
+#
+# Cada etapa e cada passo medido grava uma linha JSON em
+# outputs/metricas_execucao.jsonl:
+#   {"ts": ..., "etapa": "limpeza_dados.py", "passo": "deduplicacao",
+#    "parede_s": 0.012, "cpu_s": 0.011, "linhas_entrada": 2666,
+#    "linhas_saida": 2666, "linhas_por_s": 222166.7, "rss_pico_processo_mb": 134.4,
+#    "rss_aumento_pico_mb": 0.0, "contadores": {"duplicatas": 0}}
+# rss_pico_processo_mb é o pico de RSS do processo até o fim do passo (inclui
+# os passos anteriores); rss_aumento_pico_mb é quanto o próprio passo elevou
+# esse pico (0 se coube na memória já usada antes dele).
+# Eventos (salvar_info_execucao) entram no mesmo arquivo com "evento".
+# O arquivo fica aberto em modo append durante o processo.
+#
+# Perfil de CPU: CHURN_PERFILAR=1 liga o cProfile na etapa inteira e grava
+# outputs/perfis/<etapa>.prof ao final (abre no snakeviz, ou vira flame
+# graph com flameprof). Desligado, o custo é só o de ler dois relógios por
+# passo.
+#
+# Uso nas etapas:
+#   passo = Passo('deduplicacao', linhas_entrada=len(df))
+#   ...
+#   passo.concluir(linhas_saida=len(df), duplicatas=n)
+# ou, em funções:
+#   with medir('exportacao_csv', linhas_entrada=len(df)):
+#       ...
+# ============================================================================
+
+import atexit
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from memoria import pico_rss_bytes, MB
+
+ARQUIVO_METRICAS_EXECUCAO = 'outputs/metricas_execucao.jsonl'
+PASTA_PERFIS = 'outputs/perfis'
+
+PERFILAR = os.environ.get('CHURN_PERFILAR') == '1'
+
+_arquivo = None
+_perfilador = None
+_inicio_etapa = None
+
+
+def nome_etapa():
+    """
+    Nome do script em execução (ex: limpeza_dados.py)
+    """
+    return os.path.basename(sys.argv[0]) or 'interativo'
+
+
+def _escrever(registro):
+    global _arquivo
+    if _arquivo is None:
+        os.makedirs(os.path.dirname(ARQUIVO_METRICAS_EXECUCAO), exist_ok=True)
+        # Com buffer de linha, cada registro chega ao disco ao ser escrito
+        _arquivo = open(ARQUIVO_METRICAS_EXECUCAO, 'a', encoding='utf-8', buffering=1)
+    _arquivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+def _memoria(rss_pico_inicio=None):
+    rss = pico_rss_bytes()
+    memoria = {'rss_pico_processo_mb': None if rss is None else round(rss / MB, 1)}
+    if rss is not None and rss_pico_inicio is not None:
+        memoria['rss_aumento_pico_mb'] = round((rss - rss_pico_inicio) / MB, 1)
+    if tracemalloc.is_tracing():
+        atual, pico = tracemalloc.get_traced_memory()
+        memoria['alocado_mb'] = round(atual / MB, 1)
+        memoria['alocado_pico_mb'] = round(pico / MB, 1)
+    return memoria
+
+
+def registrar_passo(passo, parede_s, cpu_s=None, linhas_entrada=None, linhas_saida=None,
+                    rss_pico_inicio=None, **contadores):
+    """
+    Grava a linha de um passo já medido (ex: tempos vindos de outro processo)
+
+    rss_pico_inicio é o pico de RSS (bytes) no início do passo; sem ele (passo
+    medido em outro processo) a linha não traz rss_aumento_pico_mb.
+    """
+    linhas = linhas_saida if linhas_saida is not None else linhas_entrada
+    registro = {
+        'ts': datetime.now().isoformat(timespec='milliseconds'),
+        'etapa': nome_etapa(),
+        'passo': passo,
+        'parede_s': round(parede_s, 6),
+        'cpu_s': None if cpu_s is None else round(cpu_s, 6),
+        'linhas_entrada': linhas_entrada,
+        'linhas_saida': linhas_saida,
+        'linhas_por_s': round(linhas / parede_s, 1) if linhas is not None and parede_s > 0 else None
+    }
+    registro.update(_memoria(rss_pico_inicio))
+    if contadores:
+        registro['contadores'] = {k: _valor_json(v) for k, v in contadores.items()}
+    _escrever(registro)
+    return registro
+
+
+def _valor_json(valor):
+    # Escalares numpy viram tipos Python (sem importar numpy aqui)
+    return valor.item() if hasattr(valor, 'item') else valor
+
+
+class Passo:
+    """
+    Cronômetro de um passo (tempo de parede e de CPU do processo)
+
+    Args:
+        nome: nome do passo
+        linhas_entrada: linhas processadas pelo passo (opcional)
+    """
+
+    def __init__(self, nome, linhas_entrada=None):
+        self.nome = nome
+        self.linhas_entrada = linhas_entrada
+        self.inicio_parede = time.perf_counter()
+        self.inicio_cpu = time.process_time()
+        self.inicio_rss_pico = pico_rss_bytes()
+
+    def concluir(self, linhas_saida=None, **contadores):
+        """
+        Para o cronômetro e grava a linha do passo
+
+        Args:
+            linhas_saida: linhas resultantes (opcional)
+            **contadores: contagens do passo (ex: duplicatas=3)
+        """
+        return registrar_passo(self.nome,
+                               time.perf_counter() - self.inicio_parede,
+                               time.process_time() - self.inicio_cpu,
+                               self.linhas_entrada, linhas_saida,
+                               rss_pico_inicio=self.inicio_rss_pico, **contadores)
+
+
+@contextmanager
+def medir(nome, linhas_entrada=None):
+    """
+    Mede o bloco with; o Passo devolvido aceita passo.linhas_saida e
+    passo.contadores antes do fim do bloco
+    """
+    passo = Passo(nome, linhas_entrada)
+    passo.linhas_saida = None
+    passo.contadores = {}
+    yield passo
+    passo.concluir(passo.linhas_saida, **passo.contadores)
+
+
+def registrar_evento(mensagem, etapa=None):
+    """
+    Grava um evento de texto (substitui o antigo log_execucao.txt)
+    """
+    _escrever({
+        'ts': datetime.now().isoformat(timespec='milliseconds'),
+        'etapa': etapa or nome_etapa(),
+        'evento': mensagem
+    })
+
+
+def _finalizar_etapa():
+    if _perfilador is not None:
+        _perfilador.disable()
+        os.makedirs(PASTA_PERFIS, exist_ok=True)
+        _perfilador.dump_stats(os.path.join(PASTA_PERFIS, os.path.splitext(nome_etapa())[0] + '.prof'))
+    _inicio_etapa.concluir()
+
+
+def iniciar_etapa():
+    """
+    Começa a medir a etapa inteira (chamado por preparar_etapa); a linha
+    'etapa' e o perfil são gravados quando o processo termina
+    """
+    global _perfilador, _inicio_etapa
+    if _inicio_etapa is not None:
+        return
+    _inicio_etapa = Passo('etapa')
+    if PERFILAR:
+        import cProfile
+        _perfilador = cProfile.Profile()
+        _perfilador.enable()
+    atexit.register(_finalizar_etapa)
@@ -0,0 +1,417 @@
+# ============================================================================
+# KPIs INCREMENTAIS A PARTIR DE ARQUIVOS DELTA
+# ============================================================================
+#
+# Estado pequeno (data/processed/estado_kpis.json) com estatísticas
+# suficientes por célula de segmento (status × área × planos × chamadas ×
+# faixas): número de clientes, churners e somas inteiras das medidas
+# (receita em centavos, receita² para variância, tempo de conta, chamadas,
+# minutos/dia em centésimos), mais o histograma da receita em centavos por
+# status para mediana/mínimo/máximo exatos.
+#
+# Valores com 2 casas decimais viram inteiros, então somar e subtrair linhas
+# é exato em qualquer ordem: aplicar um delta dá o mesmo resultado que
+# recalcular tudo. As fórmulas das saídas 12-18 ficam aqui e são as mesmas
+# usadas por metricas_powerbi.py no cálculo completo.
+#
+# Formato do delta (.csv ou .parquet): colunas da base limpa + 'Operacao':
+#   I  → cliente novo
+#   D  → cliente removido (linha como estava)
+#   U- → atualização, linha antiga
+#   U+ → atualização, linha nova
+#
+# Uso:
+#   python notebook/kpis_incrementais.py data/raw/delta_20240502.csv
+# ============================================================================
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import ler_em_blocos
+from cubo_churn import tabela_churn
+from esquema import (COLUNAS_COBRANCA, BINS_RECEITA, LABELS_RECEITA, BINS_TEMPO_CONTA,
+                     LABELS_TEMPO_CONTA, TIPO_CHURN_LABEL, aplicar_esquema)
+
+ARQUIVO_ESTADO = 'data/processed/estado_kpis.json'
+
+# Dimensões das células do estado (todas as tabelas 12-18 são marginais)
+DIMENSOES_ESTADO = [
+    'Churn_Label',
+    'Area code',
+    'International plan',
+    'Voice mail plan',
+    'Customer service calls',
+    'Faixa_Receita',
+    'Faixa_Tempo_Conta'
+]
+
+# Sinal de cada operação do delta
+SINAIS_OPERACAO = {'I': 1, 'D': -1, 'U-': -1, 'U+': 1}
+
+TAMANHO_BLOCO_DELTA = 100_000
+
+# ============================================================================
+# COLUNAS DERIVADAS E MEDIDAS INTEIRAS
+# ============================================================================
+
+
+def derivar_segmentos(df):
+    """
+    Adiciona as colunas derivadas usadas pelas métricas (no lugar):
+    Churn_Num, Churn_Label, Receita_Total_Cliente, Faixa_Receita,
+    Faixa_Tempo_Conta e Combo_Planos
+    """
+    df['Churn_Num'] = df['Churn'].astype('int8')
+    df['Churn_Label'] = df['Churn'].map({True: 'Saiu', False: 'Permaneceu'}).astype(TIPO_CHURN_LABEL)
+
+    # Receita total por cliente
+    df['Receita_Total_Cliente'] = (df['Total day charge'] + df['Total eve charge'] +
+                                   df['Total night charge'] + df['Total intl charge'])
+
+    # Faixas de receita e de tempo de conta
+    df['Faixa_Receita'] = pd.cut(df['Receita_Total_Cliente'],
+                                 bins=BINS_RECEITA,
+                                 labels=LABELS_RECEITA)
+    df['Faixa_Tempo_Conta'] = pd.cut(df['Account length'],
+                                     bins=BINS_TEMPO_CONTA,
+                                     labels=LABELS_TEMPO_CONTA)
+
+    # Combinações de planos
+    df['Combo_Planos'] = (df['International plan'].astype(str) + ' / ' +
+                          df['Voice mail plan'].astype(str)).astype('category')
+    return df
+
+
+def _centesimos(valores):
+    return np.rint(np.asarray(valores, dtype=np.float64) * 100).astype(np.int64)
+
+
+def medidas_inteiras(df):
+    """
+    Medidas em inteiros (valores monetários em centavos, minutos em
+    centésimos), somáveis sem erro de arredondamento
+
+    Returns:
+        dict nome -> array int64
+    """
+    return {
+        'Receita_Centavos': sum(_centesimos(df[col]) for col in COLUNAS_COBRANCA),
+        'Soma_Tempo_Conta': df['Account length'].to_numpy(dtype=np.int64),
+        'Soma_Chamadas_Suporte': df['Customer service calls'].to_numpy(dtype=np.int64),
+        'Minutos_Dia_Centesimos': _centesimos(df['Total day minutes'])
+    }
+
+
+def histogramas_receita(df, sinal=None):
+    """
+    Histograma da receita em centavos por status de churn
+
+    Returns:
+        dict status -> Series (centavos -> clientes), ordenada
+    """
+    centavos = medidas_inteiras(df)['Receita_Centavos']
+    pesos = np.ones(len(df), dtype=np.int64) if sinal is None else np.asarray(sinal, dtype=np.int64)
+    contagens = pd.Series(pesos).groupby([df['Churn_Label'].to_numpy(), centavos], observed=True).sum()
+    return {status: contagens.loc[status].sort_index() for status in contagens.index.unique(level=0)}
+
+# ============================================================================
+# FÓRMULAS DAS SAÍDAS 12, 13, 17 E 18
+# ============================================================================
+#
+# Recebem agregados (Total, Churners e somas das medidas inteiras) vindos do
+# cubo de churn (cálculo completo) ou do estado (cálculo incremental).
+
+
+def kpis_dashboard(agregado_status):
+    """
+    KPIs principais (12_kpis_dashboard.json) a partir do agregado por
+    Churn_Label
+    """
+    total_clientes = int(agregado_status['Total'].sum())
+    total_churners = int(agregado_status['Churners'].sum())
+    total_ativos = total_clientes - total_churners
+    taxa_churn = (total_churners / total_clientes) * 100
+    taxa_retencao = 100 - taxa_churn
+
+    receita_total = agregado_status['Receita_Centavos'].sum() / 100
+    receita_media_cliente = receita_total / total_clientes
+    receita_media_churner = agregado_status.loc['Saiu', 'Receita_Centavos'] / 100 / agregado_status.loc['Saiu', 'Total']
+    receita_media_ativo = (agregado_status.loc['Permaneceu', 'Receita_Centavos'] / 100 /
+                           agregado_status.loc['Permaneceu', 'Total'])
+
+    return {
+        'total_clientes': total_clientes,
+        'total_churners': total_churners,
+        'total_ativos': total_ativos,
+        'taxa_churn_%': round(float(taxa_churn), 2),
+        'taxa_retencao_%': round(float(taxa_retencao), 2),
+        'receita_total': round(float(receita_total), 2),
+        'receita_media_cliente': round(float(receita_media_cliente), 2),
+        'receita_media_churner': round(float(receita_media_churner), 2),
+        'receita_media_ativo': round(float(receita_media_ativo), 2),
+        'perda_receita_estimada': round(float(receita_media_churner * total_churners), 2)
+    }
+
+
+def _valor_na_posicao(histograma, posicao):
+    acumulado = histograma.to_numpy().cumsum()
+    return histograma.index[np.searchsorted(acumulado, posicao, side='right')]
+
+
+def tabela_receita_status(agregado_status, histogramas):
+    """
+    Receita por status de churn (13_receita_por_status.csv)
+    """
+    linhas = {}
+    for status in agregado_status.index:
+        histograma = histogramas[status]
+        n = int(agregado_status.loc[status, 'Total'])
+        mediana = (_valor_na_posicao(histograma, (n - 1) // 2) + _valor_na_posicao(histograma, n // 2)) / 2
+        linhas[status] = {
+            'Receita_Total': agregado_status.loc[status, 'Receita_Centavos'] / 100,
+            'Receita_Media': agregado_status.loc[status, 'Receita_Centavos'] / 100 / n,
+            'Receita_Mediana': mediana / 100,
+            'Receita_Min': histograma.index[0] / 100,
+            'Receita_Max': histograma.index[-1] / 100,
+            'Num_Clientes': n
+        }
+    tabela = pd.DataFrame.from_dict(linhas, orient='index')
+    tabela.index.name = 'Churn_Label'
+    return tabela.round(2)
+
+
+def perfil_dos_churners(agregado_status, churners_intl, churners_vmail, churners_chamadas):
+    """
+    Perfil dos churners (17_perfil_churners.json)
+
+    Args:
+        agregado_status: agregado por Churn_Label
+        churners_intl, churners_vmail, churners_chamadas: churners por
+            International plan, Voice mail plan e Customer service calls
+    """
+    churners = agregado_status.loc['Saiu']
+    total_churners = int(churners['Total'])
+    return {
+        'total_churners': total_churners,
+        'idade_conta_media': round(churners['Soma_Tempo_Conta'] / total_churners, 2),
+        'chamadas_suporte_media': round(churners['Soma_Chamadas_Suporte'] / total_churners, 2),
+        'minutos_dia_media': round(churners['Minutos_Dia_Centesimos'] / 100 / total_churners, 2),
+        'receita_media': round(churners['Receita_Centavos'] / 100 / total_churners, 2),
+        'pct_com_intl_plan': round(churners_intl.get('Yes', 0) / total_churners * 100, 2),
+        'pct_com_voicemail': round(churners_vmail.get('Yes', 0) / total_churners * 100, 2),
+        'pct_chamadas_4_mais': round(churners_chamadas[churners_chamadas.index >= 4].sum() / total_churners * 100, 2)
+    }
+
+
+def tabela_combo_planos(agregado_planos):
+    """
+    Análise por combinação de planos (18_analise_combo_planos.csv) a partir
+    do agregado International plan × Voice mail plan
+    """
+    tabela = pd.DataFrame({
+        'Total': agregado_planos['Total'],
+        'Churners': agregado_planos['Churners'],
+        'Taxa_Churn_%': (agregado_planos['Churners'] / agregado_planos['Total']).round(2) * 100,
+        'Receita_Media': (agregado_planos['Receita_Centavos'] / 100 / agregado_planos['Total']).round(2)
+    })
+    tabela.index = pd.Index([f'{intl} / {vmail}' for intl, vmail in agregado_planos.index], name='Combo_Planos')
+    return tabela
+
+
+def desvio_receita(agregado):
+    """
+    Desvio-padrão amostral da receita por célula de um agregado do estado
+    """
+    n = agregado['Total']
+    soma = agregado['Receita_Centavos'].astype(np.float64)
+    variancia = (agregado['Receita_Centavos_Quadrado'] - soma * soma / n) / (n - 1)
+    return np.sqrt(variancia) / 100
+
+# ============================================================================
+# ESTADO INCREMENTAL
+# ============================================================================
+
+
+class EstadoKPIs:
+    """
+    Estatísticas suficientes por célula de segmento + histogramas de receita
+
+    Args:
+        celulas: DataFrame com DIMENSOES_ESTADO, Total, Churners e as somas
+        histogramas: dict status -> Series (centavos -> clientes)
+    """
+
+    def __init__(self, celulas, histogramas):
+        self.celulas = celulas
+        self.histogramas = histogramas
+
+    @staticmethod
+    def _somar_celulas(*celulas):
+        soma = pd.concat(celulas, ignore_index=True)
+        return soma.groupby(DIMENSOES_ESTADO, observed=True, dropna=False).sum().reset_index()
+
+    @staticmethod
+    def _contribuicoes(df, sinal):
+        medidas = medidas_inteiras(df)
+        contribuicoes = pd.DataFrame({dim: df[dim].to_numpy() for dim in DIMENSOES_ESTADO})
+        contribuicoes['Total'] = sinal
+        contribuicoes['Churners'] = sinal * df['Churn'].to_numpy(dtype=np.int64)
+        for nome, valores in medidas.items():
+            contribuicoes[nome] = sinal * valores
+        contribuicoes['Receita_Centavos_Quadrado'] = sinal * medidas['Receita_Centavos'] ** 2
+        return (contribuicoes.groupby(DIMENSOES_ESTADO, observed=True, dropna=False)
+                .sum().reset_index())
+
+    @classmethod
+    def de_dataframe(cls, df):
+        """
+        Estado completo de uma base com as colunas de derivar_segmentos
+        """
+        sinal = np.ones(len(df), dtype=np.int64)
+        return cls(cls._contribuicoes(df, sinal), histogramas_receita(df))
+
+    def aplicar_delta(self, delta):
+        """
+        Aplica um bloco do delta (colunas da base limpa + 'Operacao'), no lugar
+        """
+        operacoes = delta['Operacao'].astype(str)
+        desconhecidas = set(operacoes.unique()) - set(SINAIS_OPERACAO)
+        if desconhecidas:
+            raise ValueError(f"Operações desconhecidas no delta: {sorted(desconhecidas)}")
+        sinal = operacoes.map(SINAIS_OPERACAO).to_numpy(dtype=np.int64)
+
+        delta = derivar_segmentos(aplicar_esquema(delta.drop(columns='Operacao')))
+        celulas = self._somar_celulas(self.celulas, self._contribuicoes(delta, sinal))
+        if (celulas['Total'] < 0).any():
+            raise ValueError("Delta remove clientes que não estão no estado")
+        self.celulas = celulas[celulas['Total'] > 0].reset_index(drop=True)
+
+        for status, histograma in histogramas_receita(delta, sinal).items():
+            atual = self.histogramas.get(status, pd.Series(dtype=np.int64))
+            novo = atual.add(histograma, fill_value=0).astype(np.int64)
+            self.histogramas[status] = novo[novo > 0].sort_index()
+        return self
+
+    def mesclar(self, outro):
+        """
+        Soma o estado de outra parte da base (ex: de outro processo) a este,
+        no lugar
+        """
+        self.celulas = self._somar_celulas(self.celulas, outro.celulas)
+        for status, histograma in outro.histogramas.items():
+            atual = self.histogramas.get(status, pd.Series(dtype=np.int64))
+            self.histogramas[status] = atual.add(histograma, fill_value=0).astype(np.int64).sort_index()
+        return self
+
+    def marginal(self, dimensoes):
+        """
+        Agregado (Total, Churners, somas) por uma dimensão (str) ou por uma
+        lista de dimensões, só com células observadas
+        """
+        celulas = aplicar_esquema(self.celulas.copy())
+        colunas = [c for c in celulas.columns if c not in DIMENSOES_ESTADO]
+        agregado = celulas.groupby(dimensoes, observed=True)[colunas].sum()
+        return agregado[agregado['Total'] > 0]
+
+    def saidas(self):
+        """
+        Conteúdo das saídas 12-18, igual ao cálculo completo
+
+        Returns:
+            dict nome do arquivo -> dict (JSON) ou DataFrame (CSV)
+        """
+        status = self.marginal('Churn_Label')
+        return {
+            '12_kpis_dashboard.json': kpis_dashboard(status),
+            '13_receita_por_status.csv': tabela_receita_status(status, self.histogramas),
+            '14_churn_por_faixa_receita.csv': tabela_churn(self.marginal('Faixa_Receita'), 'Total_Clientes'),
+            '15_churn_por_tempo_conta.csv': tabela_churn(self.marginal('Faixa_Tempo_Conta'), 'Total_Clientes'),
+            '16_churn_por_area.csv': tabela_churn(self.marginal('Area code'), 'Total_Clientes'),
+            '17_perfil_churners.json': perfil_dos_churners(status,
+                                                       self.marginal('International plan')['Churners'],
+                                                       self.marginal('Voice mail plan')['Churners'],
+                                                       self.marginal('Customer service calls')['Churners']),
+            '18_analise_combo_planos.csv': tabela_combo_planos(
+                self.marginal(['International plan', 'Voice mail plan']))
+        }
+
+    def salvar(self, caminho=ARQUIVO_ESTADO):
+        """
+        Grava o estado em JSON (inteiros exatos), de forma atômica
+        """
+        celulas = self.celulas.astype(object).where(self.celulas.notna(), None)
+        conteudo = {
+            'versao': 1,
+            'dimensoes': DIMENSOES_ESTADO,
+            'colunas': list(self.celulas.columns),
+            'celulas': celulas.to_numpy().tolist(),
+            'histogramas': {str(status): [[int(c), int(n)] for c, n in hist.items()]
+                            for status, hist in self.histogramas.items()}
+        }
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        temporario = caminho + '.tmp'
+        with open(temporario, 'w') as f:
+            json.dump(conteudo, f, default=int)
+        os.replace(temporario, caminho)
+        return caminho
+
+    @classmethod
+    def carregar(cls, caminho=ARQUIVO_ESTADO):
+        """
+        Lê o estado gravado por salvar()
+        """
+        with open(caminho) as f:
+            conteudo = json.load(f)
+        if conteudo['dimensoes'] != DIMENSOES_ESTADO:
+            raise ValueError("Estado gravado com outras dimensões; recalcule com metricas_powerbi.py")
+        celulas = pd.DataFrame(conteudo['celulas'], columns=conteudo['colunas'])
+        for col in celulas.columns:
+            if col not in DIMENSOES_ESTADO:
+                celulas[col] = celulas[col].astype(np.int64)
+        histogramas = {}
+        for status, pares in conteudo['histogramas'].items():
+            centavos, contagens = zip(*pares) if pares else ((), ())
+            histogramas[status] = pd.Series(contagens, index=centavos, dtype=np.int64)
+        return cls(celulas, histogramas)
+
+
+def gravar_saidas(saidas, pasta='outputs/metrics'):
+    """
+    Grava as saídas 12-18 no mesmo formato do cálculo completo
+    """
+    for nome, conteudo in saidas.items():
+        caminho = os.path.join(pasta, nome)
+        if nome.endswith('.json'):
+            with open(caminho, 'w') as f:
+                json.dump(conteudo, f, indent=4)
+        else:
+            conteudo.to_csv(caminho)
+    return list(saidas)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Atualiza os KPIs a partir de arquivos delta')
+    parser.add_argument('deltas', nargs='+', help='Arquivos delta (.csv ou .parquet), na ordem')
+    parser.add_argument('--estado', default=ARQUIVO_ESTADO)
+    parser.add_argument('--saida', default='outputs/metrics')
+    args = parser.parse_args()
+
+    estado = EstadoKPIs.carregar(args.estado)
+    linhas = 0
+    for caminho in args.deltas:
+        for bloco in ler_em_blocos(caminho, TAMANHO_BLOCO_DELTA):
+            estado.aplicar_delta(bloco)
+            linhas += len(bloco)
+    print(f"✅ {linhas:,} linhas de delta aplicadas")
+
+    for nome in gravar_saidas(estado.saidas(), args.saida):
+        print(f"✅ Atualizado: {os.path.join(args.saida, nome)}")
+    estado.salvar(args.estado)
+    print(f"✅ Estado salvo: {args.estado}")
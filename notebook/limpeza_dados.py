@@ -1,4 +1,17 @@
 from preparacao_ambiente import *
+preparar_etapa()
+
+import pandas as pd
+import numpy as np
+from armazenamento import carregar_etapa, salvar_etapa
+from armazem_colunas import gravar_armazem
+from esquema import padronizar_categoricas
+from regras_validacao import REGRAS_LIMPEZA, avaliar_regras
+from auditoria_tarifas import auditar_tarifas, NOMES_PERIODOS, TOLERANCIA_PADRAO
+from outliers import detectar_outliers_extremos, FATOR_IQR_EXTREMO
+from deduplicacao import remover_duplicatas
+from memoria import registrar_memoria_etapa
+from instrumentacao import Passo
 import json
 
 # ============================================================================
@@ -7,11 +20,13 @@ import json
 
 print_section("CARREGAMENTO DOS DADOS PARA LIMPEZA")
 
-df = pd.read_csv('data/processed/02_dados_inspecionados.csv')
+passo = Passo('carga')
+df = carregar_etapa('data/processed/02_dados_inspecionados')
+passo.concluir(linhas_saida=len(df))
 print(f"✅ Dados carregados: {len(df):,} linhas")
 
-# Criar cópia para comparação
-df_original = df.copy()
+# Só a contagem é usada na comparação final (sem cópia do DataFrame)
+registros_originais = len(df)
 
 # ============================================================================
 # 1. VERIFICAR E REMOVER DUPLICATAS
@@ -19,11 +34,13 @@ df_original = df.copy()
 
 print_section("1. TRATAMENTO DE DUPLICATAS")
 
-duplicatas_antes = df.duplicated().sum()
+# Impressão digital de 128 bits por linha (uma única passada de hash)
+passo = Passo('deduplicacao', linhas_entrada=len(df))
+df, duplicatas_antes = remover_duplicatas(df)
+passo.concluir(linhas_saida=len(df), duplicatas=duplicatas_antes)
 print(f"🔍 Duplicatas encontradas: {duplicatas_antes}")
 
 if duplicatas_antes > 0:
-    df = df.drop_duplicates()
     print(f"✅ Duplicatas removidas: {duplicatas_antes}")
     print(f"📊 Linhas restantes: {len(df):,}")
 else:
@@ -50,15 +67,12 @@ else:
 
 print_section("3. PADRONIZAÇÃO DE COLUNAS CATEGÓRICAS")
 
-# Padronizar State (deixar em maiúsculas)
-if 'State' in df.columns:
-    df['State'] = df['State'].str.upper().str.strip()
-    print("✅ Coluna 'State' padronizada (maiúsculas, sem espaços)")
-
-# Padronizar International plan e Voice mail plan
-for col in ['International plan', 'Voice mail plan']:
-    if col in df.columns:
-        df[col] = df[col].str.strip().str.capitalize()
+# State em maiúsculas; International plan e Voice mail plan capitalizados
+# (mesma função usada na execução particionada)
+for col in padronizar_categoricas(df):
+    if col == 'State':
+        print("✅ Coluna 'State' padronizada (maiúsculas, sem espaços)")
+    else:
         print(f"✅ Coluna '{col}' padronizada")
 
 # ============================================================================
@@ -67,30 +81,26 @@ for col in ['International plan', 'Voice mail plan']:
 
 print_section("4. VERIFICAÇÃO DE VALORES INCONSISTENTES")
 
-colunas_positivas = ['Account length', 'Total day minutes', 'Total day calls',
-                     'Total day charge', 'Total eve minutes', 'Total eve calls',
-                     'Total eve charge', 'Total night minutes', 'Total night calls',
-                     'Total night charge', 'Total intl minutes', 'Total intl calls',
-                     'Total intl charge', 'Customer service calls', 'Number vmail messages']
+# Todas as regras declaradas (não negatividade, ranges, faixas de tarifa e
+# restrições entre colunas) numa única passada; as seções 6 e 7 usam as
+# mesmas contagens (apuradas antes da remoção das linhas inválidas)
+passo = Passo('validacao', linhas_entrada=len(df))
+relatorio_regras, mask = avaliar_regras(df, REGRAS_LIMPEZA)
+violacoes = relatorio_regras['Violacoes']
+passo.concluir(linhas_invalidas=int((~mask).sum()), regras=len(relatorio_regras))
 
 print("🔍 Verificando valores negativos...")
-tem_negativos = False
-total_negativos = 0
-
-for col in colunas_positivas:
-    if col in df.columns:
-        negativos = (df[col] < 0).sum()
-        if negativos > 0:
-            print(f"   ⚠️  {col}: {negativos} valores negativos")
-            tem_negativos = True
-            total_negativos += negativos
-
-if tem_negativos:
+negativos = violacoes[relatorio_regras['Severidade'] == 'erro']
+total_negativos = int(negativos.sum())
+
+for regra, n in negativos[negativos > 0].items():
+    print(f"   ⚠️  {regra.removesuffix(' >= 0')}: {n} valores negativos")
+
+if total_negativos > 0:
     print(f"\n⚠️  Total de valores negativos: {total_negativos}")
     print("   Decisão: Remover linhas com valores negativos (possível erro de coleta)")
 
     # Remover linhas com qualquer valor negativo nas colunas especificadas
-    mask = (df[colunas_positivas] >= 0).all(axis=1)
     linhas_removidas = len(df) - mask.sum()
     df = df[mask]
 
@@ -105,18 +115,6 @@ else:
 
 print_section("5. DETECÇÃO DE OUTLIERS EXTREMOS")
 
-
-def detectar_outliers_extremos(df, coluna):
-
-    Q1 = df[coluna].quantile(0.25)
-    Q3 = df[coluna].quantile(0.75)
-    IQR = Q3 - Q1
-    limite_inferior = Q1 - 3 * IQR  # 3*IQR para outliers extremos
-    limite_superior = Q3 + 3 * IQR
-
-    outliers = df[(df[coluna] < limite_inferior) | (df[coluna] > limite_superior)]
-    return len(outliers), limite_inferior, limite_superior
-
 print("\n💡 CRITÉRIO UTILIZADO: 3×IQR (outliers extremos)")
 print("   • Menos restritivo que 1.5×IQR (padrão)")
 print("   • Apropriado para análise de churn (valores altos podem indicar risco)")
@@ -125,16 +123,18 @@ print("   • Apropriado para análise de churn (valores altos podem indicar ris
 colunas_numericas = df.select_dtypes(include=[np.number]).columns
 
 print("🔍 Outliers extremos por coluna:")
-outliers_info = {}
 
-for col in colunas_numericas:
-    n_outliers, lim_inf, lim_sup = detectar_outliers_extremos(df, col)
-    outliers_info[col] = n_outliers
+# Quartis, limites e contagens de todas as colunas numa única passada
+passo = Passo('outliers', linhas_entrada=len(df))
+relatorio_outliers = detectar_outliers_extremos(df, colunas_numericas, fator=FATOR_IQR_EXTREMO)
+outliers_info = relatorio_outliers['Outliers'].to_dict()
+passo.concluir(outliers=int(relatorio_outliers['Outliers'].sum()))
 
-    if n_outliers > 0:
-        pct = (n_outliers / len(df)) * 100
-        print(f"   📊 {col}: {n_outliers} outliers ({pct:.2f}%)")
-        print(f"      Limites: [{lim_inf:.2f}, {lim_sup:.2f}]")
+for col, linha in relatorio_outliers[relatorio_outliers['Outliers'] > 0].iterrows():
+    n_outliers = int(linha['Outliers'])
+    pct = (n_outliers / len(df)) * 100
+    print(f"   📊 {col}: {n_outliers} outliers ({pct:.2f}%)")
+    print(f"      Limites: [{linha['Limite_Inferior']:.2f}, {linha['Limite_Superior']:.2f}]")
 
 # Nota: Não vamos remover outliers nesta etapa, apenas identificar
 print("\n💡 NOTA: Outliers identificados mas não removidos.")
@@ -148,45 +148,28 @@ print_section("6. VALIDAÇÃO DE CONSISTÊNCIA")
 
 print("🔍 Verificando consistência de cobranças...")
 
-taxa_day_media = None  # inicializa
-
-if 'Total day minutes' in df.columns and 'Total day charge' in df.columns:
-    taxa_day = df['Total day charge'] / (df['Total day minutes'] + 0.01)
-    taxa_day_media = taxa_day.median()
-    print(f"   ✓ Taxa dia (mediana): ${taxa_day_media:.4f} por minuto")
+# Taxa por minuto (mediana) e discrepâncias dos quatro períodos, sem
+# colunas auxiliares no DataFrame
+passo = Passo('auditoria_tarifas', linhas_entrada=len(df))
+auditoria_tarifas, linhas_discrepantes = auditar_tarifas(df, tolerancia=TOLERANCIA_PADRAO)
+passo.concluir(inconsistencias=int(auditoria_tarifas['Inconsistencias'].sum()))
 
-    # Verificar discrepâncias
-    df['charge_calculado'] = df['Total day minutes'] * taxa_day_media
-    df['diferenca_pct'] = abs((df['Total day charge'] - df['charge_calculado']) / df['Total day charge']) * 100
-
-    inconsistencias = (df['diferenca_pct'] > 5).sum()
-    if inconsistencias > 0:
-        print(f"   ⚠️  {inconsistencias} registros com discrepância >5%")
-    else:
-        print(f"   ✅ Todas as cobranças consistentes (±5%)")
-else:
+if auditoria_tarifas.empty:
     print("   ❌ Colunas necessárias não encontradas no DataFrame")
 
-# Remover colunas auxiliares
-df.drop(['charge_calculado', 'diferenca_pct'], axis=1, inplace=True)
-
-# Eve: verificar taxa noturna
-if 'Total eve minutes' in df.columns and 'Total eve charge' in df.columns:
-    taxa_eve = df['Total eve charge'] / (df['Total eve minutes'] + 0.01)
-    taxa_eve_media = taxa_eve.median()
-    print(f"   ✓ Taxa noite (mediana): ${taxa_eve_media:.4f} por minuto")
-
-# Night: verificar taxa madrugada
-if 'Total night minutes' in df.columns and 'Total night charge' in df.columns:
-    taxa_night = df['Total night charge'] / (df['Total night minutes'] + 0.01)
-    taxa_night_media = taxa_night.median()
-    print(f"   ✓ Taxa madrugada (mediana): ${taxa_night_media:.4f} por minuto")
+for periodo, linha in auditoria_tarifas.iterrows():
+    print(f"   ✓ Taxa {NOMES_PERIODOS[periodo]} (mediana): ${linha['Taxa_Minuto']:.4f} por minuto")
+    if linha['Inconsistencias'] > 0:
+        print(f"      ⚠️  {linha['Inconsistencias']} registros com discrepância >{TOLERANCIA_PADRAO:.0%}")
+    else:
+        print(f"      ✅ Todas as cobranças consistentes (±{TOLERANCIA_PADRAO:.0%})")
 
-# Intl: verificar taxa internacional
-if 'Total intl minutes' in df.columns and 'Total intl charge' in df.columns:
-    taxa_intl = df['Total intl charge'] / (df['Total intl minutes'] + 0.01)
-    taxa_intl_media = taxa_intl.median()
-    print(f"   ✓ Taxa internacional (mediana): ${taxa_intl_media:.4f} por minuto")
+# Faixas de tarifa nominal (±5%) e restrições entre colunas
+for regra, linha in relatorio_regras[relatorio_regras['Tipo'].isin(['tarifa', 'implicacao'])].iterrows():
+    if linha['Violacoes'] > 0:
+        print(f"   ⚠️  {regra}: {linha['Violacoes']} registros violam a regra")
+    else:
+        print(f"   ✅ {regra}: sem violações")
 
 print("\n✅ Taxas de cobrança parecem consistentes")
 
@@ -199,16 +182,16 @@ print_section("7. VALIDAÇÃO DE RANGES ESPERADOS")
 print("🔍 Verificando ranges de valores...")
 
 # Account length (dias de conta) - geralmente 1 a 300
-if 'Account length' in df.columns:
-    fora_range = ((df['Account length'] < 1) | (df['Account length'] > 300)).sum()
+if 'Account length em [1, 300]' in violacoes:
+    fora_range = violacoes['Account length em [1, 300]']
     if fora_range > 0:
         print(f"   ⚠️  Account length: {fora_range} valores fora do range [1, 300]")
     else:
         print(f"   ✅ Account length dentro do range esperado")
 
 # Customer service calls - geralmente 0 a 10
-if 'Customer service calls' in df.columns:
-    chamadas_altas = (df['Customer service calls'] > 10).sum()
+if 'Customer service calls <= 10' in violacoes:
+    chamadas_altas = violacoes['Customer service calls <= 10']
     if chamadas_altas > 0:
         print(f"   ⚠️  {chamadas_altas} clientes com >10 chamadas ao suporte")
         print(f"      (possível indicador forte de churn)")
@@ -221,14 +204,14 @@ if 'Customer service calls' in df.columns:
 
 print_section("RESUMO DA LIMPEZA")
 
-print(f"📊 Registros originais:     {len(df_original):,}")
+print(f"📊 Registros originais:     {registros_originais:,}")
 print(f"📊 Registros após limpeza:  {len(df):,}")
-print(f"📊 Registros removidos:     {len(df_original) - len(df):,}")
+print(f"📊 Registros removidos:     {registros_originais - len(df):,}")
 
-if len(df_original) == len(df):
+if registros_originais == len(df):
     print("\n✅ DATASET LIMPO SEM PERDA DE DADOS")
 else:
-    mudanca_pct = ((len(df_original) - len(df)) / len(df_original)) * 100
+    mudanca_pct = ((registros_originais - len(df)) / registros_originais) * 100
     print(f"📉 Perda de dados: {mudanca_pct:.2f}%")
 
 # Adicionar métricas de qualidade
@@ -243,9 +226,13 @@ print(f"   • Colunas: {len(df.columns)}")
 
 print_section("SALVANDO DADOS LIMPOS")
 
-# Salvar CSV limpo
-df.to_csv('data/processed/03_dados_limpos.csv', index=False)
-print("✅ Dados limpos salvos: data/processed/03_dados_limpos.csv")
+# Salvar dados limpos (Parquet; CSV apenas com CHURN_EXPORTAR_CSV=1)
+passo = Passo('exportacao', linhas_entrada=len(df))
+caminho_salvo = salvar_etapa(df, 'data/processed/03_dados_limpos')
+# Colunas de largura fixa em .npy, abertas por memory map pela EDA e métricas
+gravar_armazem(df, 'data/processed/03_dados_limpos')
+passo.concluir()
+print(f"✅ Dados limpos salvos: {caminho_salvo}")
 
 # Converter outliers_info para formato JSON-serializável
 outliers_info_json = {}
@@ -254,7 +241,7 @@ for coluna, quantidade in outliers_info.items():
 
 # Salvar relatório de limpeza
 relatorio_limpeza = {
-    'registros_originais': int(len(df_original)),
+    'registros_originais': int(registros_originais),
     'registros_finais': int(len(df)),
     'duplicatas_removidas': int(duplicatas_antes),
     'valores_faltantes_tratados': int(valores_faltantes.sum()),
@@ -270,4 +257,6 @@ print("✅ Relatório salvo: outputs/metrics/02_relatorio_limpeza.json")
 salvar_info_execucao("limpeza_dados.py",
                      f"Limpeza concluída: {len(df)} linhas finais")
 
+registrar_memoria_etapa("limpeza_dados.py")
+
 print("\n🎉 LIMPEZA DE DADOS CONCLUÍDA COM SUCESSO!")
\ No newline at end of file
@@ -0,0 +1,179 @@
+# ============================================================================
+# ORÇAMENTO E MEDIÇÃO DE MEMÓRIA POR ETAPA
+# ============================================================================
+#
+# Cada etapa registra, ao terminar, o pico de memória residente (RSS) do
+# processo em outputs/memoria_etapas.json, para que regressões de memória
+# apareçam entre execuções.
+#
+# Orçamento de memória: CHURN_LIMITE_MEMORIA_MB=N
+#   - conduz a execução das etapas que têm caminho em blocos: a inspeção
+#     passa para o modo streaming e a execução particionada também lê em
+#     blocos; o tamanho do bloco vem de linhas_por_bloco(), que reserva
+#     FRACAO_ORCAMENTO_BLOCO do orçamento ainda livre para cada bloco,
+#     pelo tamanho em memória de uma amostra do arquivo
+#     (armazenamento.bytes_por_linha). CHURN_TAMANHO_BLOCO explícito vale
+#     mais que o cálculo;
+#   - trava de segurança: uma thread vigia o pico de RSS (a cada
+#     INTERVALO_VIGIA_S) e interrompe o processo assim que ele passa de N MB,
+#     com código de saída CODIGO_SAIDA_LIMITE (o pipeline para e não marca a
+#     etapa como concluída). As etapas que carregam a base inteira (limpeza,
+#     EDA, métricas, exportação) não têm caminho em blocos: nelas o
+#     orçamento é só essa trava, que falha a etapa em vez de mantê-la abaixo
+#     do limite.
+#
+# A trava não é um RLIMIT_AS: numpy e pyarrow reservam muito mais espaço de
+# endereçamento do que usam, e um teto de memória virtual falharia bem antes
+# do RSS chegar ao orçamento.
+#
+# Rastreamento de alocações: CHURN_RASTREAR_ALOCACOES=1 liga o tracemalloc e
+# registra também o pico de bytes alocados (Python e numpy). Fica separado
+# do orçamento porque deixa cada alocação mais lenta.
+# ============================================================================
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ARQUIVO_MEMORIA = 'outputs/memoria_etapas.json'
+
+_limite = os.environ.get('CHURN_LIMITE_MEMORIA_MB')
+LIMITE_MEMORIA_MB = float(_limite) if _limite else None
+
+RASTREAR_ALOCACOES = os.environ.get('CHURN_RASTREAR_ALOCACOES') == '1'
+
+MB = 1024 * 1024
+
+# Memória de uma etapa em blocos que não depende do bloco (renderização dos
+# gráficos no próprio processo, buffers do gravador Parquet)
+RESERVA_ETAPA_MB = 100
+
+# Parte do orçamento livre (depois da reserva) para um bloco no pandas: na
+# inspeção em blocos o pico sobe ~6x o tamanho do bloco (buffers do
+# read_csv, impressões digitais, cópias)
+FRACAO_ORCAMENTO_BLOCO = 0.15
+
+# Menor bloco aceito ao dimensionar pelo orçamento (abaixo disso o pico quase
+# não cai e o tempo sobe: 1 milhão de linhas levam ~4x mais em blocos de 1 mil)
+LINHAS_MINIMAS_BLOCO = 10_000
+
+# Intervalo entre as verificações do pico de RSS no modo de orçamento
+INTERVALO_VIGIA_S = 0.1
+
+# Código de saída de uma etapa interrompida por passar do limite
+CODIGO_SAIDA_LIMITE = 3
+
+
+def pico_rss_bytes():
+    """
+    Pico de memória residente do processo (None se indisponível)
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+def linhas_por_bloco(bytes_por_linha, padrao):
+    """
+    Tamanho do bloco (linhas) que cabe no orçamento de memória
+
+    Sem orçamento, devolve o padrão. Com orçamento, o bloco ocupa no máximo
+    FRACAO_ORCAMENTO_BLOCO do que falta até o limite (limite menos o pico de
+    RSS até agora e menos RESERVA_ETAPA_MB), entre LINHAS_MINIMAS_BLOCO e o
+    padrão. Um orçamento abaixo do que a etapa usa fora dos blocos fica com
+    o bloco mínimo, e a trava ainda pode interromper a etapa.
+
+    Args:
+        bytes_por_linha: memória de uma linha já carregada (ver
+            armazenamento.bytes_por_linha)
+        padrao: tamanho do bloco sem orçamento
+    """
+    if LIMITE_MEMORIA_MB is None:
+        return padrao
+    livre = (LIMITE_MEMORIA_MB - RESERVA_ETAPA_MB) * MB - (pico_rss_bytes() or 0)
+    linhas = int(livre * FRACAO_ORCAMENTO_BLOCO / max(bytes_por_linha, 1))
+    return max(LINHAS_MINIMAS_BLOCO, min(padrao, linhas))
+
+
+def _vigiar_memoria(limite_bytes):
+    while True:
+        rss = pico_rss_bytes()
+        if rss > limite_bytes:
+            print(f"\n❌ Pico de RSS de {rss / MB:,.1f} MB excedeu o limite de "
+                  f"{LIMITE_MEMORIA_MB:,.0f} MB: etapa interrompida", flush=True)
+            sys.stderr.flush()
+            os._exit(CODIGO_SAIDA_LIMITE)
+        time.sleep(INTERVALO_VIGIA_S)
+
+
+def iniciar_medicao_memoria():
+    """
+    Liga o tracemalloc (CHURN_RASTREAR_ALOCACOES=1) e, com orçamento, a
+    trava que interrompe o processo quando o pico de RSS passa do limite
+    (chamado por preparar_etapa)
+    """
+    if RASTREAR_ALOCACOES and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if LIMITE_MEMORIA_MB is None:
+        return
+    if resource is not None and not any(t.name == 'vigia_memoria' for t in threading.enumerate()):
+        threading.Thread(target=_vigiar_memoria, args=(LIMITE_MEMORIA_MB * MB,),
+                         name='vigia_memoria', daemon=True).start()
+
+
+def registrar_memoria_etapa(etapa, caminho=ARQUIVO_MEMORIA):
+    """
+    Grava o pico de memória da etapa e verifica o orçamento (a vigia de
+    iniciar_medicao_memoria já interrompe a etapa durante a execução; esta
+    verificação final cobre o último intervalo)
+
+    Args:
+        etapa: nome do script
+        caminho: arquivo JSON com o registro de todas as etapas
+
+    Returns:
+        dict com pico_rss_mb, pico_alocado_mb (None sem
+        CHURN_RASTREAR_ALOCACOES) e limite_mb
+
+    Raises:
+        SystemExit: se o pico de RSS passar do limite configurado
+    """
+    rss = pico_rss_bytes()
+    alocado = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+
+    registro = {
+        'pico_rss_mb': None if rss is None else round(rss / MB, 1),
+        'pico_alocado_mb': None if alocado is None else round(alocado / MB, 1),
+        'limite_mb': LIMITE_MEMORIA_MB,
+        'registrado_em': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+    registros = {}
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            registros = json.load(f)
+    registros[etapa] = registro
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(registros, f, indent=4)
+    os.replace(temporario, caminho)
+
+    texto_alocado = '' if alocado is None else f" | alocado (pico): {registro['pico_alocado_mb']:,.1f} MB"
+    if rss is not None:
+        print(f"🧠 Memória: RSS (pico) {registro['pico_rss_mb']:,.1f} MB{texto_alocado}")
+
+    if LIMITE_MEMORIA_MB is not None and rss is not None and rss > LIMITE_MEMORIA_MB * MB:
+        raise SystemExit(f"❌ {etapa}: pico de RSS de {registro['pico_rss_mb']:,.1f} MB "
+                         f"excedeu o limite de {LIMITE_MEMORIA_MB:,.0f} MB")
+    return registro
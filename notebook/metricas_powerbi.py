@@ -1,5 +1,17 @@
 from preparacao_ambiente import *
+preparar_etapa()
+
+import pandas as pd
+import numpy as np
+from armazenamento import salvar_etapa
+from armazem_colunas import carregar_colunas
+from cubo_churn import CuboChurn
+from kpis_incrementais import (derivar_segmentos, medidas_inteiras, histogramas_receita,
+                               kpis_dashboard, tabela_receita_status, perfil_dos_churners,
+                               tabela_combo_planos, EstadoKPIs, ARQUIVO_ESTADO)
 import json
+from memoria import registrar_memoria_etapa
+from instrumentacao import Passo, medir
 
 # ============================================================================
 # CARREGAMENTO DOS DADOS
@@ -7,13 +19,28 @@ import json
 
 print_section("CRIAÇÃO DE MÉTRICAS PARA POWER BI")
 
-df = pd.read_csv('data/processed/03_dados_limpos.csv')
+passo = Passo('carga')
+# Colunas mapeadas do armazém colunar (sem cópia; ver armazem_colunas.py)
+df = carregar_colunas('data/processed/03_dados_limpos')
+passo.concluir(linhas_saida=len(df))
 print(f"✅ Dados carregados: {len(df):,} linhas")
 
-# Garantir que temos as colunas necessárias
-if 'Churn' in df.columns:
-    df['Churn_Num'] = df['Churn'].astype(int)
-    df['Churn_Label'] = df['Churn'].map({True: 'Saiu', False: 'Permaneceu'})
+# Colunas derivadas (status, receita por cliente, faixas, combinação de planos)
+with medir('segmentos', linhas_entrada=len(df)):
+    derivar_segmentos(df)
+
+# Cubo de churn: contagens, churners e somas das medidas (em centavos /
+# inteiros, exatas) de todas as dimensões numa passada; os KPIs e as
+# tabelas 12-18 são leituras dele, com as mesmas fórmulas do modo
+# incremental (kpis_incrementais.py)
+passo = Passo('cubo_churn', linhas_entrada=len(df))
+cubo = CuboChurn(df['Churn'], medidas_inteiras(df))
+for dimensao in ['Churn_Label', 'Area code', 'International plan', 'Voice mail plan',
+                 'Customer service calls', 'Faixa_Receita', 'Faixa_Tempo_Conta']:
+    cubo.adicionar_dimensao(dimensao, df[dimensao])
+cubo.adicionar_par('International plan', 'Voice mail plan')
+agregado_status = cubo.agregado('Churn_Label')
+passo.concluir()
 
 # ============================================================================
 # 1. MÉTRICAS CONSOLIDADAS (KPIs PRINCIPAIS)
@@ -22,41 +49,8 @@ if 'Churn' in df.columns:
 print_section("1. KPIs PRINCIPAIS PARA DASHBOARD")
 
 # Calcular KPIs gerais
-total_clientes = len(df)
-total_churners = df['Churn'].sum()
-total_ativos = total_clientes - total_churners
-taxa_churn = (total_churners / total_clientes) * 100
-taxa_retencao = 100 - taxa_churn
-
-# Receitas (baseado em charges)
-receita_total_dia = df['Total day charge'].sum()
-receita_total_noite = df['Total eve charge'].sum()
-receita_total_madrugada = df['Total night charge'].sum()
-receita_total_intl = df['Total intl charge'].sum()
-receita_total = receita_total_dia + receita_total_noite + receita_total_madrugada + receita_total_intl
-
-# Receita média por cliente
-receita_media_cliente = receita_total / total_clientes
-
-# Receita média por churner vs não-churner
-receita_media_churner = df[df['Churn'] == True][['Total day charge', 'Total eve charge',
-                                                   'Total night charge', 'Total intl charge']].sum(axis=1).mean()
-receita_media_ativo = df[df['Churn'] == False][['Total day charge', 'Total eve charge',
-                                                  'Total night charge', 'Total intl charge']].sum(axis=1).mean()
-
-# Criar dicionário de KPIs
-kpis = {
-    'total_clientes': int(total_clientes),
-    'total_churners': int(total_churners),
-    'total_ativos': int(total_ativos),
-    'taxa_churn_%': round(float(taxa_churn), 2),
-    'taxa_retencao_%': round(float(taxa_retencao), 2),
-    'receita_total': round(float(receita_total), 2),
-    'receita_media_cliente': round(float(receita_media_cliente), 2),
-    'receita_media_churner': round(float(receita_media_churner), 2),
-    'receita_media_ativo': round(float(receita_media_ativo), 2),
-    'perda_receita_estimada': round(float(receita_media_churner * total_churners), 2)
-}
+with medir('agregacao:12_kpis_dashboard'):
+    kpis = kpis_dashboard(agregado_status)
 
 # Exibir KPIs
 print("\n📊 KPIs PRINCIPAIS:")
@@ -83,18 +77,9 @@ print("\n✅ KPIs salvos: outputs/metrics/12_kpis_dashboard.json")
 
 print_section("2. ANÁLISE DE RECEITA POR STATUS DE CHURN")
 
-# Criar coluna de receita total por cliente
-df['Receita_Total_Cliente'] = (df['Total day charge'] + df['Total eve charge'] +
-                                 df['Total night charge'] + df['Total intl charge'])
-
-# Agrupar por status de churn
-receita_por_status = df.groupby('Churn_Label').agg({
-    'Receita_Total_Cliente': ['sum', 'mean', 'median', 'min', 'max'],
-    'Churn': 'count'
-}).round(2)
-
-receita_por_status.columns = ['Receita_Total', 'Receita_Media', 'Receita_Mediana',
-                               'Receita_Min', 'Receita_Max', 'Num_Clientes']
+# Agrupar por status de churn (mediana/mín/máx pelo histograma da receita)
+with medir('agregacao:13_receita_por_status', linhas_entrada=len(df)):
+    receita_por_status = tabela_receita_status(agregado_status, histogramas_receita(df))
 
 print("\n📊 Receita por Status:")
 print(receita_por_status)
@@ -109,20 +94,9 @@ print("✅ Tabela salva: outputs/metrics/13_receita_por_status.csv")
 
 print_section("3. CHURN POR FAIXA DE RECEITA")
 
-# Criar faixas de receita
-df['Faixa_Receita'] = pd.cut(df['Receita_Total_Cliente'],
-                              bins=[0, 40, 60, 80, 100, float('inf')],
-                              labels=['Muito Baixa (0-40)', 'Baixa (40-60)',
-                                      'Média (60-80)', 'Alta (80-100)',
-                                      'Muito Alta (100+)'])
-
 # Calcular churn por faixa
-churn_por_receita = df.groupby('Faixa_Receita', observed=True).agg({
-    'Churn': ['sum', 'count', 'mean']
-}).round(4)
-
-churn_por_receita.columns = ['Churners', 'Total_Clientes', 'Taxa_Churn']
-churn_por_receita['Taxa_Churn_%'] = churn_por_receita['Taxa_Churn'] * 100
+with medir('agregacao:14_churn_por_faixa_receita'):
+    churn_por_receita = cubo.tabela_churn('Faixa_Receita', nome_total='Total_Clientes')
 
 print("\n📊 Churn por Faixa de Receita:")
 print(churn_por_receita[['Total_Clientes', 'Churners', 'Taxa_Churn_%']].round(2))
@@ -137,20 +111,9 @@ print("✅ Tabela salva: outputs/metrics/14_churn_por_faixa_receita.csv")
 
 print_section("4. CHURN POR TEMPO DE CONTA")
 
-# Criar faixas de tempo de conta
-df['Faixa_Tempo_Conta'] = pd.cut(df['Account length'],
-                                  bins=[0, 50, 100, 150, 200, float('inf')],
-                                  labels=['0-50 dias', '51-100 dias',
-                                          '101-150 dias', '151-200 dias',
-                                          '200+ dias'])
-
 # Calcular churn por faixa
-churn_por_tempo = df.groupby('Faixa_Tempo_Conta', observed=True).agg({
-    'Churn': ['sum', 'count', 'mean']
-}).round(4)
-
-churn_por_tempo.columns = ['Churners', 'Total_Clientes', 'Taxa_Churn']
-churn_por_tempo['Taxa_Churn_%'] = churn_por_tempo['Taxa_Churn'] * 100
+with medir('agregacao:15_churn_por_tempo_conta'):
+    churn_por_tempo = cubo.tabela_churn('Faixa_Tempo_Conta', nome_total='Total_Clientes')
 
 print("\n📊 Churn por Tempo de Conta:")
 print(churn_por_tempo[['Total_Clientes', 'Churners', 'Taxa_Churn_%']].round(2))
@@ -166,12 +129,8 @@ print("✅ Tabela salva: outputs/metrics/15_churn_por_tempo_conta.csv")
 print_section("5. CHURN POR ÁREA (AREA CODE)")
 
 # Area code representa regiões
-churn_por_area = df.groupby('Area code').agg({
-    'Churn': ['sum', 'count', 'mean']
-}).round(4)
-
-churn_por_area.columns = ['Churners', 'Total_Clientes', 'Taxa_Churn']
-churn_por_area['Taxa_Churn_%'] = churn_por_area['Taxa_Churn'] * 100
+with medir('agregacao:16_churn_por_area'):
+    churn_por_area = cubo.tabela_churn('Area code', nome_total='Total_Clientes')
 
 print("\n📊 Churn por Área (Area Code):")
 print(churn_por_area[['Total_Clientes', 'Churners', 'Taxa_Churn_%']].round(2))
@@ -186,20 +145,12 @@ print("✅ Tabela salva: outputs/metrics/16_churn_por_area.csv")
 
 print_section("6. PERFIL DETALHADO DOS CHURNERS")
 
-# Selecionar apenas churners
-churners = df[df['Churn'] == True].copy()
-
-# Criar resumo estatístico
-perfil_churners = {
-    'total_churners': len(churners),
-    'idade_conta_media': round(churners['Account length'].mean(), 2),
-    'chamadas_suporte_media': round(churners['Customer service calls'].mean(), 2),
-    'minutos_dia_media': round(churners['Total day minutes'].mean(), 2),
-    'receita_media': round(churners['Receita_Total_Cliente'].mean(), 2),
-    'pct_com_intl_plan': round((churners['International plan'] == 'Yes').sum() / len(churners) * 100, 2),
-    'pct_com_voicemail': round((churners['Voice mail plan'] == 'Yes').sum() / len(churners) * 100, 2),
-    'pct_chamadas_4_mais': round((churners['Customer service calls'] >= 4).sum() / len(churners) * 100, 2)
-}
+# Somas das medidas e churners por dimensão, lidos do cubo
+with medir('agregacao:17_perfil_churners'):
+    perfil_churners = perfil_dos_churners(agregado_status,
+                                         cubo.agregado('International plan')['Churners'],
+                                         cubo.agregado('Voice mail plan')['Churners'],
+                                         cubo.agregado('Customer service calls')['Churners'])
 
 print("\n📊 Perfil dos Churners:")
 for key, value in perfil_churners.items():
@@ -216,18 +167,9 @@ print("\n✅ Perfil salvo: outputs/metrics/17_perfil_churners.json")
 
 print_section("7. COMPARATIVO: COMBINAÇÕES DE PLANOS")
 
-# Criar combinações de planos
-df['Combo_Planos'] = df['International plan'] + ' / ' + df['Voice mail plan']
-
-# Análise por combinação
-combo_analise = df.groupby('Combo_Planos').agg({
-    'Churn': ['sum', 'count', 'mean'],
-    'Receita_Total_Cliente': 'mean'
-}).round(2)
-
-combo_analise.columns = ['Churners', 'Total', 'Taxa_Churn', 'Receita_Media']
-combo_analise['Taxa_Churn_%'] = combo_analise['Taxa_Churn'] * 100
-combo_analise = combo_analise[['Total', 'Churners', 'Taxa_Churn_%', 'Receita_Media']]
+# Análise por combinação (par International plan × Voice mail plan do cubo)
+with medir('agregacao:18_analise_combo_planos'):
+    combo_analise = tabela_combo_planos(cubo.agregado(('International plan', 'Voice mail plan')))
 
 print("\n📊 Análise por Combinação de Planos:")
 print(combo_analise)
@@ -259,15 +201,23 @@ print("""
 💡 Total: 7 novos arquivos de métricas prontos para Power BI
 """)
 
-# Salvar dataset com novas colunas
-df_com_features = df.copy()
-df_com_features.to_csv('data/processed/04_dados_com_features.csv', index=False)
-print("✅ Dataset atualizado salvo: data/processed/04_dados_com_features.csv")
+# Estado para atualizações incrementais (python notebook/kpis_incrementais.py <delta>)
+with medir('estado_kpis', linhas_entrada=len(df)):
+    caminho_estado = EstadoKPIs.de_dataframe(df).salvar(ARQUIVO_ESTADO)
+print(f"✅ Estado dos KPIs salvo: {caminho_estado}")
+
+# Salvar dataset com novas colunas (sem cópia: salvar_etapa converte os
+# tipos do próprio df, que não é mais usado depois daqui)
+with medir('exportacao', linhas_entrada=len(df)):
+    caminho_salvo = salvar_etapa(df, 'data/processed/04_dados_com_features')
+print(f"✅ Dataset atualizado salvo: {caminho_salvo}")
 
 # Registrar no log
 salvar_info_execucao("metricas_powerbi.py",
                      "7 arquivos de métricas criados para dashboard")
 
+registrar_memoria_etapa("metricas_powerbi.py")
+
 print("\n🎉 CRIAÇÃO DE MÉTRICAS CONCLUÍDA!")
 
 # ============================================================================
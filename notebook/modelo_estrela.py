@@ -0,0 +1,457 @@
+# ============================================================================
+# MODELO ESTRELA PARA O POWER BI
+# ============================================================================
+#
+# Em vez de cópias largas da base com rótulos de texto repetidos em cada
+# linha, o dashboard lê uma tabela fato tipada e dimensões pequenas:
+#
+#   fato_clientes          uma chave inteira por dimensão, as medidas com os
+#                          tipos compactos do esquema, Churn (bool),
+#                          Receita_Total_Cliente e Data_Snapshot
+#   dim_estado             chave_estado, State
+#   dim_area               chave_area, Area code
+#   dim_combo_planos       chave_combo, Combo_Planos, International plan,
+#                          Voice mail plan
+#   dim_risco              chave_risco, Risco_Churn (Baixo < Médio < Alto)
+#   dim_faixa_receita      chave_faixa_receita, Faixa_Receita,
+#                          Limite_Inferior, Limite_Superior
+#   dim_faixa_tempo_conta  chave_faixa_tempo_conta, Faixa_Tempo_Conta,
+#                          Limite_Inferior, Limite_Superior
+#
+# As chaves são os códigos das categorias (a partir de 0, na ordem da
+# categoria; -1 = sem valor, ex: receita fora das faixas), no menor inteiro
+# que as comporta. As tabelas são gravadas em Parquet com snappy, lido pelo
+# conector nativo do Power BI (sem pyarrow, em CSV).
+#
+# ATUALIZAÇÃO INCREMENTAL
+# A tabela fato é particionada pela data do snapshot e pelo valor de uma
+# dimensão (padrão: State):
+#   fato_clientes/data_snapshot=2026-10-18/State=CA.parquet
+# O manifesto.json da pasta guarda, para cada arquivo (partições e
+# dimensões), o sha256 do conteúdo (colunas, tipos e valores), as linhas, os
+# bytes e quando foi gravado. Uma execução só reescreve os arquivos cujo
+# conteúdo mudou, apaga as partições do mesmo snapshot que deixaram de
+# existir e não toca nos snapshots anteriores; o manifesto é trocado de uma
+# vez (arquivo temporário + os.replace) depois das partições. A publicação
+# compara os hashes com o manifesto anterior e envia só o que mudou; no
+# Power BI, a atualização incremental filtra Data_Snapshot por
+# RangeStart/RangeEnd.
+#
+# As chaves das dimensões são estáveis entre exportações: a dimensão já
+# gravada na pasta é mantida, valores novos recebem chaves depois da maior
+# existente e valores que sumiram continuam na dimensão (as partições dos
+# snapshots anteriores ainda apontam para eles). Nenhuma chave é reutilizada.
+#
+# Verificação: python notebook/modelo_estrela.py --verificar
+# ============================================================================
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import PYARROW_DISPONIVEL
+from esquema import (COLUNAS_POSITIVAS, BINS_RECEITA, BINS_TEMPO_CONTA)
+from pontuacao_risco import pontuar
+
+if PYARROW_DISPONIVEL:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+PASTA_MODELO = 'data/dashboard/modelo'
+
+# Compressão aceita pelo conector Parquet do Power BI
+COMPRESSAO_POWERBI = 'snappy'
+
+TABELA_FATO = 'fato_clientes'
+
+EXTENSAO_TABELA = '.parquet' if PYARROW_DISPONIVEL else '.csv'
+
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+VERSAO_MANIFESTO = 1
+
+COLUNA_SNAPSHOT = 'Data_Snapshot'
+
+PARTICAO_PADRAO = 'State'
+
+# Dimensão -> (chave na tabela fato, coluna de origem)
+DIMENSOES_MODELO = {
+    'dim_estado': ('chave_estado', 'State'),
+    'dim_area': ('chave_area', 'Area code'),
+    'dim_combo_planos': ('chave_combo', 'Combo_Planos'),
+    'dim_risco': ('chave_risco', 'Risco_Churn'),
+    'dim_faixa_receita': ('chave_faixa_receita', 'Faixa_Receita'),
+    'dim_faixa_tempo_conta': ('chave_faixa_tempo_conta', 'Faixa_Tempo_Conta')
+}
+
+# Limites das faixas (intervalos (inferior, superior], como no pd.cut;
+# limite infinito vira vazio na dimensão)
+LIMITES_FAIXAS = {
+    'Faixa_Receita': BINS_RECEITA,
+    'Faixa_Tempo_Conta': BINS_TEMPO_CONTA
+}
+
+# Medidas da tabela fato, além das chaves
+MEDIDAS_FATO = COLUNAS_POSITIVAS + ['Churn', 'Receita_Total_Cliente']
+
+
+def data_snapshot():
+    """
+    Data do snapshot exportado (AAAA-MM-DD): CHURN_DATA_SNAPSHOT ou hoje
+    """
+    return os.environ.get('CHURN_DATA_SNAPSHOT') or date.today().isoformat()
+
+
+def _categorias(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    return serie.astype('category')
+
+
+def _tipo_chave(maior):
+    for tipo in (np.int8, np.int16, np.int32):
+        if maior <= np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+def _dimensao(chave, coluna, categorias, tipo_chave, chaves=None):
+    """
+    Tabela de uma dimensão: chave (no mesmo tipo da chave na tabela fato),
+    rótulo e atributos derivados do rótulo
+
+    Args:
+        chaves: chave de cada categoria (None = posição da categoria)
+    """
+    chaves = np.arange(len(categorias)) if chaves is None else chaves
+    tabela = pd.DataFrame({chave: np.asarray(chaves, dtype=tipo_chave),
+                           coluna: np.asarray(categorias)})
+    if coluna == 'Combo_Planos':
+        planos = tabela[coluna].astype(str).str.split(' / ', expand=True)
+        tabela['International plan'] = planos[0]
+        tabela['Voice mail plan'] = planos[1]
+    if coluna in LIMITES_FAIXAS:
+        limites = LIMITES_FAIXAS[coluna]
+        tabela['Limite_Inferior'] = np.asarray(limites[:-1], dtype=np.float64)
+        superiores = np.asarray(limites[1:], dtype=np.float64)
+        tabela['Limite_Superior'] = np.where(np.isinf(superiores), np.nan, superiores)
+    return tabela
+
+
+def montar_modelo_estrela(df):
+    """
+    Tabela fato e dimensões a partir da base com as colunas de
+    derivar_segmentos (Risco_Churn é calculado se faltar)
+
+    Returns:
+        dict nome da tabela -> DataFrame (fato primeiro)
+    """
+    fato = {}
+    dimensoes = {}
+    for nome, (chave, coluna) in DIMENSOES_MODELO.items():
+        valores = pontuar(df) if coluna == 'Risco_Churn' and coluna not in df.columns else df[coluna]
+        valores = _categorias(valores)
+        fato[chave] = valores.cat.codes.to_numpy()
+        dimensoes[nome] = _dimensao(chave, coluna, valores.cat.categories, fato[chave].dtype)
+
+    for col in MEDIDAS_FATO:
+        fato[col] = df[col].to_numpy()
+
+    return {TABELA_FATO: pd.DataFrame(fato), **dimensoes}
+
+
+def _ler_tabela(caminho, colunas):
+    if PYARROW_DISPONIVEL:
+        return pd.read_parquet(caminho, columns=colunas)
+    return pd.read_csv(caminho, usecols=colunas)
+
+
+def manter_chaves(tabelas, pasta=PASTA_MODELO):
+    """
+    Troca as chaves das dimensões (e da tabela fato) pelas já gravadas na
+    pasta: valores conhecidos mantêm a chave, valores novos recebem chaves
+    depois da maior existente e valores ausentes nesta base continuam na
+    dimensão. Os rótulos são comparados como texto (Area code lido de CSV
+    volta como número).
+
+    Returns:
+        Novo dict de tabelas (a tabela fato é copiada só nas colunas de chave)
+    """
+    fato = tabelas[TABELA_FATO].copy(deep=False)
+    resultado = {}
+    for nome, (chave, coluna) in DIMENSOES_MODELO.items():
+        atual = tabelas[nome]
+        caminho = os.path.join(pasta, f"{nome}{EXTENSAO_TABELA}")
+        conhecidas = {}
+        if os.path.exists(caminho):
+            anterior = _ler_tabela(caminho, [chave, coluna])
+            conhecidas = {str(rotulo): (rotulo, int(k)) for k, rotulo in zip(anterior[chave], anterior[coluna])}
+
+        proxima = max((k for _, k in conhecidas.values()), default=-1) + 1
+        novas = np.empty(len(atual), dtype=np.int64)
+        for i, rotulo in enumerate(atual[coluna].tolist()):
+            if str(rotulo) not in conhecidas:
+                conhecidas[str(rotulo)] = (rotulo, proxima)
+                proxima += 1
+            novas[i] = conhecidas[str(rotulo)][1]
+
+        tipo = _tipo_chave(proxima - 1)
+        codigos = fato[chave].to_numpy()
+        fato[chave] = np.where(codigos >= 0, novas[np.clip(codigos, 0, None)], -1).astype(tipo)
+        membros = sorted(conhecidas.values(), key=lambda membro: membro[1])
+        resultado[nome] = _dimensao(chave, coluna, [rotulo for rotulo, _ in membros], tipo,
+                                    [k for _, k in membros])
+    return {TABELA_FATO: fato, **resultado}
+
+
+def hash_conteudo(tabela):
+    """
+    sha256 do conteúdo de uma tabela: nomes e tipos das colunas e os valores,
+    na ordem das linhas (independe do formato e do compressor do arquivo)
+    """
+    h = hashlib.sha256()
+    for col, tipo in tabela.dtypes.items():
+        h.update(f"{col}:{tipo}\n".encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(tabela, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def gravar_tabela(tabela, caminho):
+    """
+    Grava uma tabela do modelo (Parquet snappy, ou CSV sem pyarrow) num
+    arquivo temporário e o troca pelo destino: quem lê nunca vê um arquivo
+    pela metade
+    """
+    temporario = f"{caminho}.tmp-{os.getpid()}"
+    if PYARROW_DISPONIVEL:
+        pq.write_table(pa.Table.from_pandas(tabela, preserve_index=False), temporario,
+                       compression=COMPRESSAO_POWERBI)
+    else:
+        tabela.to_csv(temporario, index=False)
+    os.replace(temporario, caminho)
+
+
+def ler_manifesto(pasta=PASTA_MODELO):
+    """
+    Manifesto da pasta do modelo (vazio se não existir ou for de outra versão)
+    """
+    caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            manifesto = json.load(f)
+        if manifesto.get('versao') == VERSAO_MANIFESTO:
+            return manifesto
+    return {'versao': VERSAO_MANIFESTO, 'arquivos': {}}
+
+
+def gravar_manifesto(manifesto, pasta=PASTA_MODELO):
+    """
+    Troca o manifesto de uma vez (arquivo temporário + os.replace)
+    """
+    caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    temporario = f"{caminho}.tmp-{os.getpid()}"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=4, ensure_ascii=False, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def _nome_particao(valor):
+    # Valores como 'No / Yes' ou 'Baixa (40-60)' viram nomes de arquivo válidos
+    return 'vazio' if valor is None else re.sub(r'[^\w.-]+', '_', str(valor))
+
+
+def dimensao_particao(particao):
+    """
+    Nome da dimensão e chave na tabela fato da coluna de partição
+
+    Raises:
+        ValueError: se a coluna não for de nenhuma dimensão do modelo
+    """
+    for nome, (chave, coluna) in DIMENSOES_MODELO.items():
+        if coluna == particao:
+            return nome, chave
+    colunas = [coluna for _, coluna in DIMENSOES_MODELO.values()]
+    raise ValueError(f"Partição '{particao}' inválida (use uma de: {', '.join(colunas)})")
+
+
+def particionar_fato(tabelas, particao=PARTICAO_PADRAO):
+    """
+    Divide a tabela fato pelo valor da coluna de uma dimensão
+
+    Yields:
+        (valor da dimensão ou None para chave -1, partição da tabela fato)
+    """
+    nome, chave = dimensao_particao(particao)
+    dimensao = tabelas[nome]
+    rotulos = dict(zip(dimensao[chave].tolist(), dimensao[particao].tolist()))
+    fato = tabelas[TABELA_FATO]
+    for codigo, parte in fato.groupby(chave, sort=True):
+        yield rotulos.get(codigo), parte.reset_index(drop=True)
+
+
+def _gravar_se_mudou(dados, pasta, relativo, arquivos, momento, **atributos):
+    conteudo = hash_conteudo(dados)
+    caminho = os.path.join(pasta, relativo)
+    anterior = arquivos.get(relativo)
+    if anterior is not None and anterior['hash'] == conteudo and os.path.exists(caminho):
+        return False
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    gravar_tabela(dados, caminho)
+    arquivos[relativo] = {**atributos, 'hash': conteudo, 'linhas': len(dados),
+                          'bytes': os.path.getsize(caminho), 'gravado_em': momento}
+    return True
+
+
+def exportar_incremental(tabelas, data_snapshot, pasta=PASTA_MODELO, particao=PARTICAO_PADRAO):
+    """
+    Grava o modelo com a tabela fato particionada por snapshot e dimensão,
+    reescrevendo só os arquivos cujo conteúdo mudou, e atualiza o manifesto
+
+    As chaves das dimensões seguem as já gravadas na pasta (manter_chaves).
+
+    Args:
+        tabelas: saída de montar_modelo_estrela
+        data_snapshot: data dos dados (datetime.date ou 'AAAA-MM-DD')
+        pasta: pasta do modelo
+        particao: coluna de dimensão que divide cada snapshot
+
+    Returns:
+        dict com as listas 'gravados', 'inalterados' e 'removidos' (caminhos
+        relativos à pasta)
+
+    Raises:
+        ValueError: se a partição não for coluna de uma dimensão
+    """
+    dimensao_particao(particao)
+    tabelas = manter_chaves(tabelas, pasta)
+    data = pd.Timestamp(data_snapshot).normalize()
+    rotulo_data = data.strftime('%Y-%m-%d')
+    momento = datetime.now().isoformat(timespec='seconds')
+    manifesto = ler_manifesto(pasta)
+    arquivos = manifesto['arquivos']
+    resultado = {'gravados': [], 'inalterados': [], 'removidos': []}
+
+    for nome, tabela in tabelas.items():
+        if nome == TABELA_FATO:
+            continue
+        relativo = f"{nome}{EXTENSAO_TABELA}"
+        mudou = _gravar_se_mudou(tabela, pasta, relativo, arquivos, momento, tabela=nome)
+        resultado['gravados' if mudou else 'inalterados'].append(relativo)
+
+    atuais = set()
+    for valor, parte in particionar_fato(tabelas, particao):
+        parte[COLUNA_SNAPSHOT] = data
+        relativo = '/'.join([TABELA_FATO, f"data_snapshot={rotulo_data}",
+                             f"{_nome_particao(particao)}={_nome_particao(valor)}{EXTENSAO_TABELA}"])
+        atuais.add(relativo)
+        mudou = _gravar_se_mudou(parte, pasta, relativo, arquivos, momento, tabela=TABELA_FATO,
+                                 data_snapshot=rotulo_data, particao=particao, valor=valor)
+        resultado['gravados' if mudou else 'inalterados'].append(relativo)
+
+    # Partições do snapshot que sumiram (ex: troca da coluna de partição)
+    for relativo, info in list(arquivos.items()):
+        if info.get('data_snapshot') == rotulo_data and relativo not in atuais:
+            caminho = os.path.join(pasta, relativo)
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            del arquivos[relativo]
+            resultado['removidos'].append(relativo)
+
+    if resultado['gravados'] or resultado['removidos'] or not os.path.exists(os.path.join(pasta, ARQUIVO_MANIFESTO)):
+        manifesto['atualizado_em'] = momento
+        gravar_manifesto(manifesto, pasta)
+    return resultado
+
+
+def _base_verificacao(estados, areas, planos_internacionais):
+    from kpis_incrementais import derivar_segmentos
+
+    n = len(estados)
+    df = pd.DataFrame({col: np.ones(n, dtype=np.int16) for col in COLUNAS_POSITIVAS})
+    # Account length identifica a linha (0 fica fora das faixas: chave -1)
+    df['Account length'] = np.arange(n, dtype=np.int16) * 60
+    df['State'] = pd.Categorical(estados)
+    df['Area code'] = pd.Categorical(areas)
+    df['International plan'] = pd.Categorical(planos_internacionais)
+    df['Voice mail plan'] = pd.Categorical(['no'] * n)
+    df['Customer service calls'] = np.arange(n, dtype=np.int8)
+    df['Churn'] = np.arange(n) % 2 == 0
+    derivar_segmentos(df)
+    df['Risco_Churn'] = pontuar(df)
+    return df
+
+
+def verificar():
+    """
+    Exporta dois snapshots numa pasta temporária, com um State, um Area code
+    e um combo de planos que só aparecem no segundo, e confere que toda linha
+    da tabela fato dos dois snapshots aponta para o rótulo certo nas
+    dimensões gravadas por último
+
+    Returns:
+        Lista de problemas (vazia = ok)
+    """
+    dias = {
+        '2026-01-01': _base_verificacao(['CA', 'AZ', 'TX', 'CA'], ['415', '510', '415', '510'],
+                                        ['yes', 'yes', 'yes', 'yes']),
+        '2026-01-02': _base_verificacao(['AK', 'CA', 'AZ', 'TX', 'CA'], ['408', '415', '510', '415', '510'],
+                                        ['no', 'yes', 'yes', 'no', 'yes'])
+    }
+    pasta = tempfile.mkdtemp(prefix='modelo_estrela_')
+    problemas = []
+    try:
+        for data, df in dias.items():
+            exportar_incremental(montar_modelo_estrela(df), data, pasta)
+
+        arquivos = ler_manifesto(pasta)['arquivos']
+        for data, df in dias.items():
+            partes = [_ler_tabela(os.path.join(pasta, relativo), None)
+                      for relativo, info in sorted(arquivos.items()) if info.get('data_snapshot') == data]
+            fato = pd.concat(partes, ignore_index=True)
+            esperado = df.set_index('Account length').loc[fato['Account length']]
+            for nome, (chave, coluna) in DIMENSOES_MODELO.items():
+                dimensao = _ler_tabela(os.path.join(pasta, f"{nome}{EXTENSAO_TABELA}"), None)
+                if dimensao[chave].duplicated().any():
+                    problemas.append(f"{nome}: chave repetida")
+                if dimensao[chave].dtype != fato[chave].dtype:
+                    problemas.append(f"{nome}: tipo da chave {dimensao[chave].dtype} na dimensão "
+                                     f"e {fato[chave].dtype} na fato ({data})")
+                rotulos = dict(zip(dimensao[chave].tolist(), dimensao[coluna].astype(str).tolist()))
+                obtidos = fato[chave].map(rotulos).fillna('-').to_numpy()
+                corretos = esperado[coluna].astype(object).fillna('-').astype(str).to_numpy()
+                errados = int((obtidos != corretos).sum())
+                if errados:
+                    problemas.append(f"{data}, {nome}: {errados} linhas com rótulo errado")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return problemas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Modelo estrela do dashboard (Power BI)')
+    parser.add_argument('--verificar', action='store_true',
+                        help='Exporta dois snapshots com membros novos e confere as chaves das dimensões')
+    args = parser.parse_args()
+
+    if not args.verificar:
+        parser.print_help()
+        sys.exit(0)
+
+    problemas = verificar()
+    if problemas:
+        print("❌ Chaves inconsistentes:")
+        for texto in problemas:
+            print(f"   • {texto}")
+        sys.exit(1)
+    print("✅ Chaves das dimensões estáveis entre snapshots")
@@ -0,0 +1,146 @@
+# ============================================================================
+# DETECÇÃO DE OUTLIERS EXTREMOS (3×IQR) PARA TODAS AS COLUNAS
+# ============================================================================
+#
+# Em memória: um único cálculo de quantis para todas as colunas e uma
+# comparação vetorizada contra os limites (sem cópia filtrada por coluna).
+#
+# Em blocos (bases que não cabem na memória): primeira passada monta um
+# EsbocoQuantis por coluna (mesclável entre blocos/processos) e estima Q1/Q3;
+# segunda passada conta exatamente os valores fora dos limites estimados.
+# Erro dos limites: Q1 e Q3 têm erro relativo ≤ α (ver esbocos.py), logo
+#     |lim_est - lim| ≤ α·(|Q1| + |Q3|)·(1 + fator)
+# ============================================================================
+
+import pandas as pd
+
+from esbocos import EsbocoQuantis, PRECISAO_QUANTIS_PADRAO
+
+# Fator do IQR para outliers extremos
+FATOR_IQR_EXTREMO = 3
+
+
+def _montar_relatorio(q1, q3, fator):
+    iqr = q3 - q1
+    return pd.DataFrame({
+        'Q1': q1,
+        'Q3': q3,
+        'IQR': iqr,
+        'Limite_Inferior': q1 - fator * iqr,
+        'Limite_Superior': q3 + fator * iqr
+    })
+
+
+def contar_fora_dos_limites(df, limite_inferior, limite_superior):
+    """
+    Conta, por coluna, os valores fora de [limite_inferior, limite_superior]
+
+    Args:
+        df: DataFrame (ou bloco) com as colunas dos limites
+        limite_inferior, limite_superior: Series indexadas pelo nome da coluna
+    """
+    colunas = limite_inferior.index
+    valores = df[colunas]
+    fora = valores.lt(limite_inferior, axis=1) | valores.gt(limite_superior, axis=1)
+    return fora.sum().astype('int64')
+
+
+def detectar_outliers_extremos(df, colunas, fator=FATOR_IQR_EXTREMO):
+    """
+    Calcula Q1/Q3, limites de fator×IQR e número de outliers de todas as
+    colunas de uma vez
+
+    Args:
+        df: DataFrame
+        colunas: colunas numéricas a verificar
+        fator: multiplicador do IQR (3 = outliers extremos)
+
+    Returns:
+        DataFrame indexado pela coluna com Q1, Q3, IQR, Limite_Inferior,
+        Limite_Superior e Outliers
+    """
+    colunas = list(colunas)
+    quartis = df[colunas].quantile([0.25, 0.75])
+    relatorio = _montar_relatorio(quartis.loc[0.25], quartis.loc[0.75], fator)
+    relatorio['Outliers'] = contar_fora_dos_limites(df, relatorio['Limite_Inferior'],
+                                                    relatorio['Limite_Superior'])
+    return relatorio
+
+
+def esbocos_por_coluna(blocos, colunas, precisao_relativa=PRECISAO_QUANTIS_PADRAO):
+    """
+    Monta um EsbocoQuantis por coluna percorrendo os blocos
+
+    Args:
+        blocos: iterável de DataFrames
+        colunas: colunas numéricas
+        precisao_relativa: α dos esboços
+
+    Returns:
+        dict coluna -> EsbocoQuantis (mesclável com mesclar_esbocos)
+    """
+    esbocos = {col: EsbocoQuantis(precisao_relativa) for col in colunas}
+    for bloco in blocos:
+        for col in colunas:
+            esbocos[col].adicionar(bloco[col].to_numpy())
+    return esbocos
+
+
+def mesclar_esbocos(*grupos):
+    """
+    Mescla dicts coluna -> EsbocoQuantis vindos de blocos ou processos
+    diferentes
+    """
+    resultado = {}
+    for grupo in grupos:
+        for col, esboco in grupo.items():
+            if col in resultado:
+                resultado[col].mesclar(esboco)
+            else:
+                resultado[col] = esboco
+    return resultado
+
+
+def limites_por_quartis(q1, q3, fator=FATOR_IQR_EXTREMO):
+    """
+    Relatório de quartis e limites a partir de Q1/Q3 já calculados (Series
+    indexadas pela coluna; sem coluna Outliers)
+    """
+    return _montar_relatorio(q1, q3, fator)
+
+
+def limites_por_esbocos(esbocos, fator=FATOR_IQR_EXTREMO):
+    """
+    Relatório de quartis e limites a partir dos esboços (sem coluna Outliers)
+    """
+    colunas = list(esbocos)
+    q1 = pd.Series([esbocos[c].quantil(0.25) for c in colunas], index=colunas)
+    q3 = pd.Series([esbocos[c].quantil(0.75) for c in colunas], index=colunas)
+    return _montar_relatorio(q1, q3, fator)
+
+
+def detectar_outliers_em_blocos(fabrica_blocos, colunas, fator=FATOR_IQR_EXTREMO,
+                                precisao_relativa=PRECISAO_QUANTIS_PADRAO):
+    """
+    Mesmo relatório de detectar_outliers_extremos, em duas passadas de
+    memória limitada
+
+    Args:
+        fabrica_blocos: função sem argumentos que devolve um novo iterável de
+            blocos (chamada uma vez por passada)
+        colunas: colunas numéricas
+        fator: multiplicador do IQR
+        precisao_relativa: α dos esboços de quantis
+
+    Returns:
+        DataFrame no mesmo formato de detectar_outliers_extremos
+    """
+    colunas = list(colunas)
+    relatorio = limites_por_esbocos(esbocos_por_coluna(fabrica_blocos(), colunas, precisao_relativa), fator)
+
+    contagem = pd.Series(0, index=colunas, dtype='int64')
+    for bloco in fabrica_blocos():
+        contagem += contar_fora_dos_limites(bloco, relatorio['Limite_Inferior'], relatorio['Limite_Superior'])
+
+    relatorio['Outliers'] = contagem
+    return relatorio
@@ -0,0 +1,338 @@
+# ============================================================================
+# EXECUTOR DO PIPELINE COM CACHE POR CONTEÚDO
+# ============================================================================
+#
+# Executa as etapas em ordem e pula as que não mudaram. A impressão digital
+# de cada etapa combina:
+#   • o conteúdo dos arquivos de entrada
+#   • o código do script e dos módulos locais que ele importa
+#   • os parâmetros (argumentos e as variáveis de ambiente CHURN_* que a
+#     etapa declara em 'ambiente')
+# Se a impressão digital for igual à da última execução bem-sucedida e as
+# saídas ainda existirem, a etapa é pulada e os artefatos são reaproveitados.
+#
+# Uso (a partir da raiz do projeto):
+#   python notebook/pipeline.py                 # executa o que mudou
+#   python notebook/pipeline.py --forcar        # executa tudo
+#   python notebook/pipeline.py --etapas limpeza_dados eda_exploratoria
+# ============================================================================
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import caminho_etapa
+from modelo_estrela import PASTA_MODELO, ARQUIVO_MANIFESTO, EXTENSAO_TABELA, DIMENSOES_MODELO, data_snapshot
+from preparacao_ambiente import criar_estrutura_pastas, print_section, salvar_info_execucao
+
+PASTA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+
+# Arquivo com as impressões digitais da última execução bem-sucedida
+ARQUIVO_CACHE = 'outputs/cache_pipeline.json'
+
+# Tamanho do bloco de leitura ao calcular hashes de arquivos
+BLOCO_HASH = 1024 * 1024
+
+# ============================================================================
+# DEFINIÇÃO DAS ETAPAS
+# ============================================================================
+#
+# 'ambiente' lista as variáveis CHURN_* que mudam as saídas da etapa (lidas
+# pelo script ou pelos módulos que ele usa). Variáveis que só afetam a
+# execução (CHURN_PERFILAR, CHURN_RASTREAR_ALOCACOES,
+# CHURN_PROCESSOS_GRAFICOS) ficam fora da impressão digital;
+# CHURN_LIMITE_MEMORIA_MB também, exceto na inspeção, que passa ao modo
+# streaming com ele. 'padroes' dá o
+# valor de uma variável não definida quando ele muda sozinho (ex: a data do
+# snapshot é o dia da execução); o valor resolvido entra na impressão
+# digital e é repassado ao script.
+
+ETAPAS = [
+    {
+        'nome': 'carregamento_inspecao',
+        'script': 'carregamento_inspecao.py',
+        'entradas': ['data/raw/telecom_churn_raw.csv'],
+        'ambiente': ['CHURN_STREAMING', 'CHURN_TAMANHO_BLOCO', 'CHURN_LIMITE_MEMORIA_MB',
+                     'CHURN_ESBOCOS', 'CHURN_EXPORTAR_CSV', 'CHURN_PERFIL_GRAFICOS'],
+        'saidas': [
+            caminho_etapa('data/processed/02_dados_inspecionados'),
+            'outputs/metrics/01_resumo_inspecao.json',
+            'outputs/plots/01_distribuicao_churn.png'
+        ]
+    },
+    {
+        'nome': 'limpeza_dados',
+        'script': 'limpeza_dados.py',
+        'entradas': [caminho_etapa('data/processed/02_dados_inspecionados')],
+        'ambiente': ['CHURN_EXPORTAR_CSV'],
+        'saidas': [
+            caminho_etapa('data/processed/03_dados_limpos'),
+            'outputs/metrics/02_relatorio_limpeza.json'
+        ]
+    },
+    {
+        'nome': 'eda_exploratoria',
+        'script': 'eda_exploratoria.py',
+        'entradas': [caminho_etapa('data/processed/03_dados_limpos')],
+        'ambiente': ['CHURN_ESBOCOS', 'CHURN_EXPORTAR_CSV', 'CHURN_PERFIL_GRAFICOS'],
+        'saidas': [
+            'outputs/metrics/03_estatisticas_numericas.csv',
+            'outputs/metrics/04_correlacoes_churn.csv',
+            'outputs/metrics/05_comparacao_churners.csv',
+            'outputs/metrics/06_churn_por_estado.csv',
+            'outputs/metrics/07_metricas_gerais.json',
+            'outputs/metrics/08_churn_international_plan.csv',
+            'outputs/metrics/09_churn_voicemail_plan.csv',
+            'outputs/metrics/10_churn_customer_service.csv',
+            'outputs/metrics/11_churn_segmento_risco.csv',
+            'outputs/plots/02_distribuicoes_univariadas.png',
+            'outputs/plots/03_churn_international_plan.png',
+            'outputs/plots/04_churn_voicemail_plan.png',
+            'outputs/plots/05_churn_customer_service.png',
+            'outputs/plots/06_heatmap_correlacao.png',
+            'outputs/plots/07_boxplots_comparacao.png',
+            'outputs/plots/08_churn_segmento_risco.png'
+        ]
+    },
+    {
+        'nome': 'metricas_powerbi',
+        'script': 'metricas_powerbi.py',
+        'entradas': [caminho_etapa('data/processed/03_dados_limpos')],
+        'ambiente': ['CHURN_EXPORTAR_CSV'],
+        'saidas': [
+            'outputs/metrics/12_kpis_dashboard.json',
+            'outputs/metrics/13_receita_por_status.csv',
+            'outputs/metrics/14_churn_por_faixa_receita.csv',
+            'outputs/metrics/15_churn_por_tempo_conta.csv',
+            'outputs/metrics/16_churn_por_area.csv',
+            'outputs/metrics/17_perfil_churners.json',
+            'outputs/metrics/18_analise_combo_planos.csv',
+            caminho_etapa('data/processed/04_dados_com_features'),
+            'data/processed/estado_kpis.json'
+        ]
+    },
+    {
+        'nome': 'exportacao_powerbi',
+        'script': 'exportacao_powerbi.py',
+        'entradas': [caminho_etapa('data/processed/04_dados_com_features')],
+        'ambiente': ['CHURN_DATA_SNAPSHOT', 'CHURN_PARTICAO_DASHBOARD'],
+        'padroes': {'CHURN_DATA_SNAPSHOT': data_snapshot},
+        'saidas': [os.path.join(PASTA_MODELO, ARQUIVO_MANIFESTO)] +
+                  [os.path.join(PASTA_MODELO, f'{nome}{EXTENSAO_TABELA}') for nome in DIMENSOES_MODELO]
+    }
+]
+
+# ============================================================================
+# IMPRESSÕES DIGITAIS
+# ============================================================================
+
+
+def hash_arquivo(caminho, cache_arquivos):
+    """
+    Calcula o SHA-256 do conteúdo de um arquivo, lendo em blocos
+
+    O resultado é guardado por (tamanho, mtime) para não reler arquivos
+    grandes que não mudaram desde a última execução.
+
+    Args:
+        caminho: arquivo a ler
+        cache_arquivos: dict caminho -> {'tamanho', 'mtime_ns', 'sha256'}
+    """
+    info = os.stat(caminho)
+    anterior = cache_arquivos.get(caminho)
+    if anterior and anterior['tamanho'] == info.st_size and anterior['mtime_ns'] == info.st_mtime_ns:
+        return anterior['sha256']
+
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(BLOCO_HASH), b''):
+            h.update(bloco)
+
+    cache_arquivos[caminho] = {
+        'tamanho': info.st_size,
+        'mtime_ns': info.st_mtime_ns,
+        'sha256': h.hexdigest()
+    }
+    return h.hexdigest()
+
+
+def modulos_locais(script):
+    """
+    Retorna o script e todos os módulos locais (da pasta notebook) que ele
+    importa, direta ou indiretamente, em ordem estável
+    """
+    visitados = []
+    pendentes = [script]
+
+    while pendentes:
+        arquivo = pendentes.pop()
+        if arquivo in visitados:
+            continue
+        visitados.append(arquivo)
+
+        with open(os.path.join(PASTA_SCRIPTS, arquivo), encoding='utf-8') as f:
+            arvore = ast.parse(f.read())
+
+        for no in ast.walk(arvore):
+            if isinstance(no, ast.Import):
+                nomes = [alias.name for alias in no.names]
+            elif isinstance(no, ast.ImportFrom) and no.module:
+                nomes = [no.module]
+            else:
+                continue
+            for nome in nomes:
+                candidato = nome.split('.')[0] + '.py'
+                if os.path.exists(os.path.join(PASTA_SCRIPTS, candidato)):
+                    pendentes.append(candidato)
+
+    return sorted(visitados)
+
+
+def ambiente_etapa(etapa):
+    """
+    Variáveis de ambiente declaradas pela etapa, com os padrões resolvidos
+    para as que não estão definidas
+    """
+    padroes = etapa.get('padroes', {})
+    variaveis = {}
+    for k in sorted(etapa.get('ambiente', [])):
+        if k in os.environ:
+            variaveis[k] = os.environ[k]
+        elif k in padroes:
+            variaveis[k] = padroes[k]()
+    return variaveis
+
+
+def parametros_execucao(etapa, args_etapa, ambiente=None):
+    """
+    Parâmetros que influenciam o resultado: argumentos repassados ao script
+    e as variáveis de ambiente declaradas pela etapa
+    """
+    ambiente = ambiente_etapa(etapa) if ambiente is None else ambiente
+    return {'argumentos': list(args_etapa), 'ambiente': ambiente}
+
+
+def impressao_digital(etapa, args_etapa, cache_arquivos, ambiente=None):
+    """
+    Calcula a impressão digital de uma etapa (entradas + código + parâmetros)
+    """
+    h = hashlib.sha256()
+
+    for entrada in etapa['entradas']:
+        h.update(entrada.encode())
+        h.update(hash_arquivo(entrada, cache_arquivos).encode() if os.path.exists(entrada) else b'ausente')
+
+    for modulo in modulos_locais(etapa['script']):
+        h.update(modulo.encode())
+        h.update(hash_arquivo(os.path.join(PASTA_SCRIPTS, modulo), cache_arquivos).encode())
+
+    h.update(json.dumps(parametros_execucao(etapa, args_etapa, ambiente), sort_keys=True).encode())
+    return h.hexdigest()
+
+# ============================================================================
+# ESTADO DO CACHE
+# ============================================================================
+
+
+def carregar_cache():
+    """
+    Lê o estado da última execução (ou um estado vazio)
+    """
+    if os.path.exists(ARQUIVO_CACHE):
+        with open(ARQUIVO_CACHE, encoding='utf-8') as f:
+            return json.load(f)
+    return {'etapas': {}, 'arquivos': {}}
+
+
+def salvar_cache(cache):
+    """
+    Grava o estado de forma atômica (arquivo temporário + rename)
+    """
+    os.makedirs(os.path.dirname(ARQUIVO_CACHE), exist_ok=True)
+    temporario = ARQUIVO_CACHE + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=4)
+    os.replace(temporario, ARQUIVO_CACHE)
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+
+def executar_pipeline(nomes_etapas=None, forcar=False, args_etapa=()):
+    """
+    Executa as etapas em ordem, pulando as que têm impressão digital igual à
+    da última execução bem-sucedida
+
+    Args:
+        nomes_etapas: etapas a considerar (None = todas)
+        forcar: se True, ignora o cache e executa tudo
+        args_etapa: argumentos repassados a cada script (ex: --streaming)
+
+    Returns:
+        dict nome da etapa -> 'executada' | 'pulada'
+    """
+    cache = carregar_cache()
+    resultado = {}
+
+    for etapa in ETAPAS:
+        nome = etapa['nome']
+        if nomes_etapas and nome not in nomes_etapas:
+            continue
+
+        # Resolvido uma vez: o script recebe o mesmo valor que entrou no hash
+        ambiente = ambiente_etapa(etapa)
+        digital = impressao_digital(etapa, args_etapa, cache['arquivos'], ambiente)
+        anterior = cache['etapas'].get(nome, {})
+        saidas_ok = all(os.path.exists(s) for s in etapa['saidas'])
+
+        if not forcar and anterior.get('impressao_digital') == digital and saidas_ok:
+            print(f"⏭️  {nome}: sem mudanças, reaproveitando artefatos")
+            resultado[nome] = 'pulada'
+            continue
+
+        print(f"▶️  {nome}: executando {etapa['script']}")
+        comando = [sys.executable, os.path.join(PASTA_SCRIPTS, etapa['script'])] + list(args_etapa)
+        processo = subprocess.run(comando, env={**os.environ, **ambiente})
+        if processo.returncode != 0:
+            salvar_cache(cache)
+            raise RuntimeError(f"Etapa {nome} falhou (código {processo.returncode})")
+
+        cache['etapas'][nome] = {
+            'impressao_digital': digital,
+            'concluida_em': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        salvar_cache(cache)
+        resultado[nome] = 'executada'
+
+    return resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Executa o pipeline de churn com cache por etapa')
+    parser.add_argument('--etapas', nargs='+', choices=[e['nome'] for e in ETAPAS],
+                        help='Etapas a considerar (padrão: todas)')
+    parser.add_argument('--forcar', action='store_true', help='Ignora o cache e executa tudo')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Repassa --streaming para as etapas que o suportam')
+    args = parser.parse_args()
+
+    criar_estrutura_pastas(verbose=False)
+    print_section("EXECUÇÃO DO PIPELINE")
+
+    resultado = executar_pipeline(args.etapas, args.forcar,
+                                  ('--streaming',) if args.streaming else ())
+
+    executadas = [n for n, r in resultado.items() if r == 'executada']
+    puladas = [n for n, r in resultado.items() if r == 'pulada']
+    print(f"\n✅ Executadas: {len(executadas)} | ⏭️  Puladas: {len(puladas)}")
+
+    salvar_info_execucao("pipeline.py",
+                         f"Pipeline concluído: {len(executadas)} etapas executadas, {len(puladas)} puladas")
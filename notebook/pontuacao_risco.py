@@ -0,0 +1,157 @@
+# ============================================================================
+# PONTUAÇÃO DE RISCO DE CHURN (BAIXO / MÉDIO / ALTO) EM LOTE
+# ============================================================================
+#
+# Regras da segmentação (seção 6.1 da EDA):
+#   Médio: International plan = Yes OU Customer service calls >= 3
+#   Alto:  International plan = Yes E Customer service calls >= 4
+#   Baixo: demais clientes
+#
+# Como Alto implica Médio, o código sai de uma única expressão vetorizada:
+#   código = (médio) + (alto)  →  0 = Baixo, 1 = Médio, 2 = Alto
+# em int8, sem colunas de texto intermediárias. O rótulo final é uma
+# categoria ordenada (TIPO_RISCO) montada direto dos códigos.
+#
+# Uso (CRM, bases grandes):
+#   python notebook/pontuacao_risco.py clientes.parquet --saida data/scoring/risco \
+#       --colunas State "Area code"
+# ============================================================================
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import EscritorBlocos, ler_em_blocos
+from esquema import ORDEM_RISCO, TIPO_RISCO
+
+# Colunas usadas pelas regras
+COLUNAS_RISCO = ['International plan', 'Customer service calls']
+
+# Limiares de chamadas ao suporte
+LIMITE_CHAMADAS_MEDIO = 3
+LIMITE_CHAMADAS_ALTO = 4
+
+TAMANHO_BLOCO_PADRAO = 500_000
+
+
+def _mascara_sim(serie):
+    """
+    Máscara de valores 'Yes' sem criar texto (categóricas comparam códigos)
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories
+        if 'Yes' not in categorias:
+            return np.zeros(len(serie), dtype=bool)
+        return serie.cat.codes.to_numpy() == categorias.get_loc('Yes')
+    return serie.to_numpy() == 'Yes'
+
+
+def codigos_risco(plano_internacional, chamadas_suporte):
+    """
+    Códigos de risco (int8: 0 = Baixo, 1 = Médio, 2 = Alto)
+
+    Args:
+        plano_internacional: Series com 'Yes'/'No' (texto ou category)
+        chamadas_suporte: Series ou array numérico (nulos contam como 0)
+    """
+    intl = _mascara_sim(pd.Series(plano_internacional))
+    chamadas = np.asarray(chamadas_suporte, dtype=np.float64)
+    medio = intl | (chamadas >= LIMITE_CHAMADAS_MEDIO)
+    alto = intl & (chamadas >= LIMITE_CHAMADAS_ALTO)
+    return medio.astype(np.int8) + alto.astype(np.int8)
+
+
+def codigo_risco_cliente(plano_internacional, chamadas_suporte):
+    """
+    Código de risco de um único cliente (mesmas regras, sem numpy/pandas,
+    para consultas de baixa latência)
+    """
+    intl = plano_internacional == 'Yes'
+    chamadas = chamadas_suporte or 0
+    return int(intl or chamadas >= LIMITE_CHAMADAS_MEDIO) + int(intl and chamadas >= LIMITE_CHAMADAS_ALTO)
+
+
+def pontuar(df):
+    """
+    Segmento de risco de cada linha de um DataFrame
+
+    Returns:
+        Series categórica ordenada (Baixo < Médio < Alto) com o índice do df
+    """
+    codigos = codigos_risco(df['International plan'], df['Customer service calls'])
+    return pd.Series(pd.Categorical.from_codes(codigos, dtype=TIPO_RISCO),
+                     index=df.index, name='Risco_Churn')
+
+
+def pontuar_blocos(blocos):
+    """
+    Pontua um iterável de blocos, devolvendo cada bloco com a coluna
+    Risco_Churn
+    """
+    for bloco in blocos:
+        bloco = bloco.copy(deep=False)
+        bloco['Risco_Churn'] = pontuar(bloco)
+        yield bloco
+
+
+def pontuar_arquivo(caminho, caminho_saida_base, colunas=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Pontua um arquivo (.parquet/.csv) em blocos e grava o resultado em
+    sequência, sem carregar a base na memória
+
+    Args:
+        caminho: arquivo de entrada
+        caminho_saida_base: destino sem extensão
+        colunas: colunas de entrada a repetir na saída (ex: identificadores);
+            None = todas
+        tamanho_bloco: linhas por bloco
+
+    Returns:
+        dict com 'linhas', 'segundos', 'linhas_por_segundo', 'clientes_por_risco'
+        e 'arquivo'
+    """
+    leitura = None if colunas is None else list(dict.fromkeys(list(colunas) + COLUNAS_RISCO))
+    contagens = np.zeros(len(ORDEM_RISCO), dtype=np.int64)
+
+    inicio = time.perf_counter()
+    with EscritorBlocos(caminho_saida_base) as escritor:
+        for bloco in ler_em_blocos(caminho, tamanho_bloco, colunas=leitura):
+            codigos = codigos_risco(bloco['International plan'], bloco['Customer service calls'])
+            contagens += np.bincount(codigos, minlength=len(ORDEM_RISCO))
+            saida = bloco if colunas is None else bloco[list(colunas)]
+            saida = saida.assign(Risco_Churn=pd.Categorical.from_codes(codigos, dtype=TIPO_RISCO))
+            escritor.escrever(saida)
+    segundos = time.perf_counter() - inicio
+
+    return {
+        'linhas': int(escritor.linhas),
+        'segundos': segundos,
+        'linhas_por_segundo': escritor.linhas / segundos if segundos > 0 else float('inf'),
+        'clientes_por_risco': dict(zip(ORDEM_RISCO, contagens.tolist())),
+        'arquivo': escritor.caminho
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pontuação de risco de churn em lote')
+    parser.add_argument('entrada', help='Arquivo .parquet ou .csv com os clientes')
+    parser.add_argument('--saida', required=True, help='Destino sem extensão')
+    parser.add_argument('--colunas', nargs='*', default=None,
+                        help='Colunas de entrada a manter na saída (padrão: todas)')
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_PADRAO)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.saida) or '.', exist_ok=True)
+    resultado = pontuar_arquivo(args.entrada, args.saida, args.colunas, args.tamanho_bloco)
+
+    print(f"✅ {resultado['linhas']:,} clientes pontuados em {resultado['segundos']:.2f}s "
+          f"({resultado['linhas_por_segundo']:,.0f} linhas/s)")
+    for risco, n in resultado['clientes_por_risco'].items():
+        print(f"   {risco}: {n:,}")
+    print(f"✅ Resultado: {resultado['arquivo']}")
@@ -2,13 +2,9 @@
 # IMPORTAÇÕES
 # ============================================================================
 
-# Manipulação de dados
-import pandas as pd
-import numpy as np
-
-# Visualizações
-import matplotlib.pyplot as plt
-import seaborn as sns
+# Apenas bibliotecas leves são importadas aqui: importar este módulo não
+# carrega pandas/matplotlib, não cria pastas e não grava log. As etapas
+# chamam preparar_etapa() e carregar_graficos() explicitamente.
 
 # Sistema operacional
 import os
@@ -17,24 +13,26 @@ import warnings
 # Data e hora
 from datetime import datetime
 
+# Medição de memória e métricas por etapa (sem dependências pesadas)
+from memoria import iniciar_medicao_memoria
+from instrumentacao import iniciar_etapa, registrar_evento
+
+__all__ = [
+    'COLORS',
+    'PASTAS_PROJETO',
+    'criar_estrutura_pastas',
+    'configurar_pandas',
+    'preparar_etapa',
+    'carregar_graficos',
+    'print_section',
+    'print_subsection',
+    'salvar_info_execucao'
+]
+
 # ============================================================================
 # CONFIGURAÇÕES GLOBAIS
 # ============================================================================
 
-# Ignorar warnings desnecessários
-warnings.filterwarnings('ignore')
-
-# Configurações do Pandas
-pd.set_option('display.max_columns', None)  # Mostrar todas as colunas
-pd.set_option('display.max_rows', 100)  # Mostrar até 100 linhas
-pd.set_option('display.float_format', '{:.2f}'.format)  # 2 casas decimais
-pd.set_option('display.width', 1000)  # Largura da exibição
-
-# Configurações de visualização
-sns.set_style("darkgrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-sns.set_palette("husl")
-
 # Configuração de cores personalizadas
 COLORS = {
     'primary': '#1f77b4',
@@ -47,33 +45,88 @@ COLORS = {
     'churn_no': '#27ae60'
 }
 
+# Bibliotecas gráficas já carregadas (preenchido por carregar_graficos)
+_GRAFICOS = {}
+
+
+def configurar_pandas():
+    """
+    Aplica as opções de exibição do pandas usadas nos relatórios
+    """
+    import pandas as pd
+
+    pd.set_option('display.max_columns', None)  # Mostrar todas as colunas
+    pd.set_option('display.max_rows', 100)  # Mostrar até 100 linhas
+    pd.set_option('display.float_format', '{:.2f}'.format)  # 2 casas decimais
+    pd.set_option('display.width', 1000)  # Largura da exibição
+
+
+def carregar_graficos():
+    """
+    Carrega matplotlib (backend não interativo) e seaborn na primeira chamada
+    e aplica os estilos do projeto
+
+    Returns:
+        Tupla (plt, sns)
+    """
+    if not _GRAFICOS:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        # Configurações de visualização
+        sns.set_style("darkgrid")
+        plt.rcParams['figure.figsize'] = (12, 6)
+        sns.set_palette("husl")
+
+        _GRAFICOS['plt'] = plt
+        _GRAFICOS['sns'] = sns
+
+    return _GRAFICOS['plt'], _GRAFICOS['sns']
+
 # ============================================================================
 # ESTRUTURA DE PASTAS
 # ============================================================================
 
-def criar_estrutura_pastas():
+PASTAS_PROJETO = [
+    'data',
+    'data/raw',
+    'data/processed',
+    'data/dashboard',
+    'outputs',
+    'outputs/plots',
+    'outputs/metrics'
+]
+
+
+def criar_estrutura_pastas(verbose=True):
     """
     Cria a estrutura de pastas do projeto se não existir
 
+    Args:
+        verbose: se True, imprime cada pasta criada/verificada
+
      Returns:
         None
     """
-    pastas = [
-        'data',
-        'data/raw',
-        'data/processed',
-        'data/dashboard',
-        'outputs',
-        'outputs/plots',
-        'outputs/metrics'
-    ]
-
-    for pasta in pastas:
+    for pasta in PASTAS_PROJETO:
         os.makedirs(pasta, exist_ok=True)
-        print(f"✅ Pasta criada/verificada: {pasta}")
+        if verbose:
+            print(f"✅ Pasta criada/verificada: {pasta}")
+
 
-# Executar criação de pastas
-criar_estrutura_pastas()
+def preparar_etapa():
+    """
+    Preparação mínima de uma etapa do pipeline: pastas de saída (sem
+    mensagens), opções do pandas e filtro de warnings
+    """
+    # Ignorar warnings desnecessários
+    warnings.filterwarnings('ignore')
+    criar_estrutura_pastas(verbose=False)
+    configurar_pandas()
+    iniciar_medicao_memoria()
+    iniciar_etapa()
 
 # ============================================================================
 # FUNÇÕES AUXILIARES
@@ -97,27 +150,34 @@ def print_subsection(title):
 
 def salvar_info_execucao(arquivo, mensagem):
     """
-    Salva informações sobre a execução em um arquivo de log
+    Registra um evento da execução em outputs/metricas_execucao.jsonl
+    (mesmo arquivo das métricas de tempo e memória das etapas)
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open('outputs/log_execucao.txt', 'a', encoding='utf-8') as f:
-        f.write(f"[{timestamp}] {arquivo}: {mensagem}\n")
+    registrar_evento(mensagem, etapa=arquivo)
 
 # ============================================================================
 # INFORMAÇÕES DO PROJETO
 # ============================================================================
 
-print_section("AMBIENTE PREPARADO COM SUCESSO!")
+if __name__ == '__main__':
+    import numpy as np
+    import pandas as pd
+
+    preparar_etapa()
+    criar_estrutura_pastas()
+    carregar_graficos()
+
+    print_section("AMBIENTE PREPARADO COM SUCESSO!")
 
-print("📦 Bibliotecas carregadas:")
-print("   ✓ pandas, numpy")
-print("   ✓ matplotlib, seaborn")
-print("   ✓ os, warnings, datetime")
-print(f"   ✓ pandas {pd.__version__}, numpy {np.__version__}")
+    print("📦 Bibliotecas carregadas:")
+    print("   ✓ pandas, numpy")
+    print("   ✓ matplotlib, seaborn")
+    print("   ✓ os, warnings, datetime")
+    print(f"   ✓ pandas {pd.__version__}, numpy {np.__version__}")
 
-print("\n📁 Estrutura de pastas criada/verificada")
+    print("\n📁 Estrutura de pastas criada/verificada")
 
-print("\n🚀 Pronto para começar a análise!")
+    print("\n🚀 Pronto para começar a análise!")
 
-# Registrar no log
-salvar_info_execucao("preparacao_ambiente.py", "Ambiente configurado com sucesso")
\ No newline at end of file
+    # Registrar no log
+    salvar_info_execucao("preparacao_ambiente.py", "Ambiente configurado com sucesso")
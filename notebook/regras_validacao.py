@@ -0,0 +1,232 @@
+# ============================================================================
+# REGRAS DE VALIDAÇÃO DECLARATIVAS (UMA PASSADA VETORIZADA)
+# ============================================================================
+#
+# As regras da limpeza são dados, não código: cada regra é um dict com
+# 'nome', 'tipo', 'severidade' e os parâmetros do tipo:
+#
+#   intervalo:  coluna, minimo, maximo (None = sem limite)
+#       viola se o valor estiver fora de [minimo, maximo]
+#   tarifa:     minutos, cobranca, taxa_min, taxa_max
+#       viola se a cobrança estiver fora de
+#       [minutos·taxa_min, minutos·taxa_max] ± meio centavo (arredondamento)
+#   implicacao: se = (coluna, operador, valor), entao = (coluna, operador, valor)
+#       viola se a condição 'se' vale e a 'entao' não
+#
+# Severidade 'erro' tira a linha da máscara de linhas válidas; 'alerta'
+# só conta. Nulos não violam nenhuma regra.
+#
+# Todas as regras são avaliadas juntas, fatia a fatia (TAMANHO_FATIA
+# linhas): a memória temporária é de poucas máscaras booleanas da fatia,
+# e bases grandes podem ser validadas bloco a bloco (ler_em_blocos).
+#
+# Uso (bases grandes):
+#   python notebook/regras_validacao.py clientes.parquet --tamanho-bloco 500000
+# ============================================================================
+
+import argparse
+import operator
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from armazenamento import ler_em_blocos
+from esquema import COLUNAS_POSITIVAS, PERIODOS_TARIFA
+
+# Linhas avaliadas de cada vez
+TAMANHO_FATIA = 1_000_000
+
+TAMANHO_BLOCO_PADRAO = 500_000
+
+# Cobranças são arredondadas ao centavo: meio centavo de folga (mais uma
+# margem de ponto flutuante)
+FOLGA_ARREDONDAMENTO = 0.0051
+
+OPERADORES = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+# Tarifas nominais por minuto (US$) e tolerância das faixas
+TARIFAS_NOMINAIS = {'day': 0.17, 'eve': 0.085, 'night': 0.045, 'intl': 0.27}
+TOLERANCIA_TARIFA = 0.05
+
+REGRAS_LIMPEZA = (
+    [{'nome': f'{col} >= 0', 'tipo': 'intervalo', 'severidade': 'erro',
+      'coluna': col, 'minimo': 0, 'maximo': None}
+     for col in COLUNAS_POSITIVAS]
+    + [{'nome': 'Account length em [1, 300]', 'tipo': 'intervalo', 'severidade': 'alerta',
+        'coluna': 'Account length', 'minimo': 1, 'maximo': 300},
+       {'nome': 'Customer service calls <= 10', 'tipo': 'intervalo', 'severidade': 'alerta',
+        'coluna': 'Customer service calls', 'minimo': None, 'maximo': 10}]
+    + [{'nome': f'Tarifa {periodo}', 'tipo': 'tarifa', 'severidade': 'alerta',
+        'minutos': minutos, 'cobranca': cobranca,
+        'taxa_min': TARIFAS_NOMINAIS[periodo] * (1 - TOLERANCIA_TARIFA),
+        'taxa_max': TARIFAS_NOMINAIS[periodo] * (1 + TOLERANCIA_TARIFA)}
+       for periodo, (minutos, cobranca) in PERIODOS_TARIFA.items()]
+    + [{'nome': 'Mensagens de voz exigem Voice mail plan', 'tipo': 'implicacao', 'severidade': 'alerta',
+        'se': ('Number vmail messages', '>', 0), 'entao': ('Voice mail plan', '==', 'Yes')},
+       {'nome': 'Minutos de dia exigem chamadas de dia', 'tipo': 'implicacao', 'severidade': 'alerta',
+        'se': ('Total day minutes', '>', 0), 'entao': ('Total day calls', '>', 0)}]
+)
+
+
+def colunas_da_regra(regra):
+    """
+    Colunas lidas por uma regra
+    """
+    if regra['tipo'] == 'intervalo':
+        return [regra['coluna']]
+    if regra['tipo'] == 'tarifa':
+        return [regra['minutos'], regra['cobranca']]
+    if regra['tipo'] == 'implicacao':
+        return [regra['se'][0], regra['entao'][0]]
+    raise ValueError(f"Tipo de regra desconhecido: {regra['tipo']}")
+
+
+def _condicao(fatia, coluna, simbolo, valor):
+    # Nulos (e valores não comparáveis) resultam em False
+    return OPERADORES[simbolo](fatia[coluna], valor).to_numpy(dtype=bool, na_value=False)
+
+
+def _violacoes(fatia, regra):
+    """
+    Máscara booleana das linhas da fatia que violam a regra
+    """
+    tipo = regra['tipo']
+    if tipo == 'intervalo':
+        valores = fatia[regra['coluna']].to_numpy(dtype=np.float64, na_value=np.nan)
+        viola = np.zeros(len(valores), dtype=bool)
+        if regra['minimo'] is not None:
+            viola |= valores < regra['minimo']
+        if regra['maximo'] is not None:
+            viola |= valores > regra['maximo']
+        return viola
+    if tipo == 'tarifa':
+        minutos = fatia[regra['minutos']].to_numpy(dtype=np.float64, na_value=np.nan)
+        cobranca = fatia[regra['cobranca']].to_numpy(dtype=np.float64, na_value=np.nan)
+        return ((cobranca < minutos * regra['taxa_min'] - FOLGA_ARREDONDAMENTO)
+                | (cobranca > minutos * regra['taxa_max'] + FOLGA_ARREDONDAMENTO))
+    if tipo == 'implicacao':
+        return _condicao(fatia, *regra['se']) & ~_condicao(fatia, *regra['entao'])
+    raise ValueError(f"Tipo de regra desconhecido: {tipo}")
+
+
+class ValidadorRegras:
+    """
+    Avalia um conjunto de regras bloco a bloco, acumulando as violações
+
+    Regras que leem colunas ausentes do primeiro bloco são ignoradas (ficam
+    em self.ignoradas).
+
+    Args:
+        regras: lista de regras (ver cabeçalho do módulo)
+    """
+
+    def __init__(self, regras=REGRAS_LIMPEZA):
+        self.regras = list(regras)
+        self.ignoradas = []
+        self.violacoes = np.zeros(len(self.regras), dtype=np.int64)
+        self.linhas = 0
+        self.linhas_invalidas = 0
+        self._preparado = False
+
+    def _preparar(self, colunas):
+        presentes = set(colunas)
+        ativas = [r for r in self.regras if set(colunas_da_regra(r)) <= presentes]
+        self.ignoradas = [r['nome'] for r in self.regras if r not in ativas]
+        self.regras = ativas
+        self.violacoes = np.zeros(len(ativas), dtype=np.int64)
+        self._preparado = True
+
+    def adicionar(self, bloco):
+        """
+        Avalia todas as regras num bloco
+
+        Returns:
+            array booleano com True nas linhas que não violam nenhuma regra
+            de severidade 'erro'
+        """
+        if not self._preparado:
+            self._preparar(bloco.columns)
+
+        validas = np.ones(len(bloco), dtype=bool)
+        for inicio in range(0, len(bloco), TAMANHO_FATIA):
+            fatia = bloco.iloc[inicio:inicio + TAMANHO_FATIA]
+            validas_fatia = validas[inicio:inicio + TAMANHO_FATIA]
+            for i, regra in enumerate(self.regras):
+                viola = _violacoes(fatia, regra)
+                self.violacoes[i] += np.count_nonzero(viola)
+                if regra['severidade'] == 'erro':
+                    validas_fatia &= ~viola
+
+        self.linhas += len(bloco)
+        self.linhas_invalidas += int(len(bloco) - np.count_nonzero(validas))
+        return validas
+
+    def mesclar(self, outro):
+        """
+        Mescla as contagens de outro validador (mesmas regras ativas, ex: de
+        outro processo) neste, no lugar
+        """
+        if [r['nome'] for r in outro.regras] != [r['nome'] for r in self.regras]:
+            raise ValueError("Validadores com regras diferentes não podem ser mesclados")
+        self.violacoes += outro.violacoes
+        self.linhas += outro.linhas
+        self.linhas_invalidas += outro.linhas_invalidas
+        return self
+
+    def relatorio(self):
+        """
+        DataFrame indexado pelo nome da regra com Tipo, Severidade e Violacoes
+        """
+        return pd.DataFrame({
+            'Tipo': [r['tipo'] for r in self.regras],
+            'Severidade': [r['severidade'] for r in self.regras],
+            'Violacoes': self.violacoes
+        }, index=pd.Index([r['nome'] for r in self.regras], name='Regra'))
+
+
+def avaliar_regras(df, regras=REGRAS_LIMPEZA):
+    """
+    Avalia as regras num DataFrame inteiro
+
+    Returns:
+        relatório por regra (ver ValidadorRegras.relatorio) e Series booleana
+        (índice do df) com as linhas válidas
+    """
+    validador = ValidadorRegras(regras)
+    validas = validador.adicionar(df)
+    return validador.relatorio(), pd.Series(validas, index=df.index, name='Valida')
+
+
+def avaliar_regras_em_blocos(blocos, regras=REGRAS_LIMPEZA):
+    """
+    Avalia as regras num iterável de blocos, em memória limitada pelo bloco
+
+    Returns:
+        relatório por regra e número de linhas inválidas
+    """
+    validador = ValidadorRegras(regras)
+    for bloco in blocos:
+        validador.adicionar(bloco)
+    return validador.relatorio(), validador.linhas_invalidas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Validação das regras de limpeza em blocos')
+    parser.add_argument('entrada', help='Arquivo .parquet ou .csv')
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_PADRAO)
+    args = parser.parse_args()
+
+    relatorio, linhas_invalidas = avaliar_regras_em_blocos(ler_em_blocos(args.entrada, args.tamanho_bloco))
+    print(relatorio.to_string())
+    print(f"\n✅ Linhas que violam regras de erro: {linhas_invalidas:,}")
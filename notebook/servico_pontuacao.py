@@ -0,0 +1,263 @@
+# ============================================================================
+# SERVIÇO LOCAL DE PONTUAÇÃO DE RISCO (HTTP)
+# ============================================================================
+#
+# Processo de longa duração que carrega uma vez as regras de segmentação
+# (pontuacao_risco.py) e as taxas de churn por segmento
+# (outputs/metrics/11_churn_segmento_risco.csv, se existir) e responde:
+#
+#   GET  /saude            → {"status": "ok"}
+#   POST /pontuar          → um cliente:
+#        {"International plan": "Yes", "Customer service calls": 4}
+#        ← {"risco": "Alto", "codigo": 2, "taxa_churn_segmento_%": 68.18}
+#   POST /pontuar/lote     → {"clientes": [{...}, {...}]}
+#        ← {"resultados": [{...}, {...}]}
+#
+# Conexões HTTP/1.1 persistentes e TCP_NODELAY (sem espera do Nagle), e a
+# consulta de um cliente não passa por pandas: a latência fica na casa de
+# poucos milissegundos.
+#
+# Uso:
+#   python notebook/servico_pontuacao.py --porta 8765
+#   python notebook/servico_pontuacao.py --teste-carga --requisicoes 20000 --clientes 4
+# ============================================================================
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from esquema import ORDEM_RISCO
+from pontuacao_risco import codigo_risco_cliente
+
+ARQUIVO_TAXAS_RISCO = 'outputs/metrics/11_churn_segmento_risco.csv'
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8765
+
+# Tamanho máximo do corpo de uma requisição (1 MB)
+LIMITE_CORPO = 1 << 20
+
+
+def carregar_taxas_risco(caminho=ARQUIVO_TAXAS_RISCO):
+    """
+    Taxa de churn (%) de cada segmento, da última execução da EDA
+    """
+    if not os.path.exists(caminho):
+        return {}
+    taxas = {}
+    with open(caminho, encoding='utf-8') as f:
+        cabecalho = f.readline().strip().split(',')
+        coluna = cabecalho.index('Taxa_Churn_%')
+        for linha in f:
+            campos = linha.strip().split(',')
+            taxas[campos[0]] = round(float(campos[coluna]), 2)
+    return taxas
+
+
+class ManipuladorPontuacao(BaseHTTPRequestHandler):
+    """
+    Manipulador HTTP do serviço (as taxas ficam em server.taxas_risco)
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, status, conteudo):
+        corpo = json.dumps(conteudo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _pontuar_cliente(self, cliente):
+        codigo = codigo_risco_cliente(cliente.get('International plan'),
+                                      cliente.get('Customer service calls'))
+        risco = ORDEM_RISCO[codigo]
+        return {'risco': risco, 'codigo': codigo,
+                'taxa_churn_segmento_%': self.server.taxas_risco.get(risco)}
+
+    def do_GET(self):
+        if self.path == '/saude':
+            self._responder(200, {'status': 'ok'})
+        else:
+            self._responder(404, {'erro': f'Rota desconhecida: {self.path}'})
+
+    def do_POST(self):
+        # Sem um Content-Length válido não dá para saber onde o corpo termina:
+        # responde 400 e fecha a conexão (rfile.read(-1) bloquearia a thread)
+        try:
+            tamanho = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            tamanho = -1
+        if tamanho < 0:
+            self._responder(400, {'erro': 'Content-Length inválido'})
+            self.close_connection = True
+            return
+        if tamanho > LIMITE_CORPO:
+            self._responder(413, {'erro': 'Corpo da requisição muito grande'})
+            self.close_connection = True
+            return
+        try:
+            dados = json.loads(self.rfile.read(tamanho) or b'{}')
+        except (ValueError, UnicodeDecodeError) as erro:
+            self._responder(400, {'erro': f'JSON inválido: {erro}'})
+            return
+
+        try:
+            if self.path == '/pontuar':
+                self._responder(200, self._pontuar_cliente(dados))
+            elif self.path == '/pontuar/lote':
+                self._responder(200, {'resultados': [self._pontuar_cliente(c) for c in dados['clientes']]})
+            else:
+                self._responder(404, {'erro': f'Rota desconhecida: {self.path}'})
+        except (KeyError, TypeError, AttributeError) as erro:
+            self._responder(400, {'erro': f'Requisição inválida: {erro!r}'})
+
+
+def criar_servidor(host=HOST_PADRAO, porta=PORTA_PADRAO, caminho_taxas=ARQUIVO_TAXAS_RISCO):
+    """
+    Cria o servidor (ainda sem atender) com as taxas de referência carregadas
+    """
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorPontuacao)
+    servidor.daemon_threads = True
+    servidor.taxas_risco = carregar_taxas_risco(caminho_taxas)
+    return servidor
+
+# ============================================================================
+# TESTE DE CARGA (LOCALHOST)
+# ============================================================================
+
+
+def _cliente_carga(host, porta, corpo, rota, n_requisicoes, latencias, erros):
+    conexao = http.client.HTTPConnection(host, porta)
+    conexao.connect()
+    conexao.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    cabecalhos = {'Content-Type': 'application/json'}
+    for _ in range(n_requisicoes):
+        inicio = time.perf_counter()
+        conexao.request('POST', rota, body=corpo, headers=cabecalhos)
+        resposta = conexao.getresponse()
+        resposta.read()
+        latencias.append(time.perf_counter() - inicio)
+        if resposta.status != 200:
+            erros.append(resposta.status)
+    conexao.close()
+
+
+def _aguardar_servico(host, porta, limite_segundos=10):
+    fim = time.monotonic() + limite_segundos
+    while time.monotonic() < fim:
+        try:
+            conexao = http.client.HTTPConnection(host, porta, timeout=1)
+            conexao.request('GET', '/saude')
+            if conexao.getresponse().status == 200:
+                conexao.close()
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Serviço não respondeu em {host}:{porta}")
+
+
+def teste_carga(host=HOST_PADRAO, porta=PORTA_PADRAO, requisicoes=10_000, clientes=4, lote=1,
+                iniciar_servico=True):
+    """
+    Dispara requisições contra o serviço em localhost e mede a latência
+
+    Args:
+        requisicoes: total de requisições (divididas entre os clientes)
+        clientes: conexões simultâneas
+        lote: clientes por requisição (1 usa /pontuar, >1 usa /pontuar/lote)
+        iniciar_servico: sobe o serviço num processo separado durante o teste
+
+    Returns:
+        dict com requisições, erros, duração, requisições/s e p50/p90/p99/máx em ms
+    """
+    processo = None
+    if iniciar_servico:
+        processo = subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                                     '--host', host, '--porta', str(porta)])
+    try:
+        _aguardar_servico(host, porta)
+
+        exemplo = {'International plan': 'Yes', 'Customer service calls': 4}
+        if lote == 1:
+            rota, corpo = '/pontuar', json.dumps(exemplo)
+        else:
+            rota, corpo = '/pontuar/lote', json.dumps({'clientes': [exemplo] * lote})
+
+        latencias, erros = [], []
+        por_cliente = max(requisicoes // clientes, 1)
+        threads = [threading.Thread(target=_cliente_carga,
+                                    args=(host, porta, corpo, rota, por_cliente, latencias, erros))
+                   for _ in range(clientes)]
+        inicio = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duracao = time.perf_counter() - inicio
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    latencias_ms = sorted(l * 1000 for l in latencias)
+    percentis = statistics.quantiles(latencias_ms, n=100, method='inclusive')
+    return {
+        'requisicoes': len(latencias_ms),
+        'erros': len(erros),
+        'duracao_s': round(duracao, 3),
+        'requisicoes_por_s': round(len(latencias_ms) / duracao, 1),
+        'p50_ms': round(percentis[49], 3),
+        'p90_ms': round(percentis[89], 3),
+        'p99_ms': round(percentis[98], 3),
+        'max_ms': round(latencias_ms[-1], 3)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serviço HTTP de pontuação de risco de churn')
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--taxas', default=ARQUIVO_TAXAS_RISCO,
+                        help='CSV de churn por segmento de risco (referência)')
+    parser.add_argument('--teste-carga', action='store_true',
+                        help='Executa o teste de carga em vez de servir')
+    parser.add_argument('--requisicoes', type=int, default=10_000)
+    parser.add_argument('--clientes', type=int, default=4)
+    parser.add_argument('--lote', type=int, default=1)
+    parser.add_argument('--servico-existente', action='store_true',
+                        help='No teste de carga, usa um serviço já em execução')
+    args = parser.parse_args()
+
+    if args.teste_carga:
+        resultado = teste_carga(args.host, args.porta, args.requisicoes, args.clientes, args.lote,
+                                iniciar_servico=not args.servico_existente)
+        print(json.dumps(resultado, indent=4))
+    else:
+        servidor = criar_servidor(args.host, args.porta, args.taxas)
+        print(f"✅ Serviço de pontuação em http://{args.host}:{args.porta} "
+              f"(taxas de referência: {len(servidor.taxas_risco)} segmentos)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()